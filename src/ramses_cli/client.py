@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import asyncio
+import gzip
 import json
 import logging
 import sys
@@ -23,6 +24,8 @@ from ramses_rf.schemas import (
     SZ_REDUCE_PROCESSING,
 )
 from ramses_tx import is_valid_dev_id
+from ramses_tx.archive import ARCHIVE_SUFFIX
+from ramses_tx.compressed_log import GZIP_SUFFIX
 from ramses_tx.logger import CONSOLE_COLS, DEFAULT_DATEFMT, DEFAULT_FMT
 from ramses_tx.schemas import (
     SZ_DISABLE_QOS,
@@ -32,6 +35,10 @@ from ramses_tx.schemas import (
     SZ_FILE_NAME,
     SZ_KNOWN_LIST,
     SZ_PACKET_LOG,
+    SZ_PARSE_JOBS,
+    SZ_REPLAY_BATCH_SIZE,
+    SZ_REPLAY_END,
+    SZ_REPLAY_START,
     SZ_SERIAL_PORT,
 )
 
@@ -88,7 +95,13 @@ COLORS = {
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
 LIB_KEYS = tuple(SCH_GLOBAL_CONFIG({}).keys()) + (SZ_SERIAL_PORT,)
-LIB_CFG_KEYS = tuple(SCH_GLOBAL_CONFIG({})[SZ_CONFIG].keys()) + (SZ_EVOFW_FLAG,)
+LIB_CFG_KEYS = tuple(SCH_GLOBAL_CONFIG({})[SZ_CONFIG].keys()) + (
+    SZ_EVOFW_FLAG,
+    SZ_PARSE_JOBS,
+    SZ_REPLAY_BATCH_SIZE,
+    SZ_REPLAY_END,
+    SZ_REPLAY_START,
+)
 
 
 def normalise_config(lib_config: dict) -> tuple[str, dict]:
@@ -195,12 +208,59 @@ def cli(ctx, config_file=None, eavesdrop: None | bool = None, **kwargs: Any) ->
     ctx.obj = kwargs, lib_kwargs
 
 
+class PacketLogFile(click.File):
+    """A packet log file, which may be compressed (*.gz), or a packet archive (*.rpa)."""
+
+    def convert(self, value: Any, param: Any, ctx: Any) -> Any:
+        try:
+            if isinstance(value, str) and value.endswith(GZIP_SUFFIX):
+                return gzip.open(value, "rt", encoding="utf-8")
+            if isinstance(value, str) and value.endswith(ARCHIVE_SUFFIX):
+                return open(value, "rb")  # noqa: SIM115
+        except OSError as err:
+            self.fail(f"{value!r}: {err}", param, ctx)
+        return super().convert(value, param, ctx)
+
+
 # Args/Params for packet log only
 class FileCommand(click.Command):  # client.py parse <file>
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
         self.params.insert(  # input_file
-            0, click.Argument(("input-file",), type=click.File("r"), default=sys.stdin)
+            0,
+            click.Argument(("input-file",), type=PacketLogFile("r"), default=sys.stdin),
+        )
+        self.params.insert(  # --replay-batch-size
+            1,
+            click.Option(
+                ("-b", "--replay-batch-size"),
+                type=click.IntRange(min=1),
+                help="Replay packets in batches of this size (faster)",
+            ),
+        )
+        self.params.insert(  # --jobs
+            2,
+            click.Option(
+                ("-j", "--jobs", SZ_PARSE_JOBS),
+                type=click.IntRange(min=1),
+                help="Parse packets with this many processes (faster)",
+            ),
+        )
+        self.params.insert(  # --start
+            3,
+            click.Option(
+                ("--start", SZ_REPLAY_START),
+                type=click.DateTime(),
+                help="Parse only packets from this time (e.g. 2024-01-16T14:00:00)",
+            ),
+        )
+        self.params.insert(  # --end
+            4,
+            click.Option(
+                ("--end", SZ_REPLAY_END),
+                type=click.DateTime(),
+                help="Parse only packets before this time",
+            ),
         )
         # self.params.insert(  # --packet-log  # NOTE: useful for only for test/dev
         #     1,
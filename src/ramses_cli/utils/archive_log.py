@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""RAMSES RF - a RAMSES-II protocol decoder & analyser.
+
+Utility to convert a packet log (which may be compressed) into a packet archive.
+"""
+
+import argparse
+from time import perf_counter
+
+from ramses_tx.archive import ARCHIVE_SUFFIX, convert_packet_log
+
+# python utils/archive_log.py -i packet.log -o packet.rpa
+# python client.py parse packet.rpa
+
+parser = argparse.ArgumentParser(description="Convert a packet log to an archive")
+parser.add_argument("-i", "--input-file", required=True)
+parser.add_argument("-o", "--output-file", default=None)
+args = parser.parse_args()
+
+output_file = args.output_file or args.input_file.removesuffix(".gz") + ARCHIVE_SUFFIX
+
+t0 = perf_counter()
+count = convert_packet_log(args.input_file, output_file)
+print(f"{count} frames archived to {output_file} in {perf_counter() - t0:.3f}s")
@@ -166,6 +166,9 @@ class BindContextBase:
         self._loop = asyncio.get_running_loop()
         self._fut: asyncio.Future[Message] | None = None
 
+        # a device is faked if it has a context (maintain the gateway's index of them)
+        self._dev._gwy._faked_devices[self._dev.id] = self._dev
+
         self.set_state(DevIsNotBinding)
 
     def __repr__(self) -> str:
@@ -197,6 +200,11 @@ class BindContextBase:
         elif state is SuppSendOfferWaitForAccept:
             self._is_respondent = False
 
+        if self.is_binding:  # maintain the gateway's index of binding devices
+            self._dev._gwy._binding_devices[self._dev.id] = self._dev
+        else:
+            self._dev._gwy._binding_devices.pop(self._dev.id, None)
+
         if _DBG_MAINTAIN_STATE_CHAIN:  # HACK for debugging
             setattr(self._state, "_prev_state", prev_state)  # noqa: B010
 
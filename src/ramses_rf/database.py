@@ -1,20 +1,72 @@
 #!/usr/bin/env python3
-"""RAMSES RF - Message database and index."""
+"""RAMSES RF - Message database and index.
+
+The index is usually in memory, but it can be backed by a file, in which case it can
+be used to warm-start the gateway (i.e. without replaying all the cached packets).
+"""
 
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import logging
 import sqlite3
 from collections import OrderedDict
+from collections.abc import Iterator
 from datetime import datetime as dt, timedelta as td
-from typing import NewType, TypedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Final, NewType, TypedDict
+
+from ramses_tx import Code, DeviceIdT, Message, Packet, VerbT
+from ramses_tx.const import I_, RP, RQ
 
-from ramses_tx import Message
+if TYPE_CHECKING:
+    from .gateway import Gateway
 
 DtmStrT = NewType("DtmStrT", str)
 MsgDdT = OrderedDict[DtmStrT, Message]
 
+CtxT = bool | str | None
+EntityMsgsT = dict[Code, Message]  # code, only the latest I/RP
+EntityMsgzT = dict[Code, dict[VerbT, dict[CtxT, Message]]]  # code/verb/ctx
+
+IN_MEMORY: Final = ":memory:"
+
+# increment whenever the schema changes, so older (file-backed) indexes are rebuilt
+_SCHEMA_VERSION: Final[int] = 1
+
+DEFAULT_COMMIT_BATCH_SIZE: Final[int] = 100  # messages, for a group commit
+DEFAULT_COMMIT_INTERVAL: Final[float] = 0.5  # seconds, for a group commit
+
+MAX_RETENTION: Final = td(days=1)  # no msg is kept for longer than this
+
+_EXPIRY_GRACE: Final = td(seconds=3)  # as used by Message._expired
+_HOUSEKEEPING_MIN_SECS: Final[float] = 1.0  # don't wake more often than this
+_HOUSEKEEPING_MAX_SECS: Final[float] = 60.0  # don't sleep for longer than this
+
+# NOTE: SQL strings are constant (or cached), so the connection's statement cache
+# will re-use the prepared statements, rather than re-compiling them for every msg
+
+# returns the dtm of any msg replaced by hdr (prev_dtm is NULL if there wasn't one)
+_SQL_UPSERT: Final = """
+    INSERT INTO messages (dtm, verb, src, dst, code, ctx, hdr, pkt, expires)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(hdr) DO UPDATE SET
+        dtm = excluded.dtm,
+        verb = excluded.verb,
+        src = excluded.src,
+        dst = excluded.dst,
+        code = excluded.code,
+        ctx = excluded.ctx,
+        pkt = excluded.pkt,
+        expires = excluded.expires,
+        prev_dtm = messages.dtm
+    RETURNING prev_dtm
+"""
+
+# the index on expires makes this O(expired), rather than a full-table sweep
+_SQL_EVICT: Final = "DELETE FROM messages WHERE expires <= ? RETURNING dtm"
+
 
 class Params(TypedDict):
     dtm: dt | str | None
@@ -29,28 +81,90 @@ class Params(TypedDict):
 _LOGGER = logging.getLogger(__name__)
 
 
-class MessageIndex:
-    """A simple in-memory SQLite3 database for indexing messages."""
+def _msg_expires(msg: Message) -> dt:
+    """Return the dtm after which the message will have expired (is to be evicted).
+
+    That is, when Message._expired would become True, but never beyond MAX_RETENTION.
+    """
+
+    lifespan = msg._pkt._lifespan
+    if not isinstance(lifespan, td) or lifespan >= MAX_RETENTION:
+        return msg.dtm + MAX_RETENTION
+    return msg.dtm + min(_EXPIRY_GRACE + lifespan * Message.HAS_EXPIRED, MAX_RETENTION)
+
+
+@lru_cache(maxsize=64)
+def _sql_where(sql: str, keys: tuple[str, ...]) -> str:
+    """Return the SQL statement with a WHERE clause for the keys (column names)."""
+    return f"{sql} WHERE " + " AND ".join(f"{k} = ?" for k in keys)
 
-    def __init__(self) -> None:
+
+class MessageIndex:
+    """A simple SQLite3 database for indexing messages (in memory, or in a file).
+
+    If backed by a file, the database uses WAL journaling, and writes are committed
+    in groups (every commit_batch_size messages, or after commit_interval seconds).
+    Any messages already in the file are rehydrated only when first accessed.
+
+    Messages are evicted once they have expired (as per their packet's lifespan), as
+    newer messages are added, and by a housekeeper that wakes at the next expiry.
+    """
+
+    def __init__(
+        self,
+        db_path: str = IN_MEMORY,
+        /,
+        *,
+        gwy: Gateway | None = None,
+        commit_batch_size: int = DEFAULT_COMMIT_BATCH_SIZE,
+        commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+    ) -> None:
         """Instantiate a message database/index."""
 
         self._msgs: MsgDdT = OrderedDict()
+        self._pkts: dict[DtmStrT, str] = {}  # not yet rehydrated (from a warm start)
+
+        # per-entity views of the (rehydrated) msgs, as per _MessageDB._handle_msg()
+        self._entity_msgs: dict[DeviceIdT, EntityMsgsT] = {}
+        self._entity_msgz: dict[DeviceIdT, EntityMsgzT] = {}
+        self._hydrated: set[DeviceIdT] = set()  # entities with all their msgs indexed
+
+        self._db_path = db_path
+        self._gwy = gwy
 
-        self._cx = sqlite3.connect(":memory:")  # Connect to a SQLite DB in memory
+        self._cx = sqlite3.connect(db_path)  # Connect to a SQLite DB (maybe in memory)
         self._cu = self._cx.cursor()  # Create a cursor
 
         self._setup_db_adapters()  # dtm adapter/converter
         self._setup_db_schema()
 
+        self._commit_batch_size = commit_batch_size
+        self._commit_interval = commit_interval
+        self._commit_handle: asyncio.TimerHandle | None = None
+        self._uncommitted = 0  # number of writes since the last commit
+
+        self._next_expiry: dt | None = None  # of the soonest msg to expire
+        self._num_evicted = 0  # the number of msgs evicted, since instantiation
+
         self._lock = asyncio.Lock()
-        self._last_housekeeping: dt = None  # type: ignore[assignment]
         self._housekeeping_task: asyncio.Task[None] = None  # type: ignore[assignment]
 
+        self._warm_start()
+
         self.start()
 
     def __repr__(self) -> str:
-        return f"MessageIndex({len(self._msgs)} messages)"
+        return f"MessageIndex({len(self._msgs) + len(self._pkts)} messages)"
+
+    @property
+    def is_file_backed(self) -> bool:
+        """Return True if the index is persisted to a file (rather than in memory)."""
+        return self._db_path != IN_MEMORY
+
+    @property
+    def is_warm(self) -> bool:
+        """Return True if the index was (re)opened with messages already in it."""
+        return self._is_warm
 
     def start(self) -> None:
         """Start the housekeeper loop."""
@@ -68,12 +182,24 @@ class MessageIndex:
         if self._housekeeping_task and not self._housekeeping_task.done():
             self._housekeeping_task.cancel()  # stop the housekeeper
 
-        self._cx.commit()  # just in case
+        self._commit()  # just in case
         # self._cx.close()  # may still need to do queries after engine has stopped?
 
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Return the size of the index, and the number of msgs evicted from it."""
+
+        return {
+            "size": len(self._msgs) + len(self._pkts),
+            "num_hydrated": len(self._msgs),
+            "num_evicted": self._num_evicted,
+            "next_expiry": self._next_expiry,
+        }
+
     @property
     def msgs(self) -> MsgDdT:
         """Return the messages in the index in a threadsafe way."""
+        self._rehydrate_all()
         return self._msgs
 
     def _setup_db_adapters(self) -> None:
@@ -92,57 +218,278 @@ class MessageIndex:
         sqlite3.register_converter("dtm", convert_datetime)
 
     def _setup_db_schema(self) -> None:
-        """Setup the dayabase schema."""
+        """Setup the database schema (if required)."""
+
+        if self.is_file_backed:
+            self._cu.execute("PRAGMA journal_mode = WAL")
+            self._cu.execute(
+                "PRAGMA synchronous = NORMAL"
+            )  # is durable enough with WAL
+
+        # an index with an older schema is discarded (it is only a cache of pkts)
+        if self._cu.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            self._cu.execute("DROP TABLE IF EXISTS messages")  # and its indexes
+            self._cu.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
 
         self._cu.execute(
             """
-            CREATE TABLE messages (
+            CREATE TABLE IF NOT EXISTS messages (
                 dtm    TEXT(26) NOT NULL PRIMARY KEY,
                 verb   TEXT(2)  NOT NULL,
                 src    TEXT(9)  NOT NULL,
                 dst    TEXT(9)  NOT NULL,
                 code   TEXT(4)  NOT NULL,
                 ctx    TEXT     NOT NULL,
-                hdr    TEXT     NOT NULL UNIQUE
+                hdr    TEXT     NOT NULL UNIQUE,
+                pkt    TEXT     NOT NULL,
+                expires TEXT(26) NOT NULL,
+                prev_dtm TEXT
             )
             """
         )
 
-        self._cu.execute("CREATE INDEX idx_verb ON messages (verb)")
-        self._cu.execute("CREATE INDEX idx_src ON messages (src)")
-        self._cu.execute("CREATE INDEX idx_dst ON messages (dst)")
-        self._cu.execute("CREATE INDEX idx_code ON messages (code)")
-        self._cu.execute("CREATE INDEX idx_ctx ON messages (ctx)")
-        self._cu.execute("CREATE INDEX idx_hdr ON messages (hdr)")
+        self._cu.execute("CREATE INDEX IF NOT EXISTS idx_verb ON messages (verb)")
+        self._cu.execute("CREATE INDEX IF NOT EXISTS idx_src ON messages (src)")
+        self._cu.execute("CREATE INDEX IF NOT EXISTS idx_dst ON messages (dst)")
+        self._cu.execute("CREATE INDEX IF NOT EXISTS idx_code ON messages (code)")
+        self._cu.execute("CREATE INDEX IF NOT EXISTS idx_ctx ON messages (ctx)")
+        self._cu.execute("CREATE INDEX IF NOT EXISTS idx_hdr ON messages (hdr)")
+        self._cu.execute("CREATE INDEX IF NOT EXISTS idx_expires ON messages (expires)")
 
         self._cx.commit()
 
-    async def _housekeeping_loop(self) -> None:
-        """Periodically remove stale messages from the index."""
+    def _warm_start(self) -> None:
+        """Note any messages already in the (file-backed) index, for rehydrating later.
+
+        This is much faster than replaying all the (cached) packets.
+        """
+
+        self._cu.execute("SELECT dtm, pkt FROM messages ORDER BY dtm")
+        self._pkts = {row[0]: row[1] for row in self._cu.fetchall()}
+
+        self._update_next_expiry()
+
+        self._is_warm = bool(self._pkts)
+        if self._is_warm:
+            _LOGGER.info("%s: Warm-started from %s", self, self._db_path)
+
+    def _get_msg(self, dtm: DtmStrT) -> Message:
+        """Return the message with this dtm, rehydrating it first, if required."""
+
+        try:
+            return self._msgs[dtm]
+        except KeyError:
+            pkt_line = self._pkts.pop(dtm)  # will raise KeyError if not found
+
+        msg = Message._from_pkt(Packet.from_dict(dtm, pkt_line))
+        if self._gwy:
+            msg._gwy = self._gwy  # as done by the Engine's message handler
+
+        self._msgs[dtm] = msg
+        self._index_msg(msg)
+        return msg
+
+    def _pop_msg(self, dtm: DtmStrT) -> Message:
+        """Remove the message with this dtm from the (in-memory) index and views."""
+
+        msg = self._msgs.pop(dtm)
+        self._unindex_msg(msg)
+        return msg
+
+    @staticmethod
+    def _entity_ids(msg: Message) -> tuple[DeviceIdT, ...]:
+        """Return the ids of the entities whose views should include this message."""
+
+        if msg.dst.id == msg.src.id or msg.verb == RQ:
+            return (msg.src.id,)
+        return (msg.src.id, msg.dst.id)
+
+    def _index_msg(self, msg: Message) -> None:
+        """Add a message to the views of its entities (e.g. its src & dst)."""
+
+        for dev_id in self._entity_ids(msg):
+            msgz = self._entity_msgz.setdefault(dev_id, {})
+            msgz.setdefault(msg.code, {}).setdefault(msg.verb, {})[msg._pkt._ctx] = msg
 
-        def housekeeping(dt_now: dt, _cutoff: td = td(days=1)) -> None:
-            dtm = (dt_now - _cutoff).isoformat(timespec="microseconds")
+            if msg.verb not in (I_, RP):
+                continue
 
-            self._cu.execute("SELECT dtm FROM messages WHERE dtm => ?", (dtm,))
-            rows = self._cu.fetchall()
+            msgs = self._entity_msgs.setdefault(dev_id, {})
+            if (latest := msgs.get(msg.code)) is None or latest.dtm <= msg.dtm:
+                msgs[msg.code] = msg  # may be rehydrated out of order
 
-            try:  # make this operation atomic, i.e. update self._msgs only on success
-                # await self._lock.acquire()
-                self._cu.execute("DELETE FROM messages WHERE dtm < ?", (dtm,))
-                msgs = OrderedDict({row[0]: self._msgs[row[0]] for row in rows})
-                self._cx.commit()
+    def _unindex_msg(self, msg: Message) -> None:
+        """Remove a message from the views of its entities."""
 
-            except sqlite3.Error:  # need to tighten?
-                self._cx.rollback()
+        for dev_id in self._entity_ids(msg):
+            try:
+                verbs = self._entity_msgz[dev_id][msg.code]
+                ctxs = verbs[msg.verb]
+            except KeyError:
+                continue
+
+            if ctxs.get(msg._pkt._ctx) is msg:
+                del ctxs[msg._pkt._ctx]
+                if not ctxs:  # prune any empty levels, so views don't accumulate them
+                    del verbs[msg.verb]
+                if not verbs:
+                    del self._entity_msgz[dev_id][msg.code]
+
+            msgs = self._entity_msgs.get(dev_id, {})
+            if msgs.get(msg.code) is not msg:
+                continue
+
+            if others := [m for v in (I_, RP) for m in verbs.get(v, {}).values()]:
+                msgs[msg.code] = max(others)  # the next most recent I/RP
             else:
-                self._msgs = msgs
-            finally:
-                pass  # self._lock.release()
+                del msgs[msg.code]
+
+    def _hydrate_entity(self, dev_id: DeviceIdT) -> None:
+        """Rehydrate any messages of an entity that remain from a warm start."""
+
+        if not self._pkts or dev_id in self._hydrated:
+            return
+
+        self._cu.execute(
+            "SELECT dtm FROM messages WHERE src = ? OR dst = ?", (dev_id, dev_id)
+        )
+        for row in self._cu.fetchall():
+            self._get_msg(row[0])
+
+        self._hydrated.add(dev_id)
+
+    def entity_msgs(self, dev_id: DeviceIdT) -> EntityMsgsT:
+        """Return the latest I/RP message of each code, for an entity (a device id).
+
+        The dict is maintained by the index, and should not be modified by the caller.
+        """
+
+        self._hydrate_entity(dev_id)
+        return self._entity_msgs.setdefault(dev_id, {})
+
+    def entity_msgz(self, dev_id: DeviceIdT) -> EntityMsgzT:
+        """Return the messages of an entity (a device id), by code/verb/ctx.
+
+        The dict is maintained by the index, and should not be modified by the caller.
+        """
+
+        self._hydrate_entity(dev_id)
+        return self._entity_msgz.setdefault(dev_id, {})
+
+    def _rehydrate_all(self) -> None:
+        """Rehydrate any messages that remain from a warm start."""
+
+        if not self._pkts:
+            return
+
+        for dtm in tuple(self._pkts):
+            self._get_msg(dtm)
+        self._msgs = OrderedDict(sorted(self._msgs.items()))  # back into dtm order
+
+    def _commit(self) -> None:
+        """Commit any pending writes to the database."""
+
+        if self._commit_handle:
+            self._commit_handle.cancel()
+            self._commit_handle = None
+
+        self._uncommitted = 0
+        self._cx.commit()
+
+    def _commit_later(self) -> None:
+        """Commit the pending writes once there are enough of them, or soon after.
+
+        Writes to an in-memory database are not durable, so commits are cheap, and
+        are made immediately (so no transaction is left open).
+        """
+
+        if not self.is_file_backed:
+            self._cx.commit()
+            return
+
+        self._uncommitted += 1
+
+        if self._uncommitted >= self._commit_batch_size:
+            self._commit()
+        elif not self._commit_handle:
+            self._commit_handle = asyncio.get_running_loop().call_later(
+                self._commit_interval, self._commit
+            )
+
+    @contextlib.contextmanager
+    def _savepoint(self) -> Iterator[None]:
+        """Make a set of writes atomic, without affecting any other pending writes."""
+
+        if not self._cx.in_transaction:
+            self._cu.execute("BEGIN")
+        self._cu.execute("SAVEPOINT msg_index")
+
+        try:
+            yield
+        except sqlite3.Error:
+            self._cu.execute("ROLLBACK TO msg_index")
+            raise
+        finally:
+            self._cu.execute("RELEASE msg_index")
+
+    def _update_next_expiry(self) -> None:
+        """Note when the next msg in the index is due to expire, if any."""
+
+        row = self._cx.execute("SELECT MIN(expires) FROM messages").fetchone()
+        self._next_expiry = dt.fromisoformat(row[0]) if row[0] else None
+
+    def _evict_expired(self, dt_now: dt) -> int:
+        """Remove any expired msgs from the index (and return how many were evicted).
+
+        This is an O(1) no-op until the next msg is due to expire.
+        """
+
+        if self._next_expiry is None or dt_now < self._next_expiry:
+            return 0
+
+        try:  # make this operation atomic, i.e. update self._msgs only on success
+            # await self._lock.acquire()
+            with self._savepoint():
+                rows = self._cx.execute(_SQL_EVICT, (dt_now,)).fetchall()
+
+        except sqlite3.Error:  # need to tighten?
+            return 0
+
+        else:
+            for row in rows:
+                if row[0] in self._msgs:
+                    self._pop_msg(row[0])
+                else:
+                    self._pkts.pop(row[0], None)
+            if rows:
+                self._commit_later()
+
+        finally:
+            pass  # self._lock.release()
+
+        self._num_evicted += len(rows)
+        self._update_next_expiry()
+        return len(rows)
+
+    async def _housekeeping_loop(self) -> None:
+        """Remove expired msgs from the index, waking when the next msg expires.
+
+        Expired msgs are also evicted as newer msgs are added, so this is mainly needed
+        when the index is otherwise idle.
+        """
+
+        def dt_now() -> dt:
+            return self._gwy._dt_now() if self._gwy else dt.now()
 
         while True:
-            self._last_housekeeping = dt.now()
-            await asyncio.sleep(3600)
-            housekeeping(self._last_housekeeping)
+            if self._next_expiry is None:
+                delay = _HOUSEKEEPING_MAX_SECS
+            else:
+                delay = (self._next_expiry - dt_now()).total_seconds()
+                delay = min(max(delay, _HOUSEKEEPING_MIN_SECS), _HOUSEKEEPING_MAX_SECS)
+
+            await asyncio.sleep(delay)
+            self._evict_expired(dt_now())
 
     def add(self, msg: Message) -> Message | None:
         """Add a single message to the index.
@@ -152,26 +499,43 @@ class MessageIndex:
         Throws a warning is there is a duplicate dtm.
         """  # TODO: eventually, may be better to use SqlAlchemy
 
+        dtm: DtmStrT = msg.dtm.isoformat(timespec="microseconds")  # type: ignore[assignment]
+        if self._msgs.get(dtm) is msg:  # e.g. restoring the state from the index
+            return None
+
         dup: tuple[Message, ...] = tuple()  # avoid UnboundLocalError
-        old: Message | None = None  # avoid UnboundLocalError
+        expires = _msg_expires(msg)
 
         try:  # TODO: remove, or use only when source is a packet log?
             # await self._lock.acquire()
-            dup = self._delete_from(  # HACK: because of contrived pkt logs
-                dtm=msg.dtm.isoformat(timespec="microseconds")
-            )
-            old = self._insert_into(msg)  # will delete old msg by hdr
-
-        except sqlite3.Error:  # UNIQUE constraint failed: ? messages.dtm (so: HACK)
-            self._cx.rollback()
-
-        else:
-            dtm: DtmStrT = msg.dtm.isoformat(timespec="microseconds")  # type: ignore[assignment]
-            self._msgs[dtm] = msg
+            try:
+                prev_dtm = self._upsert(msg, expires)  # will replace old msg by hdr
+            except sqlite3.IntegrityError:  # UNIQUE constraint failed: messages.dtm
+                with self._savepoint():
+                    dup = self._delete_from(dtm=dtm)  # HACK: due to contrived pkt logs
+                    prev_dtm = self._upsert(msg, expires)
+                for d in dup:
+                    self._unindex_msg(d)
+
+        except sqlite3.Error:
+            return None
 
         finally:
             pass  # self._lock.release()
 
+        old: Message | None = None
+        if prev_dtm and prev_dtm != dtm:
+            self._get_msg(prev_dtm)  # rehydrate it, if required
+            old = self._pop_msg(prev_dtm)
+
+        self._msgs[dtm] = msg
+        self._index_msg(msg)
+        self._commit_later()
+
+        if self._next_expiry is None or expires < self._next_expiry:
+            self._next_expiry = expires
+        self._evict_expired(msg.dtm)  # msg.dtm is 'now', even when replaying a log
+
         if dup:
             _LOGGER.warning(
                 "Overwrote dtm for %s: %s (contrived log?)", msg._pkt._hdr, dup[0]._pkt
@@ -179,18 +543,14 @@ class MessageIndex:
 
         return old
 
-    def _insert_into(self, msg: Message) -> Message | None:
-        """Insert a message into the index (and return any message replaced by hdr)."""
+    def _upsert(self, msg: Message, expires: dt) -> DtmStrT | None:
+        """Insert/update a message in the index (return the dtm of any msg replaced).
 
-        msgs = self._delete_from(hdr=msg._pkt._hdr)
-
-        sql = """
-            INSERT INTO messages (dtm, verb, src, dst, code, ctx, hdr)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+        A msg is replaced if it has the same hdr (uses a single SQL statement).
         """
 
-        self._cu.execute(
-            sql,
+        rows = self._cx.execute(
+            _SQL_UPSERT,
             (
                 msg.dtm,
                 msg.verb,
@@ -199,10 +559,12 @@ class MessageIndex:
                 msg.code,
                 msg._pkt._ctx,
                 msg._pkt._hdr,
+                f"{msg._pkt._rssi} {msg._pkt._frame}",
+                expires,
             ),
-        )
+        ).fetchall()
 
-        return msgs[0] if msgs else None
+        return rows[0][0] if rows else None
 
     def rem(self, msg: Message | None = None, **kwargs: str) -> tuple[Message, ...]:
         """Remove a set of message(s) from the index.
@@ -210,22 +572,25 @@ class MessageIndex:
         Returns any messages that were removed.
         """
 
-        if bool(msg) ^ bool(kwargs):
+        if not (bool(msg) ^ bool(kwargs)):
             raise ValueError("Either a Message or kwargs should be provided, not both")
         if msg:
             kwargs["dtm"] = msg.dtm.isoformat(timespec="microseconds")
 
         try:  # make this operation atomic, i.e. update self._msgs only on success
             # await self._lock.acquire()
-            msgs = self._delete_from(**kwargs)
+            with self._savepoint():
+                msgs = self._delete_from(**kwargs)
 
         except sqlite3.Error:  # need to tighten?
-            self._cx.rollback()
+            msgs = tuple()
 
         else:
             for msg in msgs:
                 dtm: DtmStrT = msg.dtm.isoformat(timespec="microseconds")  # type: ignore[assignment]
-                self._msgs.pop(dtm)
+                self._pop_msg(dtm)
+            if msgs:
+                self._commit_later()
 
         finally:
             pass  # self._lock.release()
@@ -235,14 +600,11 @@ class MessageIndex:
     def _delete_from(self, **kwargs: str) -> tuple[Message, ...]:
         """Remove message(s) from the index (and return any messages removed)."""
 
-        msgs = self._select_from(**kwargs)
+        sql = _sql_where("DELETE FROM messages", tuple(kwargs)) + " RETURNING dtm"
 
-        sql = "DELETE FROM messages WHERE "
-        sql += " AND ".join(f"{k} = ?" for k in kwargs)
-
-        self._cu.execute(sql, tuple(kwargs.values()))
+        rows = self._cx.execute(sql, tuple(kwargs.values())).fetchall()
 
-        return msgs
+        return tuple(self._get_msg(row[0]) for row in rows)
 
     def get(self, msg: Message | None = None, **kwargs: str) -> tuple[Message, ...]:
         """Return a set of message(s) from the index."""
@@ -257,12 +619,11 @@ class MessageIndex:
     def _select_from(self, **kwargs: str) -> tuple[Message, ...]:
         """Select message(s) from the index (and return any such messages)."""
 
-        sql = "SELECT dtm FROM messages WHERE "
-        sql += " AND ".join(f"{k} = ?" for k in kwargs)
+        sql = _sql_where("SELECT dtm FROM messages", tuple(kwargs))
 
         self._cu.execute(sql, tuple(kwargs.values()))
 
-        return tuple(self._msgs[row[0]] for row in self._cu.fetchall())
+        return tuple(self._get_msg(row[0]) for row in self._cu.fetchall())
 
     def qry(self, sql: str, parameters: tuple[str, ...]) -> tuple[Message, ...]:
         """Return a set of message(s) from the index, given sql and parameters."""
@@ -272,7 +633,7 @@ class MessageIndex:
 
         self._cu.execute(sql, parameters)
 
-        return tuple(self._msgs[row[0]] for row in self._cu.fetchall())
+        return tuple(self._get_msg(row[0]) for row in self._cu.fetchall())
 
     def all(self, include_expired: bool = False) -> tuple[Message, ...]:
         """Return all messages from the index."""
@@ -280,6 +641,8 @@ class MessageIndex:
         # self.cursor.execute("SELECT * FROM messages")
         # return [self._megs[row[0]] for row in self.cursor.fetchall()]
 
+        self._rehydrate_all()
+
         return tuple(
             m for m in self._msgs.values() if include_expired or not m._expired
         )
@@ -288,9 +651,15 @@ class MessageIndex:
         """Clear the message index (remove all messages)."""
 
         self._cu.execute("DELETE FROM messages")
-        self._cx.commit()
+        self._commit()
 
         self._msgs.clear()
+        self._pkts.clear()
+        self._next_expiry = None
+
+        self._entity_msgs.clear()
+        self._entity_msgz.clear()
+        self._hydrated.clear()
 
     # def _msgs(self, device_id: DeviceIdT) -> tuple[Message, ...]:
     #     msgs = [msg for msg in self._msgs.values() if msg.src.id == device_id]
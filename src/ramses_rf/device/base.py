@@ -304,6 +304,7 @@ class Fakeable(DeviceBase):
 
         self._bind_context = BindContext(self)
         self._gwy._include[self.id][SZ_FAKED] = True  # TODO: remove this
+        self._state_changed()  # e.g. a faked device has no battery_state
         _LOGGER.info(f"Faking now enabled for: {self}")
 
     async def _async_send_cmd(
@@ -459,6 +460,7 @@ class DeviceHeat(Device):  # Heat domain: Honeywell CH/DHW or compatible
             raise TypeError(f"Invalid device type to be a controller: {self}")
 
         self._iz_controller = self._iz_controller or msg or True
+        self._state_changed()
 
     # @property
     # def controller(self):  # -> Optional[Controller]:
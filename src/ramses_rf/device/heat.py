@@ -286,6 +286,20 @@ class Temperature(DeviceHeat):  # 30C9
     # .I --- 34:145039 --:------ 34:145039 1FC9 012 00-30C9-8A368F 00-1FC9-8A368F
     # .W --- 01:054173 34:145039 --:------ 1FC9 006 03-2309-04D39D  # real CTL
     # .I --- 34:145039 01:054173 --:------ 1FC9 006 00-30C9-8A368F
+    def _handle_msg(self, msg: Message) -> None:
+        super()._handle_msg(msg)
+
+        if not self._gwy.config.enable_eavesdrop:
+            return
+        if msg.code != Code._30C9 or msg.verb not in (I_, RP) or msg.src is not self:
+            return
+
+        # update the index of candidate zone sensors, used to eavesdrop zone sensors
+        systems = [self.ctl.tcs] if self.ctl else self._gwy.systems
+        for tcs in systems:
+            if index := getattr(tcs, "_sensor_index", None):  # only MultiZone
+                index.update(self, self.temperature, msg.dtm)
+
     @property
     def temperature(self) -> float | None:  # 30C9
         return self._msg_value(Code._30C9, key=SZ_TEMPERATURE)
@@ -668,8 +682,6 @@ class OtbGateway(Actuator, HeatDemand):  # OTB (10): 3220 (22D9, others)
 
         self._child_id = FC  # NOTE: domain_id
 
-        self._msgz[Code._3220] = {RP: {}}  # _msgz[Code._3220][RP][msg_id]
-
         # lf._use_ot = self._gwy.config.use_native_ot
         self._msgs_ot: dict[MsgId, Message] = {}
         # lf._msgs_ot_ctl_polled = {}
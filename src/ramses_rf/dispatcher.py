@@ -179,6 +179,21 @@ def _check_dst_slug(msg: Message, *, slug: str | None = None) -> None:
         )
 
 
+def _handle_msg_by_devices(gwy: Gateway, devices: list[Device], msg: Message) -> None:
+    """Have each device handle the msg, as if each were scheduled via call_soon()."""
+
+    for d in devices:
+        try:
+            d._handle_msg(msg)
+        except Exception as err:  # noqa: BLE001
+            gwy._loop.call_exception_handler(
+                {
+                    "message": f"Exception in {d}._handle_msg({msg!r})",
+                    "exception": err,
+                }
+            )
+
+
 def process_msg(gwy: Gateway, msg: Message) -> None:
     """Decoding the packet payload and route it appropriately."""
 
@@ -228,16 +243,18 @@ def process_msg(gwy: Gateway, msg: Message) -> None:
         # NOTE: here, msgs are routed only to devices: routing to other entities (i.e.
         # systems, zones, circuits) is done by those devices (e.g. UFC to UfhCircuit)
 
-        if isinstance(msg.src, Device):  # type: ignore[unreachable]
+        if isinstance(msg.src, Device) and not gwy.config.batch_dispatch:  # type: ignore[unreachable]
             gwy._loop.call_soon(msg.src._handle_msg, msg)  # type: ignore[unreachable]
 
         # TODO: only be for fully-faked (not Fakable) dst (it picks up via RF if not)
 
+        devices: list[Device]
+
         if msg.code == Code._1FC9 and msg.payload[SZ_PHASE] == SZ_OFFER:
-            devices = [d for d in gwy.devices if d is not msg.src and d._is_binding]
+            devices = [d for d in gwy._binding_devices.values() if d is not msg.src]
 
         elif msg.dst == ALL_DEV_ADDR:  # some offers use dst=63:, so after 1FC9 offer
-            devices = [d for d in gwy.devices if d is not msg.src and d.is_faked]
+            devices = [d for d in gwy._faked_devices.values() if d is not msg.src]
 
         elif msg.dst is not msg.src and isinstance(msg.dst, Fakeable):  # type: ignore[unreachable]
             # to eavesdrop pkts from other devices, but relevant to this device
@@ -255,8 +272,14 @@ def process_msg(gwy: Gateway, msg: Message) -> None:
         else:
             devices = []
 
-        for d in devices:  # FIXME: some may be Addresses?
-            gwy._loop.call_soon(d._handle_msg, msg)
+        if gwy.config.batch_dispatch:  # the src (if a device) and all its recipients
+            if isinstance(msg.src, Device):  # type: ignore[unreachable]
+                devices = [msg.src, *devices]  # type: ignore[unreachable]
+            if devices:
+                gwy._loop.call_soon(_handle_msg_by_devices, gwy, [*devices], msg)
+        else:
+            for d in devices:  # FIXME: some may be Addresses?
+                gwy._loop.call_soon(d._handle_msg, msg)
 
     except (AssertionError, exc.RamsesException, NotImplementedError) as err:
         (_LOGGER.error if _DBG_INCREASE_LOG_LEVELS else _LOGGER.warning)(
@@ -7,7 +7,7 @@ import asyncio
 import contextlib
 import logging
 import random
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 from datetime import datetime as dt, timedelta as td
 from inspect import getmembers, isclass
 from sys import modules
@@ -75,6 +75,11 @@ _SZ_FAILURES: Final = "failures"
 _SZ_INTERVAL: Final = "interval"
 _SZ_COMMAND: Final = "command"
 
+# the state properties, the results of which are cached until the entity's state changes
+_STATE_PROPS: Final = ("params", "schema", "status")
+# ...or until they are this old (e.g. so that expired msgs are eventually excluded)
+STATE_CACHE_MAX_AGE: Final = td(seconds=60)
+
 #
 # NOTE: All debug flags should be False for deployment to end-users
 _DBG_ENABLE_DISCOVERY_BACKOFF: Final[bool] = False
@@ -91,11 +96,49 @@ def class_by_attr(name: str, attr: str) -> dict[str, Any]:  # TODO: change to __
     return {getattr(c[1], attr): c[1] for c in getmembers(modules[name], predicate)}
 
 
+def _cached_state(fget: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap the getter of a state property, so its result is cached.
+
+    A result is reused until the state of the entity's root (e.g. its TCS, which is
+    marked whenever any of its zones/devices change) changes, the root itself changes,
+    or the result is too old.
+
+    Callers are given a (shallow) copy of the cached result, so that they can add to
+    it (or remove from it) without altering the cached result.
+    """
+
+    def wrapper(self: _Entity) -> Any:
+        root = self._state_root
+        dtm = self._gwy._dt_now()
+
+        if (
+            (cached := self._state_cache.get(wrapper)) is not None
+            and cached[0] is root
+            and root._state_seqn <= cached[1]
+            and dtm - cached[2] < STATE_CACHE_MAX_AGE
+        ):
+            return dict(cached[3])
+
+        result = fget(self)
+        self._state_cache[wrapper] = (root, self._gwy._state_seqn, dtm, result)
+        return dict(result)
+
+    wrapper.__doc__ = fget.__doc__
+    wrapper.__name__ = fget.__name__
+    wrapper.__qualname__ = fget.__qualname__
+    return wrapper
+
+
 class _Entity:
     """The ultimate base class for Devices/Zones/Systems.
 
     This class is mainly concerned with:
      - if the entity can Rx packets (e.g. can the HGI send it an RQ)
+
+    The results of the state properties (params, schema, status) are cached, until the
+    entity's state changes (see: `_state_changed()`). Each call returns a new (shallow)
+    copy of the cached dict, but its nested dicts are shared, so subclasses must build
+    new dicts from those of super(), rather than modify them.
     """
 
     _SLUG: str = None  # type: ignore[assignment]
@@ -106,9 +149,41 @@ class _Entity:
 
         self._qos_tx_count = 0  # the number of pkts Tx'd with no matching Rx
 
+        # the gwy's state seqn when this entity's state last changed
+        self._state_seqn: int = 0
+        self._state_cache: dict[Callable, tuple[_Entity, int, dt, Any]] = {}
+        self._state_changed()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Wrap any state properties defined by the subclass, so they are cached."""
+
+        super().__init_subclass__(**kwargs)
+
+        for attr in _STATE_PROPS:
+            if isinstance(prop := cls.__dict__.get(attr), property):
+                setattr(cls, attr, prop.getter(_cached_state(prop.fget)))  # type: ignore[arg-type]
+
     def __repr__(self) -> str:
         return f"{self.id} ({self._SLUG})"
 
+    @property
+    def _state_root(self) -> _Entity:
+        """Return the entity whose state encompasses this entity's state.
+
+        For example, a zone's state includes that of its devices (heat_demand), and a
+        system's state includes that of its zones and devices.
+        """
+        return getattr(self, "tcs", None) or self
+
+    def _state_changed(self) -> None:
+        """Mark the state of this entity (and that of its root) as changed."""
+
+        self._gwy._state_seqn += 1
+        self._state_seqn = self._gwy._state_seqn
+
+        if (root := self._state_root) is not self:
+            root._state_seqn = self._state_seqn
+
     # TODO: should be a private method
     def deprecate_device(self, pkt: Packet, reset: bool = False) -> None:
         """If an entity is deprecated enough times, stop sending to it."""
@@ -198,6 +273,8 @@ class _MessageDB(_Entity):
     def _handle_msg(self, msg: Message) -> None:  # TODO: beware, this is a mess
         """Store a msg in the DBs."""
 
+        self._state_changed()  # even if not stored, it may change the entity's state
+
         if not (
             msg.src.id == self.id[:9]
             or (msg.dst.id == self.id[:9] and msg.verb != RQ)
@@ -253,10 +330,16 @@ class _MessageDB(_Entity):
 
         # remove the msg from all the state DBs
         for obj in entities:
+            obj._state_changed()
             if msg in obj._msgs_.values():
                 del obj._msgs_[msg.code]
             with contextlib.suppress(KeyError):
-                del obj._msgz_[msg.code][msg.verb][msg._pkt._ctx]
+                verbs = obj._msgz_[msg.code]
+                del verbs[msg.verb][msg._pkt._ctx]
+                if not verbs[msg.verb]:  # prune any empty levels
+                    del verbs[msg.verb]
+                if not verbs:
+                    del obj._msgz_[msg.code]
 
     def _get_msg_by_hdr(self, hdr: HeaderT) -> Message | None:
         """Return a msg, if any, that matches a header."""
@@ -392,30 +475,14 @@ class _MessageDB(_Entity):
         if not self._gwy._zzz:
             return self._msgs_
 
-        sql = """
-            SELECT dtm from messages WHERE verb in (' I', 'RP') AND (src = ? OR dst = ?)
-        """
-        return {  # ? use context instead?
-            m.code: m for m in self._gwy._zzz.qry(sql, (self.id[:9], self.id[:9]))
-        }  # e.g. 01:123456_HW
+        return self._gwy._zzz.entity_msgs(self.id[:9])  # e.g. 01:123456_HW
 
     @property
     def _msgz(self) -> dict[Code, dict[VerbT, dict[bool | str | None, Message]]]:
         if not self._gwy._zzz:
             return self._msgz_
 
-        msgs_1: dict[Code, dict[VerbT, dict[bool | str | None, Message]]] = {}
-        msg: Message
-
-        for msg in self._msgs.values():
-            if msg.code not in msgs_1:
-                msgs_1[msg.code] = {msg.verb: {msg._pkt._ctx: msg}}
-            elif msg.verb not in msgs_1[msg.code]:
-                msgs_1[msg.code][msg.verb] = {msg._pkt._ctx: msg}
-            else:
-                msgs_1[msg.code][msg.verb][msg._pkt._ctx] = msg
-
-        return msgs_1
+        return self._gwy._zzz.entity_msgz(self.id[:9])
 
 
 class _Discovery(_MessageDB):
@@ -464,7 +531,7 @@ class _Discovery(_MessageDB):
 
         return {
             f"0x{msg_id}": OPENTHERM_MESSAGES[_to_data_id(msg_id)].get("en")  # type: ignore[misc]
-            for msg_id in sorted(self._msgz[Code._3220].get(RP, []))  # type: ignore[type-var]
+            for msg_id in sorted(self._msgz.get(Code._3220, {}).get(RP, []))  # type: ignore[type-var]
             if (
                 self._is_not_deprecated_cmd(Code._3220, ctx=msg_id)
                 and _to_data_id(msg_id) in OPENTHERM_MESSAGES
@@ -862,6 +929,8 @@ class Parent(Entity):  # A System, Zone, DhwZone or a UfhController
         self.childs.append(child)
         self.child_by_id[child.id] = child
 
+        self._state_changed()
+
 
 class Child(Entity):  # A Zone, Device or a UfhCircuit
     """A Device can be the Child of a Parent (a System, a heating Zone, or a DHW Zone).
@@ -1091,4 +1160,5 @@ class Child(Entity):  # A Zone, Device or a UfhCircuit
         self.ctl: Controller = ctl
         self.tcs: Evohome = ctl.tcs
 
+        self._state_changed()  # now, its root is (usu.) the TCS
         return parent
@@ -11,6 +11,8 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections.abc import Callable
+from datetime import datetime as dt
 from io import TextIOWrapper
 from types import SimpleNamespace
 from typing import TYPE_CHECKING, Any
@@ -41,15 +43,18 @@ from ramses_tx.schemas import (
     SZ_BLOCK_LIST,
     SZ_ENFORCE_KNOWN_LIST,
     SZ_KNOWN_LIST,
+    SZ_LAZY_DECODING,
     PktLogConfigT,
     PortConfigT,
 )
-from ramses_tx.transport import SZ_READER_TASK
+from ramses_tx.transport import SZ_AIRTIME, SZ_READER_TASK
 
-from .const import DONT_CREATE_MESSAGES, SZ_DEVICES
+from . import exceptions as exc
+from .const import DONT_CREATE_ENTITIES, DONT_CREATE_MESSAGES, SZ_DEVICES
 from .database import MessageIndex
 from .device import DeviceHeat, DeviceHvac, Fakeable, HgiGateway, device_factory
 from .dispatcher import detect_array_fragment, process_msg
+from .entity_base import STATE_CACHE_MAX_AGE
 from .schemas import (
     SCH_GATEWAY_CONFIG,
     SCH_GLOBAL_SCHEMAS,
@@ -62,6 +67,7 @@ from .schemas import (
     SZ_FAKED,
     SZ_MAIN_TCS,
     SZ_ORPHANS,
+    SZ_REDUCE_PROCESSING,
     load_schema,
 )
 from .system import Evohome
@@ -78,7 +84,7 @@ if TYPE_CHECKING:
     from ramses_tx import DeviceIdT, DeviceListT, RamsesTransportT
 
     from .device import Device
-    from .entity_base import Parent
+    from .entity_base import Entity, Parent
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -103,6 +109,10 @@ class Gateway(Engine):
         kwargs = {k: v for k, v in kwargs.items() if k[:1] != "_"}  # anachronism
         config: dict[str, Any] = kwargs.pop(SZ_CONFIG, {})
 
+        engine_config = SCH_ENGINE_CONFIG(config)
+        if config.get(SZ_REDUCE_PROCESSING, 0) >= DONT_CREATE_ENTITIES:
+            engine_config.setdefault(SZ_LAZY_DECODING, True)  # as payloads aren't used
+
         super().__init__(
             port_name,
             input_file=input_file,
@@ -111,7 +121,7 @@ class Gateway(Engine):
             block_list=block_list,
             known_list=known_list,
             loop=loop,
-            **SCH_ENGINE_CONFIG(config),
+            **engine_config,
         )
 
         if self._disable_sending:
@@ -126,11 +136,19 @@ class Gateway(Engine):
         self._schema: dict[str, Any] = SCH_GLOBAL_SCHEMAS(kwargs)
 
         self._tcs: Evohome | None = None
+        self._state_seqn: int = 0  # incremented whenever an entity's state changes
+        self._state_cache: dict[str, tuple[int, dt, dict[str, Any]]] = {}
 
         self.devices: list[Device] = []
         self.device_by_id: dict[DeviceIdT, Device] = {}
 
-        self._zzz: MessageIndex | None = None  # MessageIndex()
+        # indexes of devices, maintained by the devices as they change state
+        self._faked_devices: dict[DeviceIdT, Device] = {}
+        self._binding_devices: dict[DeviceIdT, Device] = {}  # 1FC9 offers go to these
+
+        self._zzz: MessageIndex | None = None
+        if self.config.message_db:  # NOTE: the index is experimental
+            self._zzz = MessageIndex(self.config.message_db, gwy=self)
 
     def __repr__(self) -> str:
         if not self.ser_name:
@@ -182,7 +200,9 @@ class Gateway(Engine):
         load_schema(self, known_list=self._include, **self._schema)  # create faked too
 
         await super().start()  # TODO: do this *after* restore cache
-        if cached_packets:
+        if self._zzz and self._zzz.is_warm:  # no need to replay the cached packets
+            await self._restore_indexed_msgs()
+        elif cached_packets:
             await self._restore_cached_packets(cached_packets)
 
         self.config.disable_discovery = disable_discovery
@@ -288,9 +308,14 @@ class Gateway(Engine):
             self.devices = []
             self.device_by_id = {}
 
+            self._faked_devices = {}
+            self._binding_devices = {}
+
             self._prev_msg = None
             self._this_msg = None
 
+            self._state_cache = {}
+
         tmp_transport: RamsesTransportT  # mypy hint
 
         _LOGGER.debug("GATEWAY: Restoring a cached packet log...")
@@ -325,6 +350,7 @@ class Gateway(Engine):
         tmp_transport = await transport_factory(
             tmp_protocol,
             packet_dict=packets,
+            replay_batch_size=self._replay_batch_size,
         )
 
         await tmp_transport.get_extra_info(SZ_READER_TASK)
@@ -332,6 +358,25 @@ class Gateway(Engine):
         _LOGGER.debug("GATEWAY: Restored, resuming")
         self._resume()
 
+    async def _restore_indexed_msgs(self) -> None:
+        """Restore the schema/state from the msgs of a (warm-started) message index.
+
+        The msgs are already in the index, so they are not re-added to it.
+        """
+
+        assert self._zzz  # mypy check
+
+        _LOGGER.debug("GATEWAY: Restoring from the message index...")
+        self._pause()
+
+        try:
+            for msg in self._zzz.all(include_expired=True):
+                self._msg_handler(msg)
+            await asyncio.sleep(0)  # the msgs are handled via call_soon()
+        finally:
+            _LOGGER.debug("GATEWAY: Restored, resuming")
+            self._resume()
+
     def _add_device(self, dev: Device) -> None:  # TODO: also: _add_system()
         """Add a device to the gateway (called by devices during instantiation)."""
 
@@ -511,41 +556,102 @@ class Gateway(Engine):
         just like the other devices in the schema.
         """
 
-        schema: dict[str, Any] = {SZ_MAIN_TCS: self.tcs.ctl.id if self.tcs else None}
-
-        for tcs in self.systems:
-            schema[tcs.ctl.id] = tcs.schema
+        def build_schema() -> dict[str, Any]:
+            schema: dict[str, Any] = {
+                SZ_MAIN_TCS: self.tcs.ctl.id if self.tcs else None
+            }
 
-        dev_list: list[DeviceIdT] = sorted(
-            [
-                d.id
-                for d in self.devices
-                if not getattr(d, "tcs", None)
-                and isinstance(d, DeviceHeat)
-                and d._is_present
-            ]
-        )
-        schema[f"{SZ_ORPHANS}_heat"] = dev_list
+            for tcs in self.systems:
+                schema[tcs.ctl.id] = tcs.schema
+
+            dev_list: list[DeviceIdT] = sorted(
+                [
+                    d.id
+                    for d in self.devices
+                    if not getattr(d, "tcs", None)
+                    and isinstance(d, DeviceHeat)
+                    and d._is_present
+                ]
+            )
+            schema[f"{SZ_ORPHANS}_heat"] = dev_list
+
+            dev_list = sorted(
+                [
+                    d.id
+                    for d in self.devices
+                    if isinstance(d, DeviceHvac) and d._is_present
+                ]
+            )
+            schema[f"{SZ_ORPHANS}_hvac"] = dev_list
 
-        dev_list = sorted(
-            [d.id for d in self.devices if isinstance(d, DeviceHvac) and d._is_present]
-        )
-        schema[f"{SZ_ORPHANS}_hvac"] = dev_list
+            return schema
 
-        return schema
+        return self._cached_state("schema", build_schema)
 
     @property
     def params(self) -> dict[str, Any]:
-        return {SZ_DEVICES: {d.id: d.params for d in sorted(self.devices)}}
+        return self._cached_state(
+            "params",
+            lambda: {SZ_DEVICES: {d.id: d.params for d in sorted(self.devices)}},
+        )
 
     @property
     def status(self) -> dict[str, Any]:
         tx_rate = self._transport.get_extra_info("tx_rate") if self._transport else None
+        airtime = self._transport.get_extra_info(SZ_AIRTIME) if self._transport else None
+        context = getattr(self._protocol, "_context", None)  # None if ReadProtocol
         return {
-            SZ_DEVICES: {d.id: d.status for d in sorted(self.devices)},
+            SZ_DEVICES: self._cached_state(
+                "status", lambda: {d.id: d.status for d in sorted(self.devices)}
+            ),
             "_tx_rate": tx_rate,
+            "_airtime": airtime,
+            "_rtt": context.rtt_metrics if context else None,
         }
 
+    def _cached_state(
+        self, name: str, fnc: Callable[[], dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Return (a shallow copy of) the result of fnc, which is cached until the state
+        of any entity changes, or the result is too old (as per the entities' cache).
+        """
+
+        seqn, dtm = self._state_seqn, self._dt_now()
+
+        if (
+            (cached := self._state_cache.get(name)) is not None
+            and cached[0] == seqn
+            and dtm - cached[1] < STATE_CACHE_MAX_AGE
+        ):
+            return dict(cached[2])
+
+        result = fnc()
+        self._state_cache[name] = (seqn, dtm, result)
+        return dict(result)
+
+    @property
+    def state_seqn(self) -> int:
+        """Return the current state seqn (see: `changed_entities()`)."""
+        return self._state_seqn
+
+    def changed_entities(self, since: int = 0) -> list[Entity]:
+        """Return the entities whose state has changed since the given state seqn.
+
+        Use the `state_seqn` property to obtain the seqn for the next call.
+        """
+
+        entities: list[Entity] = [d for d in self.devices if d._state_seqn > since]
+
+        for tcs in self.systems:
+            if tcs._state_seqn <= since:  # so, its zones/devices are unchanged too
+                continue
+            entities.append(tcs)
+            entities.extend(z for z in tcs.zones if z._state_seqn > since)
+            if tcs.dhw and tcs.dhw._state_seqn > since:
+                entities.append(tcs.dhw)
+
+        return entities
+
     def _msg_handler(self, msg: Message) -> None:
         """A callback to handle messages from the protocol stack."""
         # TODO: Remove this
@@ -563,10 +669,15 @@ class Gateway(Engine):
         assert self._this_msg  # mypy check
 
         if self._prev_msg and detect_array_fragment(self._this_msg, self._prev_msg):
-            msg._pkt._force_has_array()  # may be an array of length 1
-            msg._payload = self._prev_msg.payload + (
-                msg.payload if isinstance(msg.payload, list) else [msg.payload]
-            )
+            try:  # if lazy, the payload must be parsed before forcing the array
+                payload, prev_payload = msg.payload, self._prev_msg.payload
+            except exc.PacketInvalid:  # will be logged (again) by process_msg()
+                pass
+            else:
+                msg._pkt._force_has_array()  # may be an array of length 1
+                msg._payload = prev_payload + (
+                    payload if isinstance(payload, list) else [payload]
+                )
 
         process_msg(self, msg)
 
@@ -241,19 +241,23 @@ SCH_GLOBAL_SCHEMAS = vol.Schema(SCH_GLOBAL_SCHEMAS_DICT, extra=vol.PREVENT_EXTRA
 
 #
 # 4/5: Gateway (parser/state) configuration
+SZ_BATCH_DISPATCH: Final = "batch_dispatch"  # route a msg to its devices in 1 callback
 SZ_DISABLE_DISCOVERY: Final = "disable_discovery"
 SZ_ENABLE_EAVESDROP: Final = "enable_eavesdrop"
 SZ_MAX_ZONES: Final = "max_zones"  # TODO: move to TCS-attr from GWY-layer
+SZ_MESSAGE_DB: Final = "message_db"  # ":memory:", or a file (for a warm start)
 SZ_REDUCE_PROCESSING: Final = "reduce_processing"
 SZ_USE_ALIASES: Final = "use_aliases"  # use friendly device names from known_list
 SZ_USE_NATIVE_OT: Final = "use_native_ot"  # favour OT (3220s) over RAMSES
 
 SCH_GATEWAY_DICT = {
+    vol.Optional(SZ_BATCH_DISPATCH, default=False): bool,
     vol.Optional(SZ_DISABLE_DISCOVERY, default=False): bool,
     vol.Optional(SZ_ENABLE_EAVESDROP, default=False): bool,
     vol.Optional(SZ_MAX_ZONES, default=DEFAULT_MAX_ZONES): vol.All(
         int, vol.Range(min=1, max=16)
     ),  # NOTE: no default
+    vol.Optional(SZ_MESSAGE_DB, default=None): vol.Any(None, str),
     vol.Optional(SZ_REDUCE_PROCESSING, default=0): vol.All(
         int, vol.Range(min=0, max=DONT_CREATE_MESSAGES)
     ),
@@ -333,6 +333,53 @@ class SystemBase(Parent, Entity):  # 3B00 (multi-relay)
         return status
 
 
+class _TempSensorIndex:
+    """An index of candidate zone sensors, bucketed by their last-reported temp.
+
+    Used to eavesdrop zone sensors: each bucket holds the sensors (and the dtm of
+    their 30C9) that last reported that temp, so matching a zone's temp to a sensor
+    is a lookup, rather than a search of every device.
+    """
+
+    def __init__(self) -> None:
+        self._by_temp: dict[float, dict[DeviceIdT, tuple[dt, Temperature]]] = {}
+        self._temp_of: dict[DeviceIdT, float] = {}
+
+    def update(self, sensor: Temperature, temp: float | None, dtm: dt) -> None:
+        """Move the sensor into the bucket of its latest temp (if any)."""
+
+        if (prev := self._temp_of.pop(sensor.id, None)) is not None:
+            bucket = self._by_temp[prev]
+            del bucket[sensor.id]
+            if not bucket:
+                del self._by_temp[prev]
+
+        if temp is None:
+            return
+
+        self._temp_of[sensor.id] = temp
+        self._by_temp.setdefault(temp, {})[sensor.id] = (dtm, sensor)
+
+    def sensor(self, temp: float, since: dt, ctl: Controller) -> Temperature | None:
+        """Return the latest sensor to report the temp (after the dtm), if any."""
+
+        candidates = [
+            (dtm, s)
+            for dtm, s in self._by_temp.get(temp, {}).values()
+            if dtm > since and s.ctl in (ctl, None)
+        ]
+        return max(candidates, key=lambda x: x[0])[1] if candidates else None
+
+    def reported_since(self, since: dt, ctl: Controller) -> bool:
+        """Return True if any sensor has reported a temp after the dtm."""
+
+        return any(
+            dtm > since and s.ctl in (ctl, None)
+            for bucket in self._by_temp.values()
+            for dtm, s in bucket.values()
+        )
+
+
 class MultiZone(SystemBase):  # 0005 (+/- 000C?)
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
@@ -344,6 +391,7 @@ class MultiZone(SystemBase):  # 0005 (+/- 000C?)
         )
 
         self._prev_30c9: Message | None = None  # used to eavesdrop zone sensors
+        self._sensor_index = _TempSensorIndex()  # used to eavesdrop zone sensors
 
     def _setup_discovery_cmds(self) -> None:
         super()._setup_discovery_cmds()
@@ -402,26 +450,18 @@ class MultiZone(SystemBase):  # 0005 (+/- 000C?)
             if not testable_zones:
                 return  # no testable zones
 
-            testable_sensors = {
-                d.temperature: d
-                for d in self._gwy.devices  # NOTE: *not* self.childs
-                if isinstance(d, Temperature)  # d.addr.type in DEVICE_HAS_ZONE_SENSOR
-                and d.ctl in (self.ctl, None)
-                and d.temperature is not None
-                and d._msgs[Code._30C9].dtm > prev.dtm  # changed during last cycle
-            }
-            if not testable_sensors:
+            testable_sensors: dict[float, Temperature] = {
+                temp: sensor  # NOTE: from any device, *not* only self.childs
+                for temp in testable_zones
+                if (sensor := self._sensor_index.sensor(temp, prev.dtm, self.ctl))
+            }  # sensors with matching temps, changed during last cycle
+            if not testable_sensors and not self._sensor_index.reported_since(
+                prev.dtm, self.ctl
+            ):
                 return  # no testable sensors
 
-            matched_pairs = {
-                sensor: zone_idx
-                for temp_z, zone_idx in testable_zones.items()
-                for temp_s, sensor in testable_sensors.items()
-                if temp_z == temp_s
-            }
-
-            for sensor, zone_idx in matched_pairs.items():
-                zone = self.zone_by_idx[zone_idx]
+            for temp, sensor in testable_sensors.items():
+                zone = self.zone_by_idx[testable_zones[temp]]
                 self._gwy.get_device(sensor.id, parent=zone, is_sensor=True)
 
             # _LOGGER.warning("System state (after): %s", self.schema)
@@ -437,7 +477,7 @@ class MultiZone(SystemBase):  # 0005 (+/- 000C?)
             temp, zone_idx = tuple(remaining_zones.items())[0]
 
             # can safely(?) assume this zone is using the CTL as a sensor...
-            if not [s for s in testable_sensors if s == temp]:
+            if temp not in testable_sensors:
                 zone = self.zone_by_idx[zone_idx]
                 self._gwy.get_device(self.ctl.id, parent=zone, is_sensor=True)
 
@@ -536,6 +576,7 @@ class MultiZone(SystemBase):  # 0005 (+/- 000C?)
             zon = zone_factory(self, zone_idx, msg=msg, **schema)  # type: ignore[unreachable]
             self.zone_by_idx[zon.idx] = zon
             self.zones.append(zon)
+            self._state_changed()
 
         elif schema:
             zon._update_schema(**schema)
@@ -677,8 +718,7 @@ class Language(SystemBase):  # 0100
     @property
     def params(self) -> dict[str, Any]:
         params = super().params
-        params[SZ_SYSTEM][SZ_LANGUAGE] = self.language
-        return params
+        return {**params, SZ_SYSTEM: {**params[SZ_SYSTEM], SZ_LANGUAGE: self.language}}
 
 
 class Logbook(SystemBase):  # 0418
@@ -813,6 +853,7 @@ class StoredHw(SystemBase):  # 10A0, 1260, 1F41
 
         if not self._dhw:
             self._dhw = zone_factory(self, "HW", msg=msg, **schema)  # type: ignore[assignment]
+            self._state_changed()
 
         elif schema:
             self._dhw._update_schema(**schema)
@@ -889,8 +930,10 @@ class SysMode(SystemBase):  # 2E04
     @property
     def params(self) -> dict[str, Any]:
         params = super().params
-        params[SZ_SYSTEM][SZ_SYSTEM_MODE] = self.system_mode
-        return params
+        return {
+            **params,
+            SZ_SYSTEM: {**params[SZ_SYSTEM], SZ_SYSTEM_MODE: self.system_mode},
+        }
 
 
 class Datetime(SystemBase):  # 313F
@@ -977,6 +1020,8 @@ class System(StoredHw, Datetime, Logbook, SystemBase):
         if _schema := (schema.get(SZ_DHW_SYSTEM)):  # type: ignore[assignment]
             self.get_dhw_zone(**_schema)  # self._dhw = ...
 
+        self._state_changed()
+
         if not isinstance(self, MultiZone):
             return
 
@@ -1046,11 +1091,15 @@ class System(StoredHw, Datetime, Logbook, SystemBase):
         status = super().status
         # assert SZ_SYSTEM in status  # TODO: removeme
 
-        status[SZ_SYSTEM]["heat_demands"] = self.heat_demands
-        status[SZ_SYSTEM]["relay_demands"] = self.relay_demands
-        status[SZ_SYSTEM]["relay_failsafes"] = self.relay_failsafes
-
-        return status
+        return {
+            **status,
+            SZ_SYSTEM: {
+                **status[SZ_SYSTEM],
+                "heat_demands": self.heat_demands,
+                "relay_demands": self.relay_demands,
+                "relay_failsafes": self.relay_failsafes,
+            },
+        }
 
 
 class Evohome(ScheduleSync, Language, SysMode, MultiZone, UfHeating, System):
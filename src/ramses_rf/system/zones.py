@@ -333,6 +333,8 @@ class DhwZone(ZoneSchedule):  # CS92A
             assert isinstance(htg_valve, BdrSwitch)  # mypy
             self._htg_valve = htg_valve
 
+        self._state_changed()
+
     @property
     def sensor(self) -> DhwSensor | None:  # self._dhw_sensor
         return self._dhw_sensor
@@ -540,6 +542,8 @@ class Zone(ZoneSchedule):
         for dev_id in schema.get(SZ_ACTUATORS, []):
             self._gwy.get_device(dev_id, parent=self)
 
+        self._state_changed()
+
     def _setup_discovery_cmds(self) -> None:
         # super()._setup_discovery_cmds()
 
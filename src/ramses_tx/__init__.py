@@ -42,6 +42,7 @@ from .gateway import Engine
 from .logger import set_pkt_logging
 from .message import Message
 from .packet import PKT_LOGGER, Packet
+from .parallel import parse_packet_log
 from .protocol import PortProtocol, ReadProtocol, protocol_factory
 from .ramses import CODES_BY_DEV_SLUG, CODES_SCHEMA
 from .schemas import SZ_SERIAL_PORT, DeviceIdT, DeviceListT
@@ -127,6 +128,7 @@ __all__ = [
     "transport_factory",
     #
     "is_valid_dev_id",
+    "parse_packet_log",
     "set_pkt_logging_config",
 ]
 
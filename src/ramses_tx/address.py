@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import sys
 from functools import lru_cache
 from typing import TYPE_CHECKING, Final
 
@@ -33,8 +34,19 @@ _DBG_DISABLE_STRICT_CHECKING: Final[bool] = False  # a convenience for the test
 _DBG_DISABLE_DEV_HVAC = False
 
 
+# the intern tables are bounded, as corrupt packets can have (valid) bogus device ids
+MAX_INTERNED_ADDRS: Final[int] = 4096
+MAX_CACHED_ADDR_SETS: Final[int] = 4096
+
+
 class Address:
-    """The device Address class."""
+    """The device Address class.
+
+    Addresses are immutable, and are usually shared via the intern table (so, for a
+    given device id, there is only one instance), see: id_to_address().
+    """
+
+    __slots__ = ("id", "type", "_hex_id")
 
     _SLUG = None
 
@@ -45,7 +57,7 @@ class Address:
         #     device_id = NON_DEVICE_ID
 
         self.id = device_id  # TODO: check is a valid id...
-        self.type = device_id[:2]  # dex, NOTE: remove last
+        self.type = sys.intern(device_id[:2])  # dex, NOTE: remove last
         self._hex_id: str = None  # type: ignore[assignment]
 
         if not self.is_valid(device_id):
@@ -126,10 +138,22 @@ class Address:
     #     return cls(cls.convert_from_hex(hex_id))
 
 
-@lru_cache(maxsize=256)
+_ADDRESSES: dict[str, Address] = {}  # the intern table of device_id: Address
+
+
 def id_to_address(device_id: DeviceIdT) -> Address:
-    """Factory method to cache & return device Address from device ID."""
-    return Address(device_id=device_id)
+    """Factory method to intern & return device Address from device ID.
+
+    Will raise a ValueError if the device ID is invalid.
+    """
+
+    if (addr := _ADDRESSES.get(device_id)) is not None:
+        return addr
+
+    addr = Address(device_id=sys.intern(device_id))  # type: ignore[arg-type]
+    if len(_ADDRESSES) < MAX_INTERNED_ADDRS:
+        _ADDRESSES[addr.id] = addr
+    return addr
 
 
 HGI_DEV_ADDR = Address(HGI_DEVICE_ID)  # 18:000730
@@ -189,18 +213,37 @@ def is_valid_dev_id(value: str, dev_class: None | str = None) -> bool:
     # return True
 
 
-@lru_cache(maxsize=256)  # there is definite benefit in caching this
-def pkt_addrs(addr_fragment: str) -> tuple[Address, Address, Address, Address, Address]:
+_AddrSetT = tuple[Address, Address, Address, Address, Address]
+
+# there is definite benefit in caching this (an LRU of 256 would thrash on large sites)
+_ADDR_SETS: dict[str, _AddrSetT] = {}
+
+
+def pkt_addrs(addr_fragment: str) -> _AddrSetT:
     """Return the address fields from (e.g): '01:078710 --:------ 01:144246'.
 
     returns: src_addr, dst_addr, addr_0, addr_1, addr_2
 
     Will raise an InvalidAddrSetError is the address fields are not valid.
     """
-    # for debug: print(pkt_addrs.cache_info())
 
+    if (result := _ADDR_SETS.get(addr_fragment)) is not None:
+        return result
+
+    result = _pkt_addrs(addr_fragment)
+
+    if len(_ADDR_SETS) >= MAX_CACHED_ADDR_SETS:  # evict the oldest (i.e. FIFO)
+        del _ADDR_SETS[next(iter(_ADDR_SETS))]
+    _ADDR_SETS[addr_fragment] = result
+    return result
+
+
+def _pkt_addrs(addr_fragment: str) -> _AddrSetT:
     try:
-        addrs = tuple(id_to_address(addr_fragment[i : i + 9]) for i in range(0, 30, 10))
+        addrs = tuple(
+            id_to_address(addr_fragment[i : i + 9])  # type: ignore[arg-type]
+            for i in range(0, 30, 10)
+        )
     except ValueError as err:
         raise exc.PacketAddrSetInvalid(
             f"Invalid address set: {addr_fragment}: {err}"
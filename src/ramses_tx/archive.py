@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""RAMSES RF - A compact binary archive format for packets.
+
+Replaying a plain text packet log requires that every line is partitioned, and its
+timestamp & frame parsed. A packet archive instead stores each packet as a fixed-size
+binary header, followed by its raw payload:
+
+    dtm     int64   microseconds since the (naive) epoch
+    rssi    3s      e.g. b"045" (or b"...")
+    verb    uint8   an index into _VERBS (or _RAW_FRAME, see below)
+    seqn    uint16  e.g. 123 (or _NO_SEQN for "---")
+    addrs   3x 3s   each a device id, packed as per dev_id_to_hex_id()
+    code    uint16  e.g. 0x1F09
+    len     uint16  the length of the payload (in bytes)
+    payload bytes   the raw payload
+
+Any frame that can't be packed (e.g. a corrupt frame) is stored as _RAW_FRAME, with
+its (ASCII) text as the payload. Comments, and frames with an evofw3 error (which would
+be invalid packets), are not archived.
+
+An archive is much smaller than its packet log, and its timestamps need no parsing.
+Only valid frames are packed, so when replaying an archive, the unpacked fields of
+each frame are passed as is to Packet(), which need not tokenize (re-validate) them.
+It is not a zero-copy format: it is read via a memory map, but the fields are str.
+
+Timestamps are naive (as per packet logs), so any aware datetime is converted to local
+time (as per MqttTransport).
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+from collections.abc import Iterable, Iterator
+from datetime import datetime as dt, timedelta as td
+from io import BufferedReader
+from typing import Final
+
+from .compressed_log import packet_log_frames
+from .const import COMMAND_REGEX
+from .frame import FrameFieldsT
+from .packet import Packet
+
+ARCHIVE_SUFFIX: Final = ".rpa"  # RAMSES packet archive
+
+_MAGIC: Final = b"RAMSES\x00\x01"  # the file signature, incl. the format version
+
+_RECORD: Final = struct.Struct("<q3sBH3s3s3sHH")
+_VERBS: Final = (" I", "RQ", "RP", " W")
+_RAW_FRAME: Final = 0xFF  # the frame is stored as text (as it can't be packed)
+_NO_SEQN: Final = 0xFFFF  # for "---"
+
+_EPOCH: Final = dt(1970, 1, 1)
+_ONE_USEC: Final = td(microseconds=1)
+
+_NON_DEV_HEX: Final = b"\xff\xff\xff"  # for "--:------" (NB: 63:262142 is FFFFFE)
+
+_FIELD_SEPS: Final = (3, 6, 10, 20, 30, 40, 45, 49)  # the offsets of the spaces
+
+_FrameT = tuple[str, str]  # dtm_str, frame
+_RecordT = tuple[dt, str, FrameFieldsT | str]  # dtm, rssi, fields (or a raw frame)
+
+
+def _pack_addr(addr: str) -> bytes:
+    """Pack a device id (e.g. 01:145038) into 3 bytes (will raise ValueError if bad)."""
+
+    if addr == "--:------":
+        return _NON_DEV_HEX
+
+    if addr[2:3] != ":" or not addr[:2].isdigit() or not addr[3:].isdigit():
+        raise ValueError(f"Invalid device id: {addr}")
+
+    dev_type, dev_num = int(addr[:2]), int(addr[3:])
+    if dev_type > 63 or dev_num > 0x3FFFF or (dev_type, dev_num) == (63, 0x3FFFF):
+        raise ValueError(f"Invalid device id: {addr}")
+
+    return ((dev_type << 18) + dev_num).to_bytes(3, "big")
+
+
+def _unpack_addr(packed: bytes) -> str:
+    """Unpack a device id from 3 bytes (e.g. to 01:145038)."""
+
+    if packed == _NON_DEV_HEX:
+        return "--:------"
+
+    value = int.from_bytes(packed, "big")
+    return f"{value >> 18:02d}:{value & 0x3FFFF:06d}"
+
+
+def _usecs(dtm: dt) -> int:
+    """Return the microseconds since the (naive) epoch of a (naive or aware) dtm."""
+
+    if dtm.tzinfo is not None:  # convert to naive local time, as per the packet logs
+        dtm = dtm.astimezone().replace(tzinfo=None)
+    return (dtm - _EPOCH) // _ONE_USEC
+
+
+def _pack_frame(dtm: dt, frame: str) -> bytes:
+    """Pack a frame (i.e. f"{rssi} {frame}", without any comments) into a record."""
+
+    usecs = _usecs(dtm)
+    rssi = frame[:3].encode("ascii", errors="replace")
+
+    # e.g. "045 RQ --- 18:000730 01:145038 --:------ 000A 002 0800"
+    try:
+        verb = _VERBS.index(frame[4:6])
+        seqn = _NO_SEQN if frame[7:10] == "---" else int(frame[7:10])
+        addrs = tuple(_pack_addr(frame[i : i + 9]) for i in (11, 21, 31))
+        code = int(frame[41:45], 16)
+        payload = bytes.fromhex(frame[50:])
+
+        if (  # check that the frame can be rebuilt exactly from the packed fields
+            not COMMAND_REGEX.match(frame[4:])  # so its fields need no validation
+            or "".join(frame[i : i + 1] for i in _FIELD_SEPS) != " " * len(_FIELD_SEPS)
+            or frame[7:10] != ("---" if seqn == _NO_SEQN else f"{seqn:03d}")
+            or frame[41:45] != f"{code:04X}"
+            or frame[46:49] != f"{len(payload):03d}"
+            or frame[50:] != payload.hex().upper()
+        ):
+            raise ValueError(f"Invalid frame: {frame}")
+
+    except ValueError:
+        text = frame[4:].encode("ascii", errors="replace")
+        record = _RECORD.pack(usecs, rssi, _RAW_FRAME, 0, b"", b"", b"", 0, len(text))
+        return record + text
+
+    return _RECORD.pack(usecs, rssi, verb, seqn, *addrs, code, len(payload)) + payload
+
+
+def write_archive(frames: Iterable[_FrameT], dest: str, /) -> int:
+    """Write the (dtm_str, frame) pairs to a packet archive (return the count)."""
+
+    count = 0
+
+    with open(dest, "wb") as f:
+        f.write(_MAGIC)
+
+        for dtm_str, pkt_line in frames:
+            frame, err_msg, _ = Packet._partition(pkt_line)
+            if not frame or err_msg:  # as such packets would be invalid, anyway
+                continue
+            f.write(_pack_frame(dt.fromisoformat(dtm_str), frame))
+            count += 1
+
+    return count
+
+
+def convert_packet_log(source: str, dest: str, /) -> int:
+    """Convert a packet log (which may be compressed) into a packet archive.
+
+    Returns the number of frames archived.
+    """
+
+    return write_archive(packet_log_frames(source), dest)
+
+
+def is_packet_archive(pkt_source: object) -> bool:
+    """Return True if the packet source is a (binary) file that is a packet archive."""
+
+    if not isinstance(pkt_source, BufferedReader):
+        return False
+    return pkt_source.peek(len(_MAGIC))[: len(_MAGIC)] == _MAGIC
+
+
+def archive_records(
+    archive: BufferedReader | str,
+    /,
+    *,
+    start: dt | None = None,
+    end: dt | None = None,
+) -> Iterator[_RecordT]:
+    """Yield the (dtm, rssi, fields) of a packet archive, within any time window.
+
+    The fields are as returned by _tokenize(), or are the frame (as text) if it could
+    not be packed (i.e. it is likely invalid).
+    """
+
+    start_usecs = _usecs(start) if start else None
+    end_usecs = _usecs(end) if end else None
+
+    if isinstance(archive, str):
+        with open(archive, "rb") as f:
+            yield from archive_records(f, start=start, end=end)
+        return
+
+    with mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[: len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"Not a packet archive: {archive.name}")
+
+        buf = memoryview(mm)
+        try:
+            yield from _archive_records(buf, start_usecs, end_usecs)
+        finally:
+            buf.release()
+
+
+def archive_frames(
+    archive: BufferedReader | str,
+    /,
+    *,
+    start: dt | None = None,
+    end: dt | None = None,
+) -> Iterator[tuple[dt, str]]:
+    """Yield the (dtm, frame) pairs of a packet archive, within any time window.
+
+    The frames are as expected by Packet(), i.e. f"{rssi} {frame}".
+    """
+
+    for dtm, rssi, fields in archive_records(archive, start=start, end=end):
+        if isinstance(fields, str):
+            yield dtm, f"{rssi} {fields}"
+        else:
+            yield dtm, f"{rssi} {' '.join(fields)}"
+
+
+def _archive_records(
+    buf: memoryview, start_usecs: int | None, end_usecs: int | None
+) -> Iterator[_RecordT]:
+    unpack_from, rec_size = _RECORD.unpack_from, _RECORD.size
+
+    # most fields have few distinct values, and repeat often, so are best memoised
+    addr_sets: dict[bytes, str] = {}
+    codes: dict[int, str] = {}
+    lengths: dict[int, str] = {}
+    rssis: dict[bytes, str] = {}
+
+    def addr_set(packed: bytes) -> str:
+        if (result := addr_sets.get(packed)) is None:
+            result = addr_sets[packed] = " ".join(
+                _unpack_addr(packed[i : i + 3]) for i in (0, 3, 6)
+            )
+        return result
+
+    offset = len(_MAGIC)
+    while offset < len(buf):
+        usecs, rssi_, verb, seqn, a0, a1, a2, code, length = unpack_from(buf, offset)
+        offset += rec_size + length
+
+        if start_usecs is not None and usecs < start_usecs:
+            continue
+        if end_usecs is not None and usecs >= end_usecs:
+            break
+
+        if (rssi := rssis.get(rssi_)) is None:
+            rssi = rssis[rssi_] = rssi_.decode()
+        payload = buf[offset - length : offset]
+        dtm = _EPOCH + td(0, 0, usecs)  # faster than td(microseconds=usecs)
+
+        if verb == _RAW_FRAME:
+            yield dtm, rssi, bytes(payload).decode("ascii")
+            continue
+
+        if (code_ := codes.get(code)) is None:
+            code_ = codes[code] = f"{code:04X}"
+        if (len_ := lengths.get(length)) is None:
+            len_ = lengths[length] = f"{length:03d}"
+
+        yield (
+            dtm,
+            rssi,
+            (
+                _VERBS[verb],
+                "---" if seqn == _NO_SEQN else f"{seqn:03d}",
+                addr_set(a0 + a1 + a2),
+                code_,
+                len_,
+                payload.hex().upper(),
+            ),
+        )
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Compressed packet logs, stored as seekable blocks.
+
+A compressed packet log is a gzip file of several members (blocks), each of which
+holds the packets of a fixed period of time (e.g. 10 minutes). Such a file can be read
+by any gzip tool (e.g. zcat), but it also has a sidecar index of the start time,
+offset & length of each block, so that only the blocks that overlap a time window need
+be read and decompressed.
+
+Packet logs are compressed as they are rotated, see: set_pkt_logging(compress_mins=...).
+This is done by the (queued) packet log's writer thread, as it can take a while.
+"""
+
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime as dt, timedelta as td
+from io import TextIOWrapper
+from typing import Final
+
+DEFAULT_BLOCK_MINS: Final[int] = 10  # minutes of packets per (compressed) block
+
+GZIP_SUFFIX: Final = ".gz"
+INDEX_SUFFIX: Final = ".idx"  # the sidecar index, e.g. packet.log.2024-01-01.gz.idx
+
+_FrameT = tuple[str, str]  # dtm_str, frame
+
+_NO_DTM: Final = "0000-00-00T00:00:00.000000"  # for a block without any packets
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _dtm_key(dtm_str: str) -> str:
+    """Return a dtm_str that can be compared with others (some logs use a space)."""
+    return dtm_str if dtm_str[10:11] != " " else f"{dtm_str[:10]}T{dtm_str[11:]}"
+
+
+def _dtm_bound(dtm: dt | str | None) -> str | None:
+    """Return a time window bound as a comparable dtm_str (or None if unbounded)."""
+    if dtm is None:
+        return None
+    if isinstance(dtm, str):
+        dtm = dt.fromisoformat(dtm)
+    return dtm.isoformat(timespec="microseconds")
+
+
+def compress_packet_log(
+    source: str, dest: str, /, *, block_mins: int = DEFAULT_BLOCK_MINS
+) -> None:
+    """Compress a (plain text) packet log into blocks, and create its sidecar index.
+
+    Each block holds the packets of block_mins minutes (aligned to the hour). Comments
+    and other lines that don't start with a dtm are kept with the preceding packet.
+    """
+
+    block_secs = block_mins * 60
+
+    def block_bounds(dtm_str: str) -> tuple[str, str]:
+        """Return the (aligned) start & (exclusive) end of the block with this dtm."""
+        dtm = dt.fromisoformat(dtm_str[:19])
+        start = dtm.replace(minute=0, second=0) + td(
+            seconds=(dtm.minute * 60 + dtm.second) // block_secs * block_secs
+        )
+        return (
+            start.isoformat(timespec="microseconds"),
+            (start + td(seconds=block_secs)).isoformat(timespec="microseconds"),
+        )
+
+    with (
+        open(source, encoding="utf-8") as src,
+        open(dest, "wb") as dst,
+        open(dest + INDEX_SUFFIX, "w") as idx,
+    ):
+        lines: list[str] = []
+        start_dtm = end_dtm = ""
+
+        def write_block() -> None:
+            data = gzip.compress("".join(lines).encode("utf-8"))
+            idx.write(f"{start_dtm or _NO_DTM} {dst.tell()} {len(data)}\n")
+            dst.write(data)
+
+        for line in src:
+            if not line[:4].isdigit():  # not a packet, e.g. a comment
+                lines.append(line)
+                continue
+
+            dtm_str = _dtm_key(line[:26])
+
+            if not start_dtm:
+                start_dtm, end_dtm = block_bounds(dtm_str)
+            if dtm_str < end_dtm:  # is in the same block
+                lines.append(line)
+                continue
+
+            write_block()
+            lines = [line]
+            start_dtm, end_dtm = block_bounds(dtm_str)
+
+        if lines:
+            write_block()
+
+
+def packet_log_rotator(
+    block_mins: int = DEFAULT_BLOCK_MINS,
+) -> Callable[[str, str], None]:
+    """Return a rotator for a RotatingFileHandler (of a packet log) that compresses it.
+
+    The handler's namer should add GZIP_SUFFIX to the rotated file name.
+    """
+
+    def rotator(source: str, dest: str) -> None:
+        compress_packet_log(source, dest, block_mins=block_mins)
+        os.remove(source)
+
+    return rotator
+
+
+def _read_index(file_name: str) -> list[tuple[str, int, int]]:
+    """Return the blocks of a compressed packet log as (start_dtm, offset, length)."""
+
+    with open(file_name + INDEX_SUFFIX) as f:
+        return [
+            (dtm_str, int(offset), int(length))
+            for dtm_str, offset, length in (ln.split() for ln in f if ln.strip())
+        ]
+
+
+def _lines_to_frames(lines: Iterable[str]) -> Iterator[_FrameT]:
+    for dtm_pkt_line in lines:
+        # can be blank lines in annotated log files
+        if (dtm_pkt_line := dtm_pkt_line.strip()) and dtm_pkt_line[:1] != "#":
+            yield dtm_pkt_line[:26], dtm_pkt_line[27:]
+
+
+def filter_frames(
+    frames: Iterable[_FrameT],
+    /,
+    *,
+    start: dt | str | None = None,
+    end: dt | str | None = None,
+) -> Iterator[_FrameT]:
+    """Yield only the frames that are within the time window: start <= dtm < end.
+
+    Assumes the frames are in dtm order, so will stop at the first frame after end.
+    """
+
+    start_str, end_str = _dtm_bound(start), _dtm_bound(end)
+
+    for dtm_str, frame in frames:
+        dtm_key = _dtm_key(dtm_str)
+        if end_str and dtm_key >= end_str:
+            break
+        if not start_str or dtm_key >= start_str:
+            yield dtm_str, frame
+
+
+def _block_frames(
+    file_name: str, start: str | None, end: str | None
+) -> Iterator[_FrameT]:
+    """Yield the frames of only those blocks that overlap the time window."""
+
+    blocks = _read_index(file_name)
+
+    with open(file_name, "rb") as f:
+        for i, (start_dtm, offset, length) in enumerate(blocks):
+            if end and start_dtm >= end:
+                break
+            if start and i + 1 < len(blocks) and blocks[i + 1][0] <= start:
+                continue  # the next block starts before the window, so skip this one
+
+            f.seek(offset)
+            text = gzip.decompress(f.read(length)).decode("utf-8")
+            yield from _lines_to_frames(text.splitlines())
+
+
+def packet_log_frames(
+    pkt_log: TextIOWrapper | str,
+    /,
+    *,
+    start: dt | str | None = None,
+    end: dt | str | None = None,
+) -> Iterator[_FrameT]:
+    """Yield the (dtm_str, frame) pairs of a packet log that are within a time window.
+
+    If the packet log is compressed and has a sidecar index, then only the relevant
+    blocks are read, otherwise the entire log is scanned (up to the end of the window).
+    """
+
+    file_name = pkt_log if isinstance(pkt_log, str) else getattr(pkt_log, "name", "")
+
+    frames: Iterable[_FrameT]
+
+    if isinstance(file_name, str) and os.path.isfile(file_name + INDEX_SUFFIX):
+        frames = _block_frames(file_name, _dtm_bound(start), _dtm_bound(end))
+
+    elif isinstance(pkt_log, str):  # a file name, rather than an open file
+        opener = gzip.open if pkt_log.endswith(GZIP_SUFFIX) else open
+        with opener(pkt_log, "rt", encoding="utf-8") as f:
+            yield from filter_frames(_lines_to_frames(f), start=start, end=end)
+        return
+
+    else:
+        frames = _lines_to_frames(pkt_log)
+
+    yield from filter_frames(frames, start=start, end=end)
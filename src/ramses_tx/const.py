@@ -17,7 +17,10 @@ DEFAULT_WAIT_FOR_REPLY: Final[bool | None] = None
 
 DEFAULT_ECHO_TIMEOUT: Final[float] = 0.50  # waiting for echo pkt after cmd sent
 DEFAULT_RPLY_TIMEOUT: Final[float] = 0.50  # waiting for reply pkt after echo pkt rcvd
+DEFAULT_RPLY_CACHE_TTL: Final[float] = 0  # answer an RQ from a reply this recent
 DEFAULT_BUFFER_SIZE: Final[int] = 32
+DEFAULT_COALESCE_RQS: Final[bool] = False  # if True, identical RQs share a Tx
+DEFAULT_MAX_IN_FLIGHT: Final[int] = 1  # if > 1, cmds to different dsts are pipelined
 
 DEFAULT_SEND_TIMEOUT: Final[float] = 20.0  # total waiting for successful send: FIXME
 MAX_SEND_TIMEOUT: Final[float] = 20.0  # for a command to be sent, incl. queuing time
@@ -7,6 +7,8 @@ Provide the base class for commands (constructed/sent packets) and packets.
 from __future__ import annotations
 
 import logging
+import sys
+from collections.abc import Callable
 from typing import TYPE_CHECKING
 
 from . import exceptions as exc
@@ -51,6 +53,29 @@ HeaderT = str
 PayloadT = str
 _PktIdxT = str
 
+# verb, seqn, the address fragment (all three), code, length and payload
+FrameFieldsT = tuple[str, str, str, str, str, str]
+
+
+# these are precomputed, so that deriving a pkt's idx/ctx is mostly dict/set lookups
+_CTL_TYPES: frozenset[str] = frozenset(
+    (DEV_TYPE_MAP.CTL, DEV_TYPE_MAP.UFC, DEV_TYPE_MAP.PRG)
+)
+_DTS_TYPES: frozenset[str] = frozenset((DEV_TYPE_MAP.DTS, DEV_TYPE_MAP.DT2))
+
+_CODES_HAS_CTL: frozenset[Code] = frozenset(
+    CODES_ONLY_FROM_CTL + (Code._31D9, Code._31DA)
+)
+_DOMAIN_IDS: frozenset[str] = frozenset((F8, F9, FA, FC))  # TODO: F6, F7?, FB, FD
+
+# CODE_IDX_ARE_NONE, where a payload is expected to start with 00, by (code, verb)
+_IDX_NONE_IS_00: frozenset[tuple[Code, VerbT]] = frozenset(
+    (code, verb)
+    for code in CODE_IDX_ARE_NONE
+    for verb in (I_, RQ, RP, W_)
+    if CODES_SCHEMA[code].get(verb, "")[:3] == "^00"
+)
+
 
 class Frame:
     """The Frame class - used as a base by the Command and Packet classes.
@@ -58,41 +83,58 @@ class Frame:
     `RQ --- 01:078710 10:067219 --:------ 3220 005 0000050000`
     """
 
+    # NOTE: subclasses (e.g. Command) that don't define __slots__ will have a __dict__
+    __slots__ = (
+        "_frame",
+        "verb",
+        "seqn",
+        "code",
+        "len_",
+        "payload",
+        "_len",
+        "src",
+        "dst",
+        "_addrs",
+        "_ctx_",
+        "_hdr_",
+        "_idx_",
+        "_has_array_",
+        "_has_ctl_",
+        "_has_payload_",
+        "_repr",
+    )
+
     src: Address  # Address | Device
     dst: Address  # Address | Device
     _addrs: tuple[Address, Address, Address]
 
-    def __init__(self, frame: str) -> None:
+    def __init__(self, frame: str, fields: FrameFieldsT | None = None) -> None:
         """Create a frame from a string.
 
+        If its fields are given, they must be as returned by _tokenize() (e.g. they
+        are from a packet archive), and the frame is not tokenized again.
+
         Will raise InvalidPacketError if it is invalid.
         """
 
         self._frame: str = frame
-        if not COMMAND_REGEX.match(self._frame):
-            raise exc.PacketInvalid(f"Bad frame: invalid structure: >>>{frame}<<<")
+        verb, seqn, addr_fragment, code, len_, payload = fields or _tokenize(frame)
 
-        fields = frame.lstrip().split(" ")
-
-        self.verb: VerbT = frame[:2]  # type: ignore[assignment]
-        self.seqn: str = fields[1]  # . frame[3:6]
-        self.code: Code = fields[5]  # type: ignore[assignment]
-        self.len_: str = fields[6]  # . frame[42:45]  FIXME: len_, _len & len(payload)/2
-        self.payload: PayloadT = fields[7]  # frame[46:].split(" ")[0]
-        self._len: int = int(len(self.payload) / 2)
+        # these have few distinct values, so are interned (shared) to save memory
+        self.verb: VerbT = sys.intern(verb)  # type: ignore[assignment]
+        self.seqn: str = sys.intern(seqn)
+        self.code: Code = sys.intern(code)  # type: ignore[assignment]
+        self.len_: str = sys.intern(len_)  # FIXME: len_, _len...
+        self.payload: PayloadT = payload
+        self._len: int = len(payload) // 2
 
         try:
-            self.src, self.dst, *self._addrs = pkt_addrs(  # type: ignore[assignment]
-                " ".join(fields[i] for i in range(2, 5))  # frame[7:36]
-            )
+            addrs = pkt_addrs(addr_fragment)
         except exc.PacketInvalid as err:  # will be: InvalidAddrSetError
             raise exc.PacketInvalid("Bad frame: invalid address set") from err
 
-        if len(self.payload) != int(self.len_) * 2:
-            raise exc.PacketInvalid(
-                f"Bad frame: invalid payload: "
-                f"len({self.payload}) is not int('{self.len_}' * 2))"
-            )
+        self.src, self.dst = addrs[0], addrs[1]
+        self._addrs = (addrs[2], addrs[3], addrs[4])
 
         self._ctx_: bool | str = None  # type: ignore[assignment]
         self._hdr_: str = None  # type: ignore[assignment]
@@ -111,18 +153,12 @@ class Frame:
         Raise an exception InvalidPacketError (InvalidAddrSetError) if it is not valid.
         """
 
-        if len(self._frame[46:].split(" ")[0]) != int(self._frame[42:45]) * 2:
-            raise exc.PacketInvalid("Bad frame: Payload length mismatch")
-
-        try:
-            # self.src, self.dst, *self._addrs = pkt_addrs(self._frame[7:36])
-            src, dst, *addrs = pkt_addrs(self._frame[7:36])
-        except exc.PacketInvalid as err:  # will be: InvalidAddrSetError
-            raise exc.PacketInvalid("Bad frame: Invalid address set") from err
-
+        # the payload length & address set were validated by _tokenize() & pkt_addrs()
         if not strict_checking:
             return
 
+        src, dst, addrs = self.src, self.dst, self._addrs
+
         try:  # Strict checking: helps users avoid to constructing bad commands
             if addrs[0] == NON_DEV_ADDR:
                 assert self.verb == I_, "wrong verb or dst addr should be present"
@@ -253,43 +289,34 @@ class Frame:
 
         # TODO: handle RQ/RP to/from HGI/RFG, handle HVAC
 
-        if {self.src.type, self.dst.type} & {  # type: ignore[unreachable]
-            DEV_TYPE_MAP.CTL,
-            DEV_TYPE_MAP.UFC,
-            DEV_TYPE_MAP.PRG,
-        }:  # DEX
-            _LOGGER.debug(f"{self} # HAS controller (10)")
+        if (  # type: ignore[unreachable]
+            self.src.type in _CTL_TYPES or self.dst.type in _CTL_TYPES
+        ):  # DEX
+            _LOGGER.debug("%s # HAS controller (10)", self)
             self._has_ctl_ = True
 
         # .I --- 12:010740 --:------ 12:010740 30C9 003 0008D9 # not ctl
         elif self.dst is self.src:  # (not needed?) & self.code == I_:
             _LOGGER.debug(
-                f"{self} < "
-                + (
-                    "HAS"
-                    if self.code in CODES_ONLY_FROM_CTL + (Code._31D9, Code._31DA)
-                    else "no"
-                )
-                + " controller (20)"
+                "%s < %s controller (20)",
+                self,
+                "HAS" if self.code in _CODES_HAS_CTL else "no",
             )
-            self._has_ctl_ = any(
-                (
-                    self.code == Code._3B00 and self.payload[:2] == FC,
-                    self.code in CODES_ONLY_FROM_CTL + (Code._31D9, Code._31DA),
-                )
+            self._has_ctl_ = self.code in _CODES_HAS_CTL or (
+                self.code == Code._3B00 and self.payload[:2] == FC
             )
 
         # .I --- --:------ --:------ 10:050360 1FD4 003 002ABE # no ctl
         # .I 095 --:------ --:------ 12:126457 1F09 003 000BC2 # HAS ctl
         # .I --- --:------ --:------ 20:001473 31D9 003 000001 # ctl? (HVAC)
         elif self.dst.id == NON_DEV_ADDR.id:
-            _LOGGER.debug(f"{self} # HAS controller (21)")
+            _LOGGER.debug("%s # HAS controller (21)", self)
             self._has_ctl_ = self.src.type != DEV_TYPE_MAP.OTB  # DEX
 
         # .I --- 10:037879 --:------ 12:228610 3150 002 0000   # HAS ctl
         # .I --- 04:029390 --:------ 12:126457 1060 003 01FF01 # HAS ctl
-        elif self.dst.type in (DEV_TYPE_MAP.DTS, DEV_TYPE_MAP.DT2):  # DEX
-            _LOGGER.debug(f"{self} # HAS controller (22)")
+        elif self.dst.type in _DTS_TYPES:  # DEX
+            _LOGGER.debug("%s # HAS controller (22)", self)
             self._has_ctl_ = True
 
         # RQ --- 30:258720 10:050360 --:------ 3EF0 001 00           # UNKNOWN (99)
@@ -414,6 +441,54 @@ class Frame:
         return self._idx_
 
 
+def _tokenize(frame: str) -> FrameFieldsT:
+    """Validate a frame, and return its fields (as slices at their fixed offsets).
+
+    `RQ --- 01:078710 10:067219 --:------ 3220 005 0000050000`
+
+    Returns verb, seqn, the address fragment (all three), code, length and payload.
+
+    Will raise InvalidPacketError if it is invalid.
+    """
+
+    if not COMMAND_REGEX.match(frame):
+        raise exc.PacketInvalid(f"Bad frame: invalid structure: >>>{frame}<<<")
+
+    len_, payload = frame[42:45], frame[46:]
+    if len(payload) != int(len_) * 2:
+        raise exc.PacketInvalid(
+            f"Bad frame: invalid payload: len({payload}) is not int('{len_}' * 2))"
+        )
+
+    return frame[:2], frame[3:6], frame[7:36], frame[37:41], len_, payload
+
+
+def _idx_000C(pkt: Frame) -> str:  # zone_idx/domain_id (complex, payload[0:4])
+    if pkt.payload[2:4] == DEV_ROLE_MAP.APP:  # "000F"
+        return str(FC)  # mypy
+    if pkt.payload[0:4] == f"01{DEV_ROLE_MAP.HTG}":  # "010E"
+        return str(F9)  # mypy
+    if pkt.payload[2:4] in (
+        DEV_ROLE_MAP.DHW,
+        DEV_ROLE_MAP.HTG,
+    ):  # "000D", "000E"
+        return str(FA)  # mypy
+    return pkt.payload[:2]
+
+
+# the idx of these codes is not (simply) payload[:2]
+_IDX_COMPLEX: dict[Code, Callable[[Frame], None | bool | str]] = {
+    Code._0005: lambda pkt: pkt._has_array,
+    Code._000C: _idx_000C,
+    # assumes only 1 DHW zone (can be 2, but never seen)
+    Code._0404: lambda pkt: "HW" if pkt.payload[2:4] == "23" else pkt.payload[:2],
+    Code._0418: lambda pkt: pkt.payload[4:6],  # log_idx (payload[4:6])
+    # TODO; can do in parser
+    Code._1100: lambda pkt: pkt.payload[:2] if pkt.payload[:1] == "F" else False,
+    Code._3220: lambda pkt: pkt.payload[4:6],  # msg_id/data_id (payload[4:6])
+}
+
+
 # TODO: a mess - has false negatives
 def _pkt_idx(pkt: Frame) -> None | bool | str:  # _has_array, _has_ctl
     """Return the payload's 2-byte context (e.g. zone_idx, domain_id or log_idx).
@@ -427,47 +502,20 @@ def _pkt_idx(pkt: Frame) -> None | bool | str:  # _has_array, _has_ctl
 
     # FIXME: 0016 is broken
 
-    # mutex 2/4, CODE_IDX_COMPLEX: are not payload[:2]
-    if pkt.code == Code._0005:
-        return pkt._has_array
-
     # .I --- 10:040239 01:223036 --:------ 0009 003 000000
     if pkt.code == Code._0009 and pkt.src.type == DEV_TYPE_MAP.OTB:  # DEX
         return False
 
-    if pkt.code == Code._000C:  # zone_idx/domain_id (complex, payload[0:4])
-        if pkt.payload[2:4] == DEV_ROLE_MAP.APP:  # "000F"
-            return str(FC)  # mypy
-        if pkt.payload[0:4] == f"01{DEV_ROLE_MAP.HTG}":  # "010E"
-            return str(F9)  # mypy
-        if pkt.payload[2:4] in (
-            DEV_ROLE_MAP.DHW,
-            DEV_ROLE_MAP.HTG,
-        ):  # "000D", "000E"
-            return str(FA)  # mypy
-        return pkt.payload[:2]
-
-    if pkt.code == Code._0404:  # assumes only 1 DHW zone (can be 2, but never seen)
-        return "HW" if pkt.payload[2:4] == "23" else pkt.payload[:2]
-
-    if pkt.code == Code._0418:  # log_idx (payload[4:6])
-        return pkt.payload[4:6]
-
-    if pkt.code == Code._1100:  # TODO; can do in parser
-        return pkt.payload[:2] if pkt.payload[:1] == "F" else False  # only FC
-
-    if pkt.code == Code._3220:  # msg_id/data_id (payload[4:6])
-        return pkt.payload[4:6]
+    # mutex 2/4, CODE_IDX_COMPLEX: are not payload[:2]
+    if idx_fnc := _IDX_COMPLEX.get(pkt.code):
+        return idx_fnc(pkt)
 
     if pkt.code in CODE_IDX_ARE_COMPLEX:  # these should be handled above
         raise NotImplementedError(f"{pkt} # CODE_IDX_COMPLEX")  # a coding error
 
     # mutex 1/4, CODE_IDX_NONE: always returns False
     if pkt.code in CODE_IDX_ARE_NONE:  # returns False
-        if (
-            CODES_SCHEMA[pkt.code].get(pkt.verb, "")[:3] == "^00"
-            and pkt.payload[:2] != "00"
-        ):
+        if (pkt.code, pkt.verb) in _IDX_NONE_IS_00 and pkt.payload[:2] != "00":
             raise exc.PacketPayloadInvalid(
                 f"Packet idx is {pkt.payload[:2]}, but expecting no idx (00) (0xAA)"
             )
@@ -478,7 +526,7 @@ def _pkt_idx(pkt: Frame) -> None | bool | str:  # _has_array, _has_ctl
         return True  # excludes len==1 for 000A, 2309, 30C9
 
     # TODO: is this needed?: exceptions to CODE_IDX_SIMPLE
-    if pkt.payload[:2] in (F8, F9, FA, FC):  # TODO: F6, F7?, FB, FD
+    if pkt.payload[:2] in _DOMAIN_IDS:
         if pkt.code not in CODE_IDX_DOMAIN:
             raise exc.PacketPayloadInvalid(
                 f"Packet idx is {pkt.payload[:2]}, but not expecting a domain id"
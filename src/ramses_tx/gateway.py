@@ -19,10 +19,13 @@ from typing import TYPE_CHECKING, Any, Never
 from .address import ALL_DEV_ADDR, HGI_DEV_ADDR, NON_DEV_ADDR
 from .command import Command
 from .const import (
+    DEFAULT_COALESCE_RQS,
     DEFAULT_DISABLE_QOS,
     DEFAULT_GAP_DURATION,
+    DEFAULT_MAX_IN_FLIGHT,
     DEFAULT_MAX_RETRIES,
     DEFAULT_NUM_REPEATS,
+    DEFAULT_RPLY_CACHE_TTL,
     DEFAULT_SEND_TIMEOUT,
     DEFAULT_WAIT_FOR_REPLY,
     SZ_ACTIVE_HGI,
@@ -30,14 +33,21 @@ from .const import (
 )
 from .message import Message
 from .packet import Packet
+from .parsers import PAYLOAD_CACHE
 from .protocol import protocol_factory
 from .schemas import (
+    SZ_COALESCE_RQS,
     SZ_DISABLE_QOS,
     SZ_DISABLE_SENDING,
     SZ_ENFORCE_KNOWN_LIST,
+    SZ_LAZY_DECODING,
+    SZ_MAX_IN_FLIGHT,
     SZ_PACKET_LOG,
+    SZ_PAYLOAD_CACHE,
     SZ_PORT_CONFIG,
     SZ_PORT_NAME,
+    SZ_REPLAY_BATCH_SIZE,
+    SZ_RPLY_CACHE_TTL,
     PktLogConfigT,
     PortConfigT,
     select_device_filter_mode,
@@ -113,6 +123,12 @@ class Engine:
             self._include,
             self._exclude,
         )
+        if (payload_cache := kwargs.pop(SZ_PAYLOAD_CACHE, None)) is not None:
+            PAYLOAD_CACHE.enabled = payload_cache  # NOTE: is process-wide, see: docs
+
+        # also used to restore cached packets, i.e. after start() has reset _kwargs
+        self._replay_batch_size: int | None = kwargs.pop(SZ_REPLAY_BATCH_SIZE, None)
+
         self._kwargs: dict[str, Any] = kwargs  # HACK
 
         self._engine_lock = Lock()  # FIXME: threading lock, or asyncio lock?
@@ -150,11 +166,18 @@ class Engine:
 
         self._protocol = protocol_factory(
             msg_handler,
+            coalesce_rqs=self._kwargs.pop(SZ_COALESCE_RQS, None)
+            or DEFAULT_COALESCE_RQS,
             disable_sending=self._disable_sending,
             disable_qos=self._kwargs.pop(SZ_DISABLE_QOS, DEFAULT_DISABLE_QOS),
             enforce_include_list=self._enforce_known_list,
             exclude_list=self._exclude,
             include_list=self._include,
+            lazy_decoding=bool(self._kwargs.pop(SZ_LAZY_DECODING, None)),
+            max_in_flight=self._kwargs.pop(SZ_MAX_IN_FLIGHT, None)
+            or DEFAULT_MAX_IN_FLIGHT,
+            reply_cache_ttl=self._kwargs.pop(SZ_RPLY_CACHE_TTL, None)
+            or DEFAULT_RPLY_CACHE_TTL,
         )
 
     def add_msg_handler(
@@ -190,6 +213,7 @@ class Engine:
             pkt_source[SZ_PORT_CONFIG] = self._port_config
         else:  # if self._input_file:
             pkt_source[SZ_PACKET_LOG] = self._input_file  # io.TextIOWrapper
+            pkt_source[SZ_REPLAY_BATCH_SIZE] = self._replay_batch_size
 
         # incl. await protocol.wait_for_connection_made(timeout=5)
         self._transport = await transport_factory(
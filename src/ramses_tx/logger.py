@@ -8,14 +8,21 @@ from __future__ import annotations
 
 import logging
 import os
+import queue
 import re
 import shutil
 import sys
+import threading
 from collections.abc import Callable, Mapping
 from datetime import datetime as dt
-from logging.handlers import TimedRotatingFileHandler as _TimedRotatingFileHandler
-from typing import Any
-
+from logging.handlers import (
+    RotatingFileHandler,
+    TimedRotatingFileHandler as _TimedRotatingFileHandler,
+)
+from time import perf_counter
+from typing import Any, Final
+
+from .compressed_log import GZIP_SUFFIX, INDEX_SUFFIX, packet_log_rotator
 from .version import VERSION
 
 DEV_MODE = False
@@ -50,6 +57,14 @@ PKT_LOG_FMT = "%(asctime)s%(frame)s"
 BANDW_SUFFIX = "%(message)s%(error_text)s%(comment)s"
 COLOR_SUFFIX = "%(yellow)s%(message)s%(red)s%(error_text)s%(cyan)s%(comment)s"
 
+# Policies for when the queue of an asynchronous packet log writer is full
+DROP_NEWEST: Final = "drop_newest"  # discard the record being logged (the default)
+DROP_OLDEST: Final = "drop_oldest"  # discard the oldest record still in the queue
+BLOCK: Final = "block"  # wait for the writer thread (i.e. apply backpressure)
+
+DEFAULT_QUEUE_SIZE: Final[int] = 10_000  # records
+_WRITE_BATCH_SIZE: Final[int] = 500  # max records written between flushes
+
 # How to strip ASCII colour from a text file:
 #   sed -r "s/\x1B\[(([0-9]{1,2})?(;)?([0-9]{1,2})?)?[m,K,H,f,J]//g" file_name
 
@@ -167,7 +182,7 @@ class TimedRotatingFileHandler(_TimedRotatingFileHandler):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
         assert self.when == "MIDNIGHT"
-        self.extMatch = re.compile(r"^\d{4}-\d{2}-\d{2}$", re.ASCII)
+        self.extMatch = re.compile(r"^\d{4}-\d{2}-\d{2}(\.gz)?$", re.ASCII)
 
     # def emit(self, record):  # used only for debugging
     #     if True or self.shouldRollover(record):
@@ -188,6 +203,8 @@ class TimedRotatingFileHandler(_TimedRotatingFileHandler):
         for fileName in fileNames:
             if fileName[:plen] == prefix:
                 suffix = fileName[plen:]
+                if suffix.endswith(INDEX_SUFFIX):  # is not a backup, see below
+                    continue
                 if self.extMatch.match(suffix):
                     result.append(os.path.join(dirName, fileName))
         if len(result) < self.backupCount:
@@ -195,9 +212,157 @@ class TimedRotatingFileHandler(_TimedRotatingFileHandler):
         else:
             result.sort()
             result = result[: len(result) - self.backupCount]
+
+        for fileName in fileNames:  # the sidecar index of any deleted (or missing) log
+            if fileName[:plen] == prefix and fileName.endswith(INDEX_SUFFIX):
+                log_file = os.path.join(dirName, fileName[: -len(INDEX_SUFFIX)])
+                if log_file in result or not os.path.isfile(log_file):
+                    result.append(log_file + INDEX_SUFFIX)
         return result
 
 
+class QueuedPktLogHandler(logging.Handler):
+    """A handler that writes packet log records to a file, using a writer thread.
+
+    Records are queued, so logging a packet never blocks on file I/O. The writer thread
+    drains the queue in batches, writing each batch before flushing the file once.
+
+    The queue is bounded: when it is full, records are dropped as per on_queue_full.
+    """
+
+    def __init__(
+        self,
+        handler: logging.StreamHandler,  # type: ignore[type-arg]
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        on_queue_full: str = DROP_NEWEST,
+    ) -> None:
+        super().__init__()
+
+        if on_queue_full not in (DROP_NEWEST, DROP_OLDEST, BLOCK):
+            raise ValueError(f"Invalid policy for a full queue: {on_queue_full}")
+
+        self._handler = handler  # the handler that does the actual writing
+        self._queue: queue.Queue[logging.LogRecord | None] = queue.Queue(queue_size)
+        self._on_queue_full = on_queue_full
+
+        self._num_written = 0
+        self._num_dropped = 0
+        self._max_queue_depth = 0
+        self._last_flush_latency = 0.0  # secs, to write & flush the last batch
+        self._max_flush_latency = 0.0
+
+        self._writer = threading.Thread(
+            target=self._write_records, name=self.__class__.__name__, daemon=True
+        )
+        self._writer.start()
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Return the queue depth, flush latency and the number of records dropped."""
+
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self._max_queue_depth,
+            "num_written": self._num_written,
+            "num_dropped": self._num_dropped,
+            "last_flush_latency": self._last_flush_latency,
+            "max_flush_latency": self._max_flush_latency,
+        }
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Queue the record for the writer thread (the record is formatted there)."""
+
+        try:
+            self._queue.put_nowait(record)
+
+        except queue.Full:
+            if self._on_queue_full == BLOCK:
+                self._queue.put(record)
+            else:
+                self._drop(record)
+
+        self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+
+    def _drop(self, record: logging.LogRecord) -> None:
+        """Drop a record (either this one, or the oldest queued), as the queue is full."""
+
+        if not self._num_dropped:
+            _LOGGER.warning("Packet log queue is full, records are being dropped")
+        self._num_dropped += 1
+
+        if self._on_queue_full != DROP_OLDEST:
+            return
+
+        try:
+            self._queue.get_nowait()
+            self._queue.task_done()
+        except queue.Empty:
+            pass
+        self._queue.put_nowait(record)  # NOTE: emit() is serialised by self.lock
+
+    def _write_records(self) -> None:
+        """Write the queued records in batches, until the handler is closed."""
+
+        while True:
+            records = [self._queue.get()]
+            while len(records) < _WRITE_BATCH_SIZE:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            closing = None in records
+            self._write_batch([r for r in records if r is not None])
+
+            for _ in records:
+                self._queue.task_done()
+            if closing:
+                return
+
+    def _write_batch(self, records: list[logging.LogRecord]) -> None:
+        """Write a batch of records, and then flush the file (i.e. only once)."""
+
+        handler = self._handler
+        t0 = perf_counter()
+
+        handler.acquire()
+        try:
+            for record in records:
+                try:  # as per StreamHandler.emit(), but without the flush
+                    if isinstance(
+                        handler, RotatingFileHandler | _TimedRotatingFileHandler
+                    ):
+                        if handler.shouldRollover(record):
+                            handler.doRollover()
+                    handler.stream.write(handler.format(record) + handler.terminator)
+                except Exception:
+                    handler.handleError(record)
+                else:
+                    self._num_written += 1
+            handler.flush()
+        finally:
+            handler.release()
+
+        self._last_flush_latency = perf_counter() - t0
+        self._max_flush_latency = max(self._max_flush_latency, self._last_flush_latency)
+
+    def flush(self) -> None:
+        """Wait until all the queued records have been written to the file."""
+
+        if self._writer.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Write any queued records, then stop the writer thread and close the file."""
+
+        if self._writer.is_alive():
+            self._queue.put(None)  # the sentinel, will be written after all others
+            self._writer.join()
+
+        self._handler.close()
+        super().close()
+
+
 def getLogger(  # permits a bespoke Logger class
     name: str | None = None, pkt_log: bool = False
 ) -> logging.Logger:
@@ -255,6 +420,9 @@ def set_pkt_logging(
     file_name: str | None = None,
     rotate_backups: int = 0,
     rotate_bytes: int | None = None,
+    queue_size: int | None = None,
+    on_queue_full: str = DROP_NEWEST,
+    compress_mins: int | None = None,
 ) -> None:
     """Create/configure handlers, formatters, etc.
 
@@ -262,6 +430,10 @@ def set_pkt_logging(
     - file_name:      base of file to store packet logs in, from root
     - rotate_backups: keep this many copies, and rotate at midnight unless:
     - rotate_bytes:   rotate log files when log > rotate_size
+    - queue_size:     if set, write to the file via a queue & a writer thread
+    - on_queue_full:  drop_newest, drop_oldest, or block (if the queue is full)
+    - compress_mins:  compress the (midnight) rotated logs, in blocks of N minutes
+                      (implies a queue_size, so logs are compressed by the writer)
     """
 
     logger.propagate = False  # log file is distinct from any app/debug logging
@@ -270,8 +442,13 @@ def set_pkt_logging(
     # as set_pkt_logging() may be called several times: to avoid duplicates in logs...
     for handler in logger.handlers:  # dont use logger.hasHandlers() as not propagating
         logger.removeHandler(handler)
+        if isinstance(handler, QueuedPktLogHandler):
+            handler.close()  # else its writer thread would be left running
 
     if file_name:  # note: this opens the packet_log file IO and may block
+        if compress_mins and (rotate_bytes or not rotate_backups):
+            _LOGGER.warning("Only logs rotated at midnight are compressed")
+
         if rotate_bytes:
             rotate_backups = rotate_backups or 2
             handler = logging.handlers.RotatingFileHandler(
@@ -281,12 +458,22 @@ def set_pkt_logging(
             handler = TimedRotatingFileHandler(
                 file_name, when="MIDNIGHT", backupCount=rotate_backups
             )
+            if compress_mins:  # e.g. packet.log.2024-01-01.gz (& its .idx)
+                handler.namer = lambda name: name + GZIP_SUFFIX
+                handler.rotator = packet_log_rotator(block_mins=compress_mins)
+                # compressing a day's log would otherwise block the event loop
+                queue_size = queue_size or DEFAULT_QUEUE_SIZE
         else:
             handler = logging.FileHandler(file_name)
 
         logfile_fmt = Formatter(fmt=PKT_LOG_FMT + BANDW_SUFFIX)
-
         handler.setFormatter(logfile_fmt)
+
+        if queue_size:  # the file handler is then used only by the writer thread
+            handler = QueuedPktLogHandler(
+                handler, queue_size=queue_size, on_queue_full=on_queue_full
+            )
+
         handler.setLevel(logging.INFO)  # .INFO (usually), or .DEBUG
         handler.addFilter(PktLogFilter())  # record.levelno in (.INFO, .WARNING)
         logger.addHandler(handler)
@@ -3,11 +3,11 @@
 
 from __future__ import annotations
 
+import contextlib
 import logging
 import re
 from datetime import datetime as dt, timedelta as td
-from functools import lru_cache
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Final
 
 from . import exceptions as exc
 from .address import Address
@@ -44,6 +44,51 @@ MSG_FORMAT_10 = "|| {:10s} | {:10s} | {:2s} | {:16s} | {:^4s} || {}"
 
 _TD_SECS_003 = td(seconds=3)
 
+_NOT_PARSED: Final = object()  # sentinel for a (lazy) payload that is yet to be parsed
+
+# used by Message._idx (precomputed, as it is called for every msg)
+_IDX_NAMES: Final[dict[Code, str]] = {
+    Code._0002: "other_idx",  # non-evohome: hometronics
+    Code._10A0: SZ_DHW_IDX,  # can be 2 DHW zones per system, albeit unusual
+    Code._1260: SZ_DHW_IDX,  # can be 2 DHW zones per system, albeit unusual
+    Code._1F41: SZ_DHW_IDX,  # can be 2 DHW zones per system, albeit unusual
+    Code._22C9: SZ_UFH_IDX,  # UFH circuit
+    Code._2389: "other_idx",  # anachronistic
+    Code._2D49: "other_idx",  # non-evohome: hometronics
+    Code._31D9: "hvac_id",
+    Code._31DA: "hvac_id",
+    Code._3220: "msg_id",
+}  # ALSO: SZ_DOMAIN_ID, SZ_ZONE_IDX
+
+# codes that (in this context) never have an idx
+_IDX_NONE: Final[frozenset[Code]] = frozenset(
+    CODE_IDX_ARE_COMPLEX | {Code._3220}  # FIXME: 3220 should be _SIMPLE
+)
+
+# a msg without one of these types (as src or dst) will not have an idx
+_IDX_DEV_TYPES: Final[frozenset[str]] = frozenset(
+    (
+        DEV_TYPE_MAP.CTL,
+        DEV_TYPE_MAP.UFC,
+        DEV_TYPE_MAP.HCW,  # ?remove (see above, rare)
+        DEV_TYPE_MAP.DTS,
+        DEV_TYPE_MAP.HGI,
+        DEV_TYPE_MAP.DT2,
+        DEV_TYPE_MAP.PRG,
+    )
+)  # FIXME: DEX should be deprecated to use device type rather than class
+
+# a msg to/from the same type of device, that isn't one of these, will not have an idx
+_IDX_SELF_TYPES: Final[frozenset[str]] = frozenset(
+    (
+        DEV_TYPE_MAP.CTL,
+        DEV_TYPE_MAP.UFC,
+        DEV_TYPE_MAP.HCW,  # ?remove (see above, rare)
+        DEV_TYPE_MAP.HGI,
+        DEV_TYPE_MAP.PRG,
+    )
+)
+
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -51,10 +96,30 @@ _LOGGER = logging.getLogger(__name__)
 class MessageBase:
     """The Message class; will trap/log invalid msgs."""
 
-    def __init__(self, pkt: Packet) -> None:
+    # NOTE: Message's attrs are here too, so that msg.__class__ can be reassigned
+    __slots__ = (
+        "_pkt",
+        "src",
+        "dst",
+        "_addrs",
+        "dtm",
+        "verb",
+        "seqn",
+        "code",
+        "len",
+        "_payload",
+        "_payload_err",
+        "_str",
+        "_gwy",
+        "_fraction_expired",
+    )
+
+    def __init__(self, pkt: Packet, *, lazy: bool = False) -> None:
         """Create a message from a valid packet.
 
-        Will raise InvalidPacketError if it is invalid.
+        Will raise InvalidPacketError if it is invalid. If lazy, the payload is checked
+        against its schema now, but is parsed only when (if) it is first accessed, and
+        so any InvalidPacketError from the parser will be raised then (and thereafter).
         """
 
         self._pkt = pkt
@@ -70,9 +135,13 @@ class MessageBase:
         self.code: Code = pkt.code
         self.len: int = pkt._len
 
-        self._payload = self._validate(self._pkt.payload)  # ? raise InvalidPacketError
+        self._payload_err: exc.PacketInvalid | None = None
+        self._payload = self._validate(  # ? raise InvalidPacketError
+            self._pkt.payload, parse=not lazy
+        )
 
         self._str: str = None  # type: ignore[assignment]
+        self._fraction_expired: float | None = None
 
     def __repr__(self) -> str:
         """Return an unambiguous string representation of this object."""
@@ -97,9 +166,14 @@ class MessageBase:
             name_0 = ""
             name_1 = self._name(self.src)
 
+        try:
+            payload = self.payload
+        except exc.PacketInvalid:  # only if lazy: the payload couldn't be parsed
+            payload = self._pkt.payload
+
         code_name = CODE_NAMES.get(self.code, f"unknown_{self.code}")
         self._str = MSG_FORMAT_10.format(
-            name_0, name_1, self.verb, code_name, ctx(self._pkt), self.payload
+            name_0, name_1, self.verb, code_name, ctx(self._pkt), payload
         )
         return self._str
 
@@ -125,8 +199,24 @@ class MessageBase:
 
     @property
     def payload(self):  # type: ignore[no-untyped-def]  # FIXME -> dict | list:
-        """Return the payload."""
-        return self._payload
+        """Return the payload (if lazy, parse it now, if not already done so).
+
+        Will raise InvalidPacketError if the payload could not be parsed (and will raise
+        it again every time it is accessed).
+        """
+
+        if self._payload is not _NOT_PARSED:
+            return self._payload
+
+        if self._payload_err is None:
+            try:
+                self._payload = self._validate(self._pkt.payload, check=False)
+            except exc.PacketInvalid as err:
+                self._payload_err = err
+            else:
+                return self._payload
+
+        raise self._payload_err.with_traceback(None)
 
     @property
     def _has_payload(self) -> bool:
@@ -153,54 +243,27 @@ class MessageBase:
 
         # .I --- 01:145038 --:------ 01:145038 3B00 002 FCC8
 
-        IDX_NAMES = {
-            Code._0002: "other_idx",  # non-evohome: hometronics
-            Code._10A0: SZ_DHW_IDX,  # can be 2 DHW zones per system, albeit unusual
-            Code._1260: SZ_DHW_IDX,  # can be 2 DHW zones per system, albeit unusual
-            Code._1F41: SZ_DHW_IDX,  # can be 2 DHW zones per system, albeit unusual
-            Code._22C9: SZ_UFH_IDX,  # UFH circuit
-            Code._2389: "other_idx",  # anachronistic
-            Code._2D49: "other_idx",  # non-evohome: hometronics
-            Code._31D9: "hvac_id",
-            Code._31DA: "hvac_id",
-            Code._3220: "msg_id",
-        }  # ALSO: SZ_DOMAIN_ID, SZ_ZONE_IDX
-
         if self.code in (Code._31D9, Code._31DA):  # shouldn't be needed?
             assert isinstance(self._pkt._idx, str)  # mypy hint
             return {"hvac_id": self._pkt._idx}
 
-        if self._pkt._idx in (True, False) or self.code in CODE_IDX_ARE_COMPLEX:
+        if self._pkt._idx in (True, False) or self.code in _IDX_NONE:
             return {}  # above was: CODE_IDX_COMPLEX + (Code._3150):
 
-        if self.code in (Code._3220,):  # FIXME: should be _SIMPLE
-            return {}
-
         # .I 068 03:201498 --:------ 03:201498 30C9 003 0106D6 # rare
 
         # .I --- 00:034798 --:------ 12:126457 2309 003 0201F4
-        if not {self.src.type, self.dst.type} & {
-            DEV_TYPE_MAP.CTL,
-            DEV_TYPE_MAP.UFC,
-            DEV_TYPE_MAP.HCW,  # ?remove (see above, rare)
-            DEV_TYPE_MAP.DTS,
-            DEV_TYPE_MAP.HGI,
-            DEV_TYPE_MAP.DT2,
-            DEV_TYPE_MAP.PRG,
-        }:  # FIXME: DEX should be deprecated to use device type rather than class
+        if (
+            self.src.type not in _IDX_DEV_TYPES
+            and self.dst.type not in _IDX_DEV_TYPES
+        ):
             assert self._pkt._idx == "00", "What!! (AA)"
             return {}
 
         # .I 035 --:------ --:------ 12:126457 30C9 003 017FFF
-        if self.src.type == self.dst.type and self.src.type not in (
-            DEV_TYPE_MAP.CTL,
-            DEV_TYPE_MAP.UFC,
-            DEV_TYPE_MAP.HCW,  # ?remove (see above, rare)
-            DEV_TYPE_MAP.HGI,
-            DEV_TYPE_MAP.PRG,
-        ):  # DEX
+        if self.src.type == self.dst.type and self.src.type not in _IDX_SELF_TYPES:
             assert self._pkt._idx == "00", "What!! (AB)"
-            return {}
+            return {}  # DEX
 
         # .I --- 04:029362 --:------ 12:126457 3150 002 0162
         # if not getattr(self.src, "_is_controller", True) and not getattr(
@@ -227,16 +290,18 @@ class MessageBase:
         # TODO: also 3150 (when not domain, and will be array if so)
         if self.code in (Code._000A, Code._2309) and self.src.type == DEV_TYPE_MAP.UFC:
             assert isinstance(self._pkt._idx, str)  # mypy hint
-            return {IDX_NAMES[Code._22C9]: self._pkt._idx}
+            return {_IDX_NAMES[Code._22C9]: self._pkt._idx}
 
         assert isinstance(self._pkt._idx, str)  # mypy check
         idx_name = SZ_DOMAIN_ID if self._pkt._idx[:1] == "F" else SZ_ZONE_IDX
-        index_name = IDX_NAMES.get(self.code, idx_name)
+        index_name = _IDX_NAMES.get(self.code, idx_name)
 
         return {index_name: self._pkt._idx}
 
     # TODO: needs work...
-    def _validate(self, raw_payload: str) -> dict | list[dict]:  # type: ignore[type-arg]
+    def _validate(
+        self, raw_payload: str, *, check: bool = True, parse: bool = True
+    ) -> dict | list[dict]:  # type: ignore[type-arg]
         """Validate the message, and parse the payload if so.
 
         Raise an exception (InvalidPacketError) if it is not valid.
@@ -244,7 +309,11 @@ class MessageBase:
 
         try:  # parse the payload
             # TODO: only accept invalid packets to/from HGI when flag raised
-            _check_msg_payload(self, self._pkt.payload)  # ? InvalidPayloadError
+            if check:
+                _check_msg_payload(self, self._pkt.payload)  # ? InvalidPayloadError
+
+            if not parse:
+                return _NOT_PARSED  # type: ignore[return-value]
 
             if not self._has_payload and (
                 self.verb == RQ and self.code not in RQ_IDX_COMPLEX
@@ -287,6 +356,8 @@ class Message(MessageBase):  # add _expired attr
     Adds _expired attr to the Message class.
     """
 
+    __slots__ = ()
+
     CANT_EXPIRE = -1  # sentinel value for fraction_expired
 
     HAS_EXPIRED = 2.0  # fraction_expired >= HAS_EXPIRED
@@ -294,7 +365,6 @@ class Message(MessageBase):  # add _expired attr
     IS_EXPIRING = 0.8  # fraction_expired >= 0.8 (and < HAS_EXPIRED)
 
     _gwy: Gateway
-    _fraction_expired: float | None = None
 
     @classmethod
     def _from_cmd(cls, cmd: Command, dtm: dt | None = None) -> Message:
@@ -342,12 +412,55 @@ class Message(MessageBase):  # add _expired attr
         return self._fraction_expired >= self.HAS_EXPIRED
 
 
-@lru_cache(maxsize=256)
-def re_compile_re_match(regex: str, string: str) -> bool:  # Optional[Match[Any]]
-    # TODO: confirm this does speed things up
-    # Python has its own caching of re.compile, _MAXCACHE = 512
-    # https://github.com/python/cpython/blob/3.10/Lib/re.py
-    return re.compile(regex).match(string)  # type: ignore[return-value]
+class _PayloadValidators:
+    """A registry of the payload regexes of CODES_SCHEMA, compiled once per (code, verb).
+
+    A hit is a (code, verb) pair with a regex, and a miss is one without (i.e. an unknown
+    code, or an unknown verb/code pair).
+    """
+
+    def __init__(self, codes_schema: dict[Code, dict[str, Any]]) -> None:
+        self._codes = frozenset(codes_schema)
+        self._patterns: dict[tuple[str, str], re.Pattern[str]] = {
+            (str(code), str(verb)): re.compile(regex)
+            for code, schema in codes_schema.items()
+            for verb, regex in schema.items()
+            if verb in (I_, RQ, RP, W_)
+        }
+
+        self._hits = 0
+        self._misses = 0
+        self._invalid = 0
+
+    def validate(self, code: str, verb: str, payload: str) -> None:
+        """Raise a PacketInvalid if the payload is not valid for its verb/code pair."""
+
+        try:
+            pattern = self._patterns[(code, verb)]
+        except KeyError:
+            self._misses += 1
+            if code not in self._codes:
+                raise exc.PacketInvalid(f"Unknown code: {code}") from None
+            raise exc.PacketInvalid(f"Unknown verb/code pair: {verb}/{code}") from None
+
+        self._hits += 1
+        if not pattern.match(payload):
+            self._invalid += 1
+            raise exc.PacketPayloadInvalid(
+                f"Payload doesn't match '{pattern.pattern}': {payload}"
+            )
+
+    @property
+    def metrics(self) -> dict[str, int]:
+        return {
+            "num_patterns": len(self._patterns),
+            "hits": self._hits,
+            "misses": self._misses,
+            "invalid": self._invalid,
+        }
+
+
+PAYLOAD_VALIDATORS: Final = _PayloadValidators(CODES_SCHEMA)
 
 
 def _check_msg_payload(msg: MessageBase, payload: str) -> None:
@@ -357,17 +470,8 @@ def _check_msg_payload(msg: MessageBase, payload: str) -> None:
     actually be valid, in which case the rules (likely the regex) will need updating.
     """
 
-    _ = repr(msg._pkt)  # HACK: ? raise InvalidPayloadError
-
-    if msg.code not in CODES_SCHEMA:
-        raise exc.PacketInvalid(f"Unknown code: {msg.code}")
-
-    try:
-        regex = CODES_SCHEMA[msg.code][msg.verb]
-    except KeyError:
-        raise exc.PacketInvalid(
-            f"Unknown verb/code pair: {msg.verb}/{msg.code}"
-        ) from None
+    # HACK: was via repr(msg._pkt), which can raise an AssertionError (but not these)
+    with contextlib.suppress(exc.PacketInvalid, NotImplementedError):
+        _ = msg._pkt._hdr, msg._pkt._ctx
 
-    if not re_compile_re_match(regex, payload):
-        raise exc.PacketPayloadInvalid(f"Payload doesn't match '{regex}': {payload}")
+    PAYLOAD_VALIDATORS.validate(msg.code, msg.verb, payload)
@@ -6,12 +6,13 @@ Decode/process a packet (packet that was received).
 
 from __future__ import annotations
 
+import sys
 from datetime import datetime as dt, timedelta as td
 from typing import Any
 
 from . import exceptions as exc
 from .command import Command
-from .frame import Frame
+from .frame import Frame, FrameFieldsT
 from .logger import getLogger  # overridden logger.getLogger
 from .opentherm import PARAMS_DATA_IDS, SCHEMA_DATA_IDS, STATUS_DATA_IDS
 from .ramses import CODES_SCHEMA, SZ_LIFESPAN
@@ -34,6 +35,32 @@ _TD_MINS_060 = td(minutes=60)
 _TD_MINS_360 = td(minutes=360)
 _TD_DAYS_001 = td(minutes=60 * 24)
 
+# the lifespan of a pkt, for most codes, is determined by its code alone...
+_LIFESPAN_BY_CODE: dict[Code, td] = {
+    **{
+        k: v[SZ_LIFESPAN] if isinstance(v[SZ_LIFESPAN], td) else _TD_MINS_060
+        for k, v in CODES_SCHEMA.items()
+        if SZ_LIFESPAN in v
+    },
+    Code._0005: _TD_DAYS_001,
+    Code._0006: _TD_MINS_060,
+    Code._000C: _TD_DAYS_001,
+    Code._0404: _TD_DAYS_001,  # 0404 tombstoned by incremented 0006
+    Code._10E0: _TD_DAYS_001,  # but: what if valid pkt with a corrupt src_id
+}
+
+# ...but for these codes, it also depends upon the verb, or the payload
+_LIFESPAN_VARIES: frozenset[Code] = frozenset(
+    (Code._000A, Code._1F09, Code._1FC9, Code._2309, Code._30C9, Code._3220)
+)
+
+# FIXME: 2.1 means we can miss two packets
+_LIFESPAN_BY_DATA_ID: dict[int, td] = {  # 3220, in reverse order of precedence
+    **{k: _TD_MINS_005 * 2.1 for k in STATUS_DATA_IDS},
+    **{k: _TD_MINS_060 * 2.1 for k in PARAMS_DATA_IDS},
+    **{k: _TD_MINS_360 * 2.1 for k in SCHEMA_DATA_IDS},
+}
+
 
 PKT_LOGGER = getLogger(f"{__name__}_log", pkt_log=True)
 
@@ -44,6 +71,8 @@ class Packet(Frame):
     They have a datetime (when received) an RSSI, and other meta-fields.
     """
 
+    __slots__ = ("_dtm", "_rssi", "comment", "error_text", "raw_frame", "_lifespan")
+
     _dtm: dt
     _rssi: str
 
@@ -53,15 +82,16 @@ class Packet(Frame):
         Will raise InvalidPacketError if it is invalid.
         """
 
-        super().__init__(frame[4:])  # remove RSSI
+        super().__init__(frame[4:], kwargs.get("fields"))  # remove RSSI
 
         self._dtm: dt = dtm
 
-        self._rssi: str = frame[0:3]
+        self._rssi: str = sys.intern(frame[0:3])
 
-        self.comment: str = kwargs.get("comment", "")
-        self.error_text: str = kwargs.get("err_msg", "")
-        self.raw_frame: str = kwargs.get("raw_frame", "")
+        # usu. empty, so use the (shared) empty string, rather than (say) None/b""
+        self.comment: str = kwargs.get("comment") or ""
+        self.error_text: str = kwargs.get("err_msg") or ""
+        self.raw_frame: str = kwargs.get("raw_frame") or ""
 
         self._lifespan: bool | td = pkt_lifespan(self) or False
 
@@ -83,13 +113,25 @@ class Packet(Frame):
             super()._validate(strict_checking=strict_checking)  # no RSSI
 
             # FIXME: this is messy
-            PKT_LOGGER.info("", extra=self.__dict__)  # the packet.log line
+            PKT_LOGGER.info("", extra=self._log_extra)  # the packet.log line
 
         except exc.PacketInvalid as err:  # incl. InvalidAddrSetError
             if self._frame or self.error_text:
-                PKT_LOGGER.warning("%s", err, extra=self.__dict__)
+                PKT_LOGGER.warning("%s", err, extra=self._log_extra)
             raise err
 
+    @property
+    def _log_extra(self) -> dict[str, Any]:
+        """Return the attrs used by the packet log (as a packet has no __dict__)."""
+        return {
+            "_dtm": self._dtm,
+            "_frame": self._frame,
+            "_rssi": self._rssi,
+            "comment": self.comment,
+            "error_text": self.error_text,
+            "raw_frame": self.raw_frame,
+        }
+
     def __repr__(self) -> str:
         """Return an unambiguous string representation of this object."""
         # e.g.: RQ --- 18:000730 01:145038 --:------ 000A 002 0800  # 000A|RQ|01:145038|08
@@ -131,6 +173,11 @@ class Packet(Frame):
             dtm = dt.now()
         return cls.from_port(dtm, f"... {cmd._frame}")
 
+    @classmethod
+    def _from_fields(cls, dtm: dt, rssi: str, fields: FrameFieldsT) -> Packet:
+        """Create a packet from the (already validated) fields of a packet archive."""
+        return cls(dtm, f"{rssi} {' '.join(fields)}", fields=fields)
+
     @classmethod
     def from_dict(cls, dtm: str, pkt_line: str) -> Packet:
         """Create a packet from a saved state (a curated dict)."""
@@ -164,21 +211,12 @@ def pkt_lifespan(pkt: Packet) -> td:  # import OtbGateway??
     if pkt.verb in (RQ, W_):
         return _TD_SECS_000
 
-    if pkt.code in (Code._0005, Code._000C):
-        return _TD_DAYS_001
-
-    if pkt.code == Code._0006:
-        return _TD_MINS_060
-
-    if pkt.code == Code._0404:  # 0404 tombstoned by incremented 0006
-        return _TD_DAYS_001
+    if pkt.code not in _LIFESPAN_VARIES:  # most pkts: a single lookup
+        return _LIFESPAN_BY_CODE.get(pkt.code, _TD_MINS_060)
 
     if pkt.code == Code._000A and pkt._has_array:
         return _TD_MINS_060  # sends I /1h
 
-    if pkt.code == Code._10E0:  # but: what if valid pkt with a corrupt src_id
-        return _TD_DAYS_001
-
     if pkt.code == Code._1F09:  # sends I /sync_cycle
         # can't do better than 300s with reading the payload
         return _TD_SECS_360 if pkt.verb == I_ else _TD_SECS_000
@@ -189,22 +227,13 @@ def pkt_lifespan(pkt: Packet) -> td:  # import OtbGateway??
     if pkt.code in (Code._2309, Code._30C9) and pkt._has_array:  # sends I /sync_cycle
         return _TD_SECS_360
 
-    if pkt.code == Code._3220:  # FIXME: 2.1 means we can miss two packets
+    if pkt.code == Code._3220:
         # if pkt.payload[4:6] in WRITE_MSG_IDS:  #  and Write-Data:  # TODO
         #     return _TD_SECS_003 * 2.1
-        if int(pkt.payload[4:6], 16) in SCHEMA_DATA_IDS:
-            return _TD_MINS_360 * 2.1
-        if int(pkt.payload[4:6], 16) in PARAMS_DATA_IDS:
-            return _TD_MINS_060 * 2.1
-        if int(pkt.payload[4:6], 16) in STATUS_DATA_IDS:
-            return _TD_MINS_005 * 2.1
-        return _TD_MINS_005 * 2.1
+        return _LIFESPAN_BY_DATA_ID.get(int(pkt.payload[4:6], 16), _TD_MINS_005 * 2.1)
 
     # if pkt.code in (Code._3B00, Code._3EF0, ):  # TODO: 0008, 3EF0, 3EF1
     #     return td(minutes=6.7)  # TODO: WIP
 
-    if (code := CODES_SCHEMA.get(pkt.code)) and SZ_LIFESPAN in code:
-        result: bool | td | None = CODES_SCHEMA[pkt.code][SZ_LIFESPAN]
-        return result if isinstance(result, td) else _TD_MINS_060
+    return _LIFESPAN_BY_CODE.get(pkt.code, _TD_MINS_060)
 
-    return _TD_MINS_060  # applies to lots of HVAC packets
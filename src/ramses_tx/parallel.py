@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Parse packet logs in parallel (using a pool of processes).
+
+Decoding frames into messages is CPU-bound, so large packet logs are split into
+time-contiguous shards, each of which is parsed by a worker process. The messages are
+then streamed back in their original (dtm) order.
+
+Stateful processing that spans packets (e.g. merging array fragments) is not done by
+the workers, and so remains the responsibility of the consumer of the messages.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime as dt
+from itertools import islice
+from typing import Final
+
+from . import exceptions as exc
+from .message import Message
+from .packet import PKT_LOGGER, Packet
+
+DEFAULT_SHARD_SIZE: Final[int] = 2000  # frames per shard
+
+_FrameT = tuple[str | dt, str]  # dtm_str (or dtm, if from a packet archive), frame
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _shards(frames: Iterable[_FrameT], shard_size: int) -> Iterator[list[_FrameT]]:
+    """Split the frames into time-contiguous shards (as they are in dtm order)."""
+
+    frames = iter(frames)
+    while shard := list(islice(frames, shard_size)):
+        yield shard
+
+
+def _parse_shard(frames: list[_FrameT]) -> list[Message]:
+    """Parse a shard of frames into messages (invoked in a worker process).
+
+    Invalid packets/messages are dropped, as they would be by the Transport/Protocol.
+    """
+
+    msgs: list[Message] = []
+
+    for dtm_str, frame in frames:
+        if not frame.strip():
+            continue
+
+        try:
+            if isinstance(dtm_str, dt):
+                pkt = Packet(dtm_str, frame)
+            else:
+                pkt = Packet.from_file(dtm_str, frame)
+        except ValueError as err:  # VE from dt.fromisoformat() or falsey packet
+            _LOGGER.debug("%s < PacketInvalid(%s)", frame, err)
+            continue
+        except exc.PacketInvalid as err:
+            _LOGGER.warning("%s < PacketInvalid(%s)", frame, err)
+            continue
+
+        try:
+            msgs.append(Message(pkt))  # should log all invalid msgs appropriately
+        except exc.PacketInvalid:
+            continue
+
+    return msgs
+
+
+async def parse_packet_log(
+    frames: Iterable[_FrameT],
+    /,
+    *,
+    jobs: int,
+    shard_size: int | None = None,
+) -> AsyncIterator[Message]:
+    """Parse (dtm_str, frame) pairs in a pool of processes, yielding the messages.
+
+    The messages are yielded in the same order as their frames.
+    """
+
+    shard_size = shard_size or DEFAULT_SHARD_SIZE
+    loop = asyncio.get_running_loop()
+
+    # spawn, as fork()ing a process with a running event loop (& threads) is unsafe
+    pool = ProcessPoolExecutor(
+        max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+    )
+
+    pending: deque[asyncio.Future[list[Message]]] = deque()
+
+    def received(msgs: list[Message]) -> list[Message]:
+        # the workers have no packet log handlers, so log the packets here, in order
+        for msg in msgs:
+            PKT_LOGGER.info("", extra=msg._pkt._log_extra)
+        return msgs
+
+    try:
+        for shard in _shards(frames, shard_size):
+            pending.append(loop.run_in_executor(pool, _parse_shard, shard))
+
+            if len(pending) >= jobs * 2:  # bounded, so not all shards are in memory
+                for msg in received(await pending.popleft()):  # NOTE: kept in order
+                    yield msg
+
+        while pending:
+            for msg in received(await pending.popleft()):
+                yield msg
+
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
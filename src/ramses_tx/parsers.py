@@ -16,9 +16,11 @@ from __future__ import annotations
 
 import logging
 import re
+from collections import OrderedDict
 from collections.abc import Mapping
+from copy import deepcopy
 from datetime import datetime as dt, timedelta as td
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Final, NoReturn
 
 from . import exceptions as exc
 from .address import ALL_DEV_ADDR, NON_DEV_ADDR, hex_id_to_dev_id
@@ -2949,11 +2951,189 @@ _PAYLOAD_PARSERS = {
 }
 
 
+# The parsers of these codes use more than is in a cache key (e.g. the dtm, a device_id)
+_UNCACHEABLE_CODES: Final = frozenset(("1F09", "2249", "22F4", "313E"))
+
+DEFAULT_CACHE_MAX_ENTRIES: Final[int] = 2048
+DEFAULT_CACHE_MAX_SIZE: Final[int] = 256 * 1024  # sum of the (hex) payload lengths
+
+# code, verb, payload, addr types, src is dst, addr0 is addr2, has_array
+_CacheKeyT = tuple[str, str, str, tuple[str, str, str], bool, bool, bool | None]
+
+
+class _FrozenDict(dict):  # type: ignore[type-arg]
+    """A read-only dict, so that a cached payload can be shared by many messages.
+
+    A copy (or deepcopy) of one is an ordinary (mutable) dict.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError(f"{self.__class__.__name__} is read-only (a cached payload)")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self) -> dict:  # type: ignore[type-arg]
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict:  # type: ignore[type-arg]
+        return {k: deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self) -> tuple[type, tuple[dict]]:  # type: ignore[type-arg]
+        return self.__class__, (dict(self),)  # as can't unpickle via __setitem__
+
+
+class _FrozenList(list):  # type: ignore[type-arg]
+    """A read-only list, so that a cached payload can be shared by many messages.
+
+    A copy (or deepcopy) of one is an ordinary (mutable) list.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError(f"{self.__class__.__name__} is read-only (a cached payload)")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __copy__(self) -> list:  # type: ignore[type-arg]
+        return list(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> list:  # type: ignore[type-arg]
+        return [deepcopy(v, memo) for v in self]
+
+    def __reduce__(self) -> tuple[type, tuple[list]]:  # type: ignore[type-arg]
+        return self.__class__, (list(self),)  # as can't unpickle via append/extend
+
+
+def _freeze(value: Any) -> Any:
+    """Return a (recursively) read-only version of a parsed payload."""
+
+    if isinstance(value, dict):
+        return _FrozenDict({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return _FrozenList(_freeze(v) for v in value)
+    return value
+
+
+class _PayloadCache:
+    """A bounded LRU cache of parsed payloads, keyed by everything a parser may use.
+
+    Most payloads are periodic and byte-identical (e.g. 30C9/2309 arrays, 31DA, 3EF0),
+    so are parsed only once. The parsed payloads are read-only, as they are shared.
+
+    The cache is bounded by both its number of entries, and its size (the sum of the
+    lengths of the raw payloads, a proxy for the size of the parsed payloads).
+
+    The cache is opt-in (disabled by default), as consumers may expect to be able to
+    modify a msg's payload. It is shared by all engines in a process (Messages are
+    created without a reference to their engine), so enabling it via any engine's
+    payload_cache option will enable it for them all.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_size = max_size
+
+        self.enabled = False  # payloads are read-only when cached, so is opt-in
+
+        self._entries: OrderedDict[_CacheKeyT, Any] = OrderedDict()  # parsed payloads
+        self._size = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._uncacheable = 0
+
+    @staticmethod
+    def key(msg: Message) -> _CacheKeyT | None:
+        """Return the cache key of the msg's payload, or None if it can't be cached."""
+
+        if msg.code in _UNCACHEABLE_CODES:
+            return None
+
+        addrs = msg._addrs
+        return (
+            msg.code,
+            msg.verb,
+            msg._pkt.payload,
+            (addrs[0].type, addrs[1].type, addrs[2].type),
+            msg.src.id == msg.dst.id,
+            addrs[0].id == addrs[2].id,
+            msg._has_array,
+        )
+
+    def parse(self, msg: Message) -> dict | list[dict]:  # type: ignore[type-arg]
+        """Return the parsed payload, from the cache if possible (else parse it).
+
+        If it is from the cache (i.e. enabled, and the payload is cacheable), the parsed
+        payload is read-only. Exceptions are not cached, so will be raised every time.
+        """
+
+        if not self.enabled:
+            return _parse_payload(msg)
+
+        if (key := self.key(msg)) is None:
+            self._uncacheable += 1
+            return _parse_payload(msg)
+
+        try:
+            result = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return result
+
+        self._misses += 1
+        result = self._entries[key] = _freeze(_parse_payload(msg))
+        self._size += len(key[2])
+
+        while len(self._entries) > self.max_entries or self._size > self.max_size:
+            old_key, _ = self._entries.popitem(last=False)
+            self._size -= len(old_key[2])
+            self._evictions += 1
+
+        return result
+
+    def clear(self) -> None:
+        """Remove all entries from the cache (but not its metrics)."""
+
+        self._entries.clear()
+        self._size = 0
+
+    @property
+    def metrics(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "size": self._size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "uncacheable": self._uncacheable,
+        }
+
+
+PAYLOAD_CACHE: Final = _PayloadCache()
+
+
+def _parse_payload(msg: Message) -> dict | list[dict]:  # type: ignore[type-arg]
+    return _PAYLOAD_PARSERS.get(msg.code, parser_unknown)(msg._pkt.payload, msg)
+
+
 def parse_payload(msg: Message) -> dict | list[dict]:
     result: dict | list[dict]
 
-    result = _PAYLOAD_PARSERS.get(msg.code, parser_unknown)(msg._pkt.payload, msg)
+    result = PAYLOAD_CACHE.parse(msg)  # may be read-only (if it is shared)
     if isinstance(result, dict) and msg.seqn.isnumeric():  # e.g. 22F1/3
-        result["seqx_num"] = msg.seqn
+        result = {**result, "seqx_num": msg.seqn}
 
     return result
@@ -5,17 +5,20 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from collections.abc import Awaitable, Callable
-from datetime import datetime as dt
+from collections.abc import Awaitable, Callable, Coroutine
+from datetime import datetime as dt, timedelta as td
 from typing import TYPE_CHECKING, Any, Final, TypeAlias
 
 from . import exceptions as exc
 from .address import ALL_DEV_ADDR, HGI_DEV_ADDR, NON_DEV_ADDR
 from .command import Command
 from .const import (
+    DEFAULT_COALESCE_RQS,
     DEFAULT_DISABLE_QOS,
     DEFAULT_GAP_DURATION,
+    DEFAULT_MAX_IN_FLIGHT,
     DEFAULT_NUM_REPEATS,
+    DEFAULT_RPLY_CACHE_TTL,
     DEV_TYPE_MAP,
     SZ_ACTIVE_HGI,
     SZ_IS_EVOFW3,
@@ -56,16 +59,36 @@ _LOGGER = logging.getLogger(__name__)
 
 DEFAULT_QOS = QosParams()
 
+DEFAULT_FILTER_CACHE_SIZE = 1024  # max number of (src, dst) pairs to remember
+DEFAULT_RPLY_CACHE_SIZE = 256  # when exceeded, stale replies are discarded
+
+# the reasons for a device_id filter decision
+SZ_ACCEPTED: Final = "accepted"
+SZ_REJECTED: Final = "rejected"
+
+_BLOCKED: Final = "block_list"  # rejected: a device is in the block_list
+_UNKNOWN: Final = "not_known"  # rejected: a device isn't in the (enforced) known_list
+_KNOWN: Final = "known"  # accepted: all devices are known
+_NOT_ENFORCED: Final = "not_enforced"  # accepted: a device is unknown, not enforced
+_FOREIGN_HGI: Final = "foreign_gwy"  # accepted: as above, but is a foreign gateway
+
+_FilterDecisionT: TypeAlias = tuple[bool, str, tuple["DeviceIdT", ...]]
+
+# tx_header, payload, priority, wait_for_reply, timeout, max_retries
+_RqKeyT: TypeAlias = tuple[str, str, Priority, bool, float, int]
+
 
 class _BaseProtocol(asyncio.Protocol):
     """Base class for RAMSES II protocols."""
 
     WRITER_TASK = "writer_task"
 
-    def __init__(self, msg_handler: MsgHandlerT) -> None:
+    def __init__(self, msg_handler: MsgHandlerT, lazy_decoding: bool = False) -> None:
         self._msg_handler = msg_handler
         self._msg_handlers: list[MsgHandlerT] = []
 
+        self._lazy_decoding = lazy_decoding  # parse payloads only when accessed
+
         self._transport: RamsesTransportT = None  # type: ignore[assignment]
         self._loop = asyncio.get_running_loop()
 
@@ -268,13 +291,21 @@ class _BaseProtocol(asyncio.Protocol):
     def _pkt_received(self, pkt: Packet) -> None:
         """Called by the Transport when a Packet is received."""
         try:
-            msg = Message(pkt)  # should log all invalid msgs appropriately
+            msg = Message(pkt, lazy=self._lazy_decoding)  # should log invalid msgs
         except exc.PacketInvalid:  # TODO: InvalidMessageError (packet is valid)
             return
 
         self._this_msg, self._prev_msg = msg, self._this_msg
         self._msg_received(msg)
 
+    def msg_received(self, msg: Message) -> None:
+        """Called by the Transport when a (pre-parsed) Message is received.
+
+        Some Transports decode their Packets elsewhere, e.g. in a pool of processes.
+        """
+        self._this_msg, self._prev_msg = msg, self._this_msg
+        self._msg_received(msg)
+
     def _msg_received(self, msg: Message) -> None:
         """Pass any valid/wanted Messages to the client's callback.
 
@@ -288,6 +319,78 @@ class _BaseProtocol(asyncio.Protocol):
             self._loop.call_soon_threadsafe(callback, msg)
 
 
+class _DeviceIdFilter:
+    """A device_id filter, compiled from the known_list/block_list (is immutable).
+
+    Remembers its (bounded number of) decisions, so a new filter is compiled whenever
+    any of its inputs (e.g. the active gateway) change.
+    """
+
+    __slots__ = ("active_hgi", "enforce", "exclude", "include", "_cache", "_max_size")
+
+    def __init__(
+        self,
+        exclude: frozenset[DeviceIdT],
+        include: frozenset[DeviceIdT],
+        enforce: bool,
+        active_hgi: DeviceIdT | None,
+        max_size: int = DEFAULT_FILTER_CACHE_SIZE,
+    ) -> None:
+        self.exclude = exclude
+        self.include = include
+        self.enforce = enforce
+        self.active_hgi = active_hgi
+
+        self._cache: dict[tuple[DeviceIdT, DeviceIdT, bool], _FilterDecisionT] = {}
+        self._max_size = max_size
+
+    def decide(
+        self, src_id: DeviceIdT, dst_id: DeviceIdT, sending: bool = False
+    ) -> _FilterDecisionT:
+        """Return the decision (is wanted, reason, any foreign gateways) for a pkt."""
+
+        if (decision := self._cache.get((src_id, dst_id, sending))) is not None:
+            return decision
+
+        decision = self._decide(src_id, dst_id, sending)
+
+        if len(self._cache) >= self._max_size:  # evict the oldest decision
+            del self._cache[next(iter(self._cache))]
+        self._cache[(src_id, dst_id, sending)] = decision
+        return decision
+
+    def _decide(
+        self, src_id: DeviceIdT, dst_id: DeviceIdT, sending: bool
+    ) -> _FilterDecisionT:
+        # In any one packet, an excluded device_id 'trumps' an included device_id
+        reason = _KNOWN
+        foreign: tuple[DeviceIdT, ...] = ()
+
+        for dev_id in (src_id,) if src_id == dst_id else (src_id, dst_id):
+            if dev_id in self.exclude:  # problems if incl. active gateway
+                return False, _BLOCKED, ()
+
+            if dev_id == self.active_hgi:  # is active gwy
+                continue  # consider: return True (but what if corrupted dst.id?)
+
+            if dev_id in self.include:  # incl. 63:262142 & --:------
+                continue
+
+            if sending and dev_id == HGI_DEV_ADDR.id:
+                continue
+
+            if self.enforce:
+                return False, _UNKNOWN, ()
+
+            if dev_id[:2] == DEV_TYPE_MAP.HGI and self.active_hgi:
+                reason = _FOREIGN_HGI  # this 18: is not in known_list
+                foreign += (dev_id,)
+            elif reason == _KNOWN:
+                reason = _NOT_ENFORCED
+
+        return True, reason, foreign
+
+
 class _DeviceIdFilterMixin(_BaseProtocol):
     """Filter out any unwanted (but otherwise valid) packets via device ids."""
 
@@ -297,18 +400,23 @@ class _DeviceIdFilterMixin(_BaseProtocol):
         enforce_include_list: bool = False,
         exclude_list: DeviceListT | None = None,
         include_list: DeviceListT | None = None,
+        lazy_decoding: bool = False,
     ) -> None:
-        super().__init__(msg_handler)
+        super().__init__(msg_handler, lazy_decoding=lazy_decoding)
 
         exclude_list = exclude_list or {}
         include_list = include_list or {}
 
-        self.enforce_include = enforce_include_list
-        self._exclude = list(exclude_list.keys())
-        self._include = list(include_list.keys())
-        self._include += [ALL_DEV_ADDR.id, NON_DEV_ADDR.id]
-
-        self._active_hgi: DeviceIdT | None = None
+        self._filter = _DeviceIdFilter(
+            frozenset(exclude_list),
+            frozenset(include_list) | {ALL_DEV_ADDR.id, NON_DEV_ADDR.id},
+            enforce_include_list,
+            None,  # the active gateway
+        )
+        self._filter_metrics: dict[str, dict[str, int]] = {
+            SZ_ACCEPTED: {},
+            SZ_REJECTED: {},
+        }
         # HACK: to disable_warnings if pkt source is static (e.g. a file/dict)
         # HACK: but a dynamic source (e.g. a port/MQTT) should warn if needed
         self._known_hgi = self._extract_known_hgi_id(
@@ -318,6 +426,52 @@ class _DeviceIdFilterMixin(_BaseProtocol):
         self._foreign_gwys_lst: list[DeviceIdT] = []
         self._foreign_last_run = dt.now().date()
 
+    def _update_filter(self, **kwargs: Any) -> None:
+        """Compile a new device_id filter (so also discarding any cached decisions)."""
+
+        f = self._filter
+        self._filter = _DeviceIdFilter(
+            kwargs.get("exclude", f.exclude),
+            kwargs.get("include", f.include),
+            kwargs.get("enforce", f.enforce),
+            kwargs.get("active_hgi", f.active_hgi),
+        )
+
+    @property
+    def _active_hgi(self) -> DeviceIdT | None:
+        return self._filter.active_hgi
+
+    @property
+    def _exclude(self) -> frozenset[DeviceIdT]:
+        return self._filter.exclude
+
+    @_exclude.setter
+    def _exclude(self, value: frozenset[DeviceIdT]) -> None:
+        self._update_filter(exclude=frozenset(value))
+
+    @property
+    def _include(self) -> frozenset[DeviceIdT]:
+        return self._filter.include
+
+    @_include.setter
+    def _include(self, value: frozenset[DeviceIdT]) -> None:
+        self._update_filter(
+            include=frozenset(value) | {ALL_DEV_ADDR.id, NON_DEV_ADDR.id}
+        )
+
+    @property
+    def enforce_include(self) -> bool:
+        return self._filter.enforce
+
+    @enforce_include.setter
+    def enforce_include(self, value: bool) -> None:
+        self._update_filter(enforce=value)
+
+    @property
+    def filter_metrics(self) -> dict[str, dict[str, int]]:
+        """Return the number of pkts accepted/rejected by the filter, by reason."""
+        return {k: dict(v) for k, v in self._filter_metrics.items()}
+
     @property
     def hgi_id(self) -> DeviceIdT:
         if not self._transport:
@@ -400,7 +554,7 @@ class _DeviceIdFilterMixin(_BaseProtocol):
         msg += "(by signature)" if by_signature else "(by filter)"
 
         if dev_id not in self._exclude:
-            self._active_hgi = dev_id
+            self._update_filter(active_hgi=dev_id)
             # else: setting self._active_hgi will not help
 
         if dev_id in self._exclude:
@@ -428,46 +582,32 @@ class _DeviceIdFilterMixin(_BaseProtocol):
         - by known_list (HGI80/evofw3), when filtering packets
         """
 
-        def warn_foreign_hgi(dev_id: DeviceIdT) -> None:
-            current_date = dt.now().date()
-
-            if self._foreign_last_run != current_date:
-                self._foreign_last_run = current_date
-                self._foreign_gwys_lst = []  # reset the list every 24h
-
-            if dev_id in self._foreign_gwys_lst:
-                return
-
-            _LOGGER.warning(
-                f"Device {dev_id} is potentially a Foreign gateway, "
-                f"the Active gateway is {self._active_hgi}, "
-                f"alternatively, is it a HVAC device?{TIP}"
-            )
-            self._foreign_gwys_lst.append(dev_id)
-
-        for dev_id in dict.fromkeys((src_id, dst_id)):  # removes duplicates
-            if dev_id in self._exclude:  # problems if incl. active gateway
-                return False
+        wanted, reason, foreign = self._filter.decide(src_id, dst_id, sending=sending)
 
-            if dev_id == self._active_hgi:  # is active gwy
-                continue  # consider: return True (but what if corrupted dst.id?)
+        counts = self._filter_metrics[SZ_ACCEPTED if wanted else SZ_REJECTED]
+        counts[reason] = counts.get(reason, 0) + 1
 
-            if dev_id in self._include:  # incl. 63:262142 & --:------
-                continue
+        for dev_id in foreign:
+            self._warn_foreign_hgi(dev_id)
 
-            if sending and dev_id == HGI_DEV_ADDR.id:
-                continue
+        return wanted
 
-            if self.enforce_include:
-                return False
+    def _warn_foreign_hgi(self, dev_id: DeviceIdT) -> None:
+        current_date = dt.now().date()
 
-            if dev_id[:2] != DEV_TYPE_MAP.HGI:
-                continue
+        if self._foreign_last_run != current_date:
+            self._foreign_last_run = current_date
+            self._foreign_gwys_lst = []  # reset the list every 24h
 
-            if self._active_hgi:  # this 18: is not in known_list
-                warn_foreign_hgi(dev_id)
+        if dev_id in self._foreign_gwys_lst:
+            return
 
-        return True
+        _LOGGER.warning(
+            f"Device {dev_id} is potentially a Foreign gateway, "
+            f"the Active gateway is {self._active_hgi}, "
+            f"alternatively, is it a HVAC device?{TIP}"
+        )
+        self._foreign_gwys_lst.append(dev_id)
 
     def pkt_received(self, pkt: Packet) -> None:
         if not self._is_wanted_addrs(pkt.src.id, pkt.dst.id):
@@ -475,6 +615,12 @@ class _DeviceIdFilterMixin(_BaseProtocol):
             return
         super().pkt_received(pkt)
 
+    def msg_received(self, msg: Message) -> None:
+        if not self._is_wanted_addrs(msg.src.id, msg.dst.id):
+            _LOGGER.debug("%s < Message excluded by device_id filter", msg)
+            return
+        super().msg_received(msg)
+
     async def send_cmd(self, cmd: Command, *args: Any, **kwargs: Any) -> Packet:
         if not self._is_wanted_addrs(cmd.src.id, cmd.dst.id, sending=True):
             raise exc.ProtocolError(f"Command excluded by device_id filter: {cmd}")
@@ -522,20 +668,29 @@ class PortProtocol(_DeviceIdFilterMixin, _BaseProtocol):
     def __init__(
         self,
         msg_handler: MsgHandlerT,
+        coalesce_rqs: bool = DEFAULT_COALESCE_RQS,
         disable_qos: bool | None = DEFAULT_DISABLE_QOS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        reply_cache_ttl: float = DEFAULT_RPLY_CACHE_TTL,
         **kwargs: Any,
     ) -> None:
         """Add a FSM to the Protocol, to provide QoS."""
         super().__init__(msg_handler, **kwargs)
 
-        self._context = ProtocolContext(self)
+        self._context = ProtocolContext(self, max_in_flight=max_in_flight)
         self._disable_qos = disable_qos  # no wait_for_reply
 
+        # identical RQs can share a single transmission, and/or a recent reply
+        self._coalesce_rqs = coalesce_rqs
+        self._pending_rqs: dict[_RqKeyT, asyncio.Task[Packet]] = {}
+        self._replies: dict[str, Packet] = {}  # rx_header -> latest pkt
+        self._reply_cache_ttl = td(seconds=reply_cache_ttl or 0)
+
     def __repr__(self) -> str:
         if not self._context:
             return super().__repr__()
         cls = self._context.state.__class__.__name__
-        return f"QosProtocol({cls}, len(queue)={self._context._que.qsize()})"
+        return f"QosProtocol({cls}, len(queue)={self._context.num_queued})"
 
     def connection_made(  # type: ignore[override]
         self, transport: RamsesTransportT, /, *, ramses: bool = False
@@ -596,6 +751,29 @@ class PortProtocol(_DeviceIdFilterMixin, _BaseProtocol):
         if self._context:
             self._context.pkt_received(pkt)
 
+        if self._reply_cache_ttl and pkt.verb == RP:
+            self._cache_reply(pkt)
+
+    def _cache_reply(self, pkt: Packet) -> None:
+        """Cache a reply (RP), so that any identical RQs can be answered from it."""
+
+        if len(self._replies) >= DEFAULT_RPLY_CACHE_SIZE:  # remove the stale replies
+            dtm = pkt.dtm - self._reply_cache_ttl
+            self._replies = {k: v for k, v in self._replies.items() if v.dtm > dtm}
+
+        self._replies[pkt._hdr] = pkt
+
+    def _cached_reply(self, cmd: Command) -> Packet | None:
+        """Return a recent reply to the (RQ) Command, if there is one."""
+
+        if not self._reply_cache_ttl or cmd.rx_header is None:
+            return None
+        if (pkt := self._replies.get(cmd.rx_header)) is None:
+            return None
+        if pkt.dtm < self._transport._dt_now() - self._reply_cache_ttl:
+            return None
+        return pkt
+
     async def _send_impersonation_alert(self, cmd: Command) -> None:
         """Send an puzzle packet warning that impersonation is occurring."""
 
@@ -656,8 +834,59 @@ class PortProtocol(_DeviceIdFilterMixin, _BaseProtocol):
         #         f"{self}: Failed to send {cmd._hdr}: excluded by list"
         #     )
 
+        if cmd.verb != RQ:  # only RQs can be coalesced/answered from the cache
+            return await self._send_cmd_via_context(send_cmd, cmd, priority, qos)
+
+        if qos.wait_for_reply and (pkt := self._cached_reply(cmd)):
+            _LOGGER.debug(f"{self}: Answered {cmd._hdr} from a cached reply")
+            return pkt
+
+        if not self._coalesce_rqs:
+            return await self._send_cmd_via_context(send_cmd, cmd, priority, qos)
+
+        # concurrent callers of an identical RQ (with identical priority & QoS) share
+        # the same transmission (& reply)
+        key: _RqKeyT = (
+            cmd.tx_header,
+            cmd.payload,
+            priority,
+            bool(qos.wait_for_reply),
+            qos.timeout,
+            qos.max_retries,
+        )
+
+        if (task := self._pending_rqs.get(key)) is None:
+            task = self._loop.create_task(
+                self._send_cmd_via_context(send_cmd, cmd, priority, qos)
+            )
+            self._pending_rqs[key] = task
+            task.add_done_callback(lambda t: self._pending_rq_done(key, t))
+        else:
+            _LOGGER.debug(f"{self}: Coalesced {cmd._hdr} with a pending RQ")
+
+        return await asyncio.shield(task)  # a caller's cancellation is not shared
+
+    def _pending_rq_done(self, key: _RqKeyT, task: asyncio.Task[Packet]) -> None:
+        """Forget a (coalesced) RQ once it is done, retrieving any exception.
+
+        Otherwise, if all its callers were cancelled, the exception is never retrieved.
+        """
+
+        self._pending_rqs.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def _send_cmd_via_context(
+        self,
+        send_fnc: Callable[[Command], Coroutine[Any, Any, None]],
+        cmd: Command,
+        priority: Priority,
+        qos: QosParams,
+    ) -> Packet:
+        """Send a Command via the FSM (i.e. with QoS)."""
+
         try:
-            return await self._context.send_cmd(send_cmd, cmd, priority, qos)
+            return await self._context.send_cmd(send_fnc, cmd, priority, qos)
         # except InvalidStateError as err:  # TODO: handle InvalidStateError separately
         #     # reset protocol stack
         except exc.ProtocolError as err:
@@ -687,8 +916,8 @@ class PortProtocol(_DeviceIdFilterMixin, _BaseProtocol):
         with gap_duration seconds between each transmission. If wait_for_reply is True,
         then num_repeats is ignored.
 
-        Commands are queued and sent FIFO, except higher-priority Commands are always
-        sent first.
+        Commands are queued and sent in order of their deadline (i.e. the earliest
+        timeout first), except higher-priority Commands are always sent first.
 
         Will raise:
             ProtocolSendFailed: tried to Tx Command, but didn't get echo/reply
@@ -729,11 +958,15 @@ def protocol_factory(
     msg_handler: MsgHandlerT,
     /,
     *,
+    coalesce_rqs: bool = DEFAULT_COALESCE_RQS,
     disable_qos: bool | None = DEFAULT_DISABLE_QOS,
     disable_sending: bool | None = False,
     enforce_include_list: bool = False,  # True, None, False
     exclude_list: DeviceListT | None = None,
     include_list: DeviceListT | None = None,
+    lazy_decoding: bool = False,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    reply_cache_ttl: float = DEFAULT_RPLY_CACHE_TTL,
 ) -> RamsesProtocolT:
     """Create and return a Ramses-specific async packet Protocol."""
 
@@ -744,6 +977,7 @@ def protocol_factory(
             enforce_include_list=enforce_include_list,
             exclude_list=exclude_list,
             include_list=include_list,
+            lazy_decoding=lazy_decoding,
         )
 
     if disable_qos:
@@ -751,10 +985,14 @@ def protocol_factory(
 
     return PortProtocol(
         msg_handler,
+        coalesce_rqs=coalesce_rqs,
         disable_qos=disable_qos,
         enforce_include_list=enforce_include_list,
         exclude_list=exclude_list,
         include_list=include_list,
+        lazy_decoding=lazy_decoding,
+        max_in_flight=max_in_flight,
+        reply_cache_ttl=reply_cache_ttl,
     )
 
 
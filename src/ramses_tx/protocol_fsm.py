@@ -4,11 +4,12 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import logging
-from collections.abc import Callable, Coroutine
-from datetime import datetime as dt
-from queue import Empty, Full, PriorityQueue
-from threading import Lock
+import math
+from collections import deque
+from collections.abc import Callable, Coroutine, Iterable
+from itertools import count
 from typing import TYPE_CHECKING, Any, Final, TypeAlias
 
 from . import exceptions as exc
@@ -17,6 +18,7 @@ from .command import Command
 from .const import (
     DEFAULT_BUFFER_SIZE,
     DEFAULT_ECHO_TIMEOUT,
+    DEFAULT_MAX_IN_FLIGHT,
     DEFAULT_RPLY_TIMEOUT,
     MAX_RETRY_LIMIT,
     MAX_SEND_TIMEOUT,
@@ -42,10 +44,248 @@ _LOGGER = logging.getLogger(__name__)
 #######################################################################################
 
 _FutureT: TypeAlias = asyncio.Future[Packet]
-_QueueEntryT: TypeAlias = tuple[Priority, dt, Command, QosParams, _FutureT]
+_QueueEntryT: TypeAlias = tuple[Command, QosParams, _FutureT, float]  # float: queued
+
+_WAIT_TIMES_SIZE: Final = 500  # the number of (most recent) wait times to remember
+
+# the send queue metrics
+SZ_QUEUE_DEPTH: Final = "queue_depth"
+SZ_MAX_QUEUE_DEPTH: Final = "max_queue_depth"
+SZ_NUM_EXPIRED: Final = "num_expired"  # removed from the queue before being sent
+SZ_NUM_DEQUEUED: Final = "num_dequeued"
+SZ_WAIT_TIME_AVG: Final = "wait_time_avg"  # secs, from queued until dequeued
+SZ_WAIT_TIME_P95: Final = "wait_time_p95"
+SZ_WAIT_TIME_MAX: Final = "wait_time_max"
+
+
+class _SendQueue:
+    """A buffer of Commands awaiting transmission.
+
+    Commands are dequeued in order of priority, then deadline (earliest first), then
+    FIFO. An entry is removed as soon as its future is done (e.g. when its sender has
+    timed out), rather than when it would otherwise reach the head of the queue.
+
+    Is not thread-safe: it is only to be used from within the event loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, /, *, maxsize: int) -> None:
+        self._loop = loop
+        self.maxsize = maxsize
+
+        self._heap: list[tuple[Priority, float, int]] = []  # int is the entry's seqn
+        self._entries: dict[int, _QueueEntryT] = {}
+        self._seqn = count()
+
+        self._max_depth = 0
+        self._num_expired = 0
+        self._num_dequeued = 0
+        self._wait_times: deque[float] = deque(maxlen=_WAIT_TIMES_SIZE)
+
+    def qsize(self) -> int:
+        return len(self._entries)
+
+    def put_nowait(
+        self,
+        priority: Priority,
+        deadline: float,
+        cmd: Command,
+        qos: QosParams,
+        fut: _FutureT,
+    ) -> None:
+        """Add a Command to the queue, or raise QueueFull."""
+
+        if len(self._entries) >= self.maxsize:
+            raise asyncio.QueueFull
+
+        seqn = next(self._seqn)
+        self._entries[seqn] = (cmd, qos, fut, self._loop.time())
+        heapq.heappush(self._heap, (priority, deadline, seqn))
+        fut.add_done_callback(lambda _: self._discard(seqn))
+
+        self._max_depth = max(self._max_depth, len(self._entries))
+
+    def get_nowait(self) -> tuple[Command, QosParams, _FutureT]:
+        """Remove and return the next Command from the queue, or raise QueueEmpty."""
+
+        self._prune()
+        if not self._heap:
+            raise asyncio.QueueEmpty
+
+        *_, seqn = heapq.heappop(self._heap)
+        cmd, qos, fut, queued = self._entries.pop(seqn)
+
+        self._num_dequeued += 1
+        self._wait_times.append(self._loop.time() - queued)
+        return cmd, qos, fut
+
+    def peek(self) -> tuple[Priority, float] | None:
+        """Return the priority & deadline of the next Command, if any."""
+
+        self._prune()
+        return self._heap[0][:2] if self._heap else None
+
+    def merge_metrics(self, other: _SendQueue, /) -> None:
+        """Fold the metrics of another queue (e.g. of a retired lane) into these."""
+
+        self._max_depth = max(self._max_depth, other._max_depth)
+        self._num_expired += other._num_expired
+        self._num_dequeued += other._num_dequeued
+        self._wait_times.extend(other._wait_times)
+
+    def _discard(self, seqn: int) -> None:
+        """Remove an entry whose future is done (a no-op if it was dequeued)."""
+
+        if self._entries.pop(seqn, None) is None:
+            return
+        self._num_expired += 1
+
+        if len(self._heap) > 2 * len(self._entries) + 16:  # compact the heap
+            self._heap = [e for e in self._heap if e[2] in self._entries]
+            heapq.heapify(self._heap)
+
+    def _prune(self) -> None:
+        """Pop any discarded entries from the head of the heap."""
+        while self._heap and self._heap[0][2] not in self._entries:
+            heapq.heappop(self._heap)
+
+
+_RTT_ALPHA: Final = 1 / 8  # the gains of the RTT estimator (as per RFC 6298)
+_RTT_BETA: Final = 1 / 4
+_RTT_MIN_RATIO: Final = 0.5  # of the default, the lower bound of a derived timeout
+_RTT_MAX_BACKOFF: Final = 3  # the upper bound of the timeout's multiplier (2**n)
+
+_RttKeyT: TypeAlias = tuple[str | None, Code | None]  # (dst, code), None is any
+
+SZ_ECHO: Final = "echo"
+SZ_RPLY: Final = "reply"
+
+
+class _RttStats:
+    """The smoothed round-trip time (and its variation) of a number of samples."""
+
+    __slots__ = ("count", "rttvar", "srtt")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.srtt = 0.0
+        self.rttvar = 0.0
+
+    def update(self, rtt: float) -> None:
+        if not self.count:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar += _RTT_BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += _RTT_ALPHA * (rtt - self.srtt)
+        self.count += 1
+
+    @property
+    def timeout(self) -> float:
+        return self.srtt + 4 * self.rttvar
+
+
+class _RttEstimator:
+    """Estimates of the echo/reply round-trip times, by destination (and by code).
+
+    The timeouts for a Command are derived from the most specific estimate available:
+    that of its destination & code, then its destination, then all destinations. A
+    timeout (of either kind) doubles the Command's subsequent timeouts (up to 2**3),
+    and each echo/reply halves them again.
+
+    An echo's RTT includes any time the Command spent waiting for its slot in the
+    transport (e.g. deferred by the duty cycle), so its timeout is never shortened,
+    only lengthened (for slow gateways).
+    """
+
+    def __init__(self) -> None:
+        self._echo: dict[_RttKeyT, _RttStats] = {}
+        self._rply: dict[_RttKeyT, _RttStats] = {}
+        self._backoff: dict[_RttKeyT, int] = {}
+
+    @staticmethod
+    def _keys(cmd: Command) -> tuple[_RttKeyT, _RttKeyT, _RttKeyT]:
+        return (cmd.dst.id, cmd.code), (cmd.dst.id, None), (None, None)
+
+    def sample(self, cmd: Command, rtt: float, /, *, echo: bool) -> None:
+        """Update the estimates with the RTT of a Command's echo (or reply)."""
+
+        stats = self._echo if echo else self._rply
+        keys = self._keys(cmd)
+
+        for key in keys:
+            stats.setdefault(key, _RttStats()).update(rtt)
+
+        if self._backoff.get(keys[0]):
+            self._backoff[keys[0]] -= 1
+
+    def backoff(self, cmd: Command) -> None:
+        """Increase the Command's subsequent timeouts, as it has just timed out."""
+
+        key = self._keys(cmd)[0]
+        self._backoff[key] = min(_RTT_MAX_BACKOFF, self._backoff.get(key, 0) + 1)
+
+    def timeout(self, cmd: Command, default: float, /, *, echo: bool) -> float:
+        """Return the timeout for a Command's echo (or reply), in seconds.
+
+        The default is used until there is an estimate, and bounds any estimate. The
+        lower bound is half the default (RF scheduling is jittery, even for a device
+        that usually replies quickly), or the default itself for echoes.
+        """
+
+        stats = self._echo if echo else self._rply
+        keys = self._keys(cmd)
+
+        if est := next((stats[k] for k in keys if k in stats), None):
+            lower = default if echo else default * _RTT_MIN_RATIO
+            timeout = min(max(est.timeout, lower), default * 2**_RTT_MAX_BACKOFF)
+        else:
+            timeout = default
+
+        return timeout * 2 ** self._backoff.get(keys[0], 0)
+
+    @property
+    def metrics(self) -> dict[str, dict[str, float | None]]:
+        """Return the smoothed RTTs (secs) by destination ("*" is all destinations)."""
+
+        def srtt(stats: dict[_RttKeyT, _RttStats], key: _RttKeyT) -> float | None:
+            return round(stats[key].srtt, 3) if key in stats else None
+
+        return {
+            dst or "*": {
+                SZ_ECHO: srtt(self._echo, (dst, None)),
+                SZ_RPLY: srtt(self._rply, (dst, None)),
+            }
+            for dst, code in (self._echo | self._rply)
+            if code is None
+        }
+
+
+def _queue_metrics(queues: Iterable[_SendQueue]) -> dict[str, float | int | None]:
+    """Return the combined metrics of one or more send queues."""
+
+    queues = list(queues)
+    waits = sorted(w for q in queues for w in q._wait_times)
+
+    return {
+        SZ_QUEUE_DEPTH: sum(q.qsize() for q in queues),
+        SZ_MAX_QUEUE_DEPTH: max((q._max_depth for q in queues), default=0),
+        SZ_NUM_EXPIRED: sum(q._num_expired for q in queues),
+        SZ_NUM_DEQUEUED: sum(q._num_dequeued for q in queues),
+        SZ_WAIT_TIME_AVG: round(sum(waits) / len(waits), 3) if waits else None,
+        SZ_WAIT_TIME_P95: round(waits[int(len(waits) * 0.95)], 3) if waits else None,
+        SZ_WAIT_TIME_MAX: round(waits[-1], 3) if waits else None,
+    }
 
 
 class ProtocolContext:
+    """The context of the protocol's FSM (for sending Commands with QoS).
+
+    By default, only one Command is in flight at a time. If max_in_flight > 1, then
+    Commands are pipelined: each destination has its own FSM (a lane), so that up to
+    max_in_flight Commands (to different destinations) can be awaiting their echo or
+    reply at the same time. Commands to the same destination are still sent serially,
+    so that their echos/replies are matched correctly.
+    """
+
     SEND_TIMEOUT_LIMIT = MAX_SEND_TIMEOUT
 
     def __init__(
@@ -57,22 +297,25 @@ class ProtocolContext:
         reply_timeout: float = DEFAULT_RPLY_TIMEOUT,
         max_retry_limit: int = MAX_RETRY_LIMIT,
         max_buffer_size: int = DEFAULT_BUFFER_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
     ) -> None:
         self._protocol = protocol
         self.echo_timeout = echo_timeout
         self.reply_timeout = reply_timeout
         self.max_retry_limit = min(max_retry_limit, MAX_RETRY_LIMIT)
         self.max_buffer_size = min(max_buffer_size, DEFAULT_BUFFER_SIZE)
+        self.max_in_flight = max(1, max_in_flight)
+
+        self._lanes: dict[str, _ProtocolLane] = {}  # only used if max_in_flight > 1
 
         self._loop = protocol._loop
-        self._lock = Lock()  # FIXME: threading lock, or asyncio lock?
         self._fut: _FutureT | None = None
-        self._que: PriorityQueue[_QueueEntryT] = PriorityQueue(
-            maxsize=self.max_buffer_size
-        )
+        self._que = _SendQueue(self._loop, maxsize=self.max_buffer_size)
 
         self._expiry_timer: asyncio.Task[None] | None = None
-        self._multiplier = 0
+        self._rtt = _RttEstimator()  # for adaptive echo/reply timeouts
+        self._tx_at: float = 0  # when the current cmd was (re-)sent
+        self._echo_at: float = 0  # when its echo was received
         self._state: _ProtocolStateT = None  # type: ignore[assignment]
 
         # TODO: pass this over as an instance parameter
@@ -97,6 +340,31 @@ class ProtocolContext:
     def state(self) -> _ProtocolStateT:
         return self._state
 
+    @property
+    def num_in_flight(self) -> int:
+        """Return the number of Commands awaiting their echo/reply."""
+
+        if not self._lanes:
+            return int(isinstance(self._state, WantEcho | WantRply))
+        return sum(
+            isinstance(n._state, WantEcho | WantRply) for n in self._lanes.values()
+        )
+
+    @property
+    def num_queued(self) -> int:
+        """Return the number of Commands in the buffer (i.e. not yet sent)."""
+        return self._que.qsize() + sum(n._que.qsize() for n in self._lanes.values())
+
+    @property
+    def rtt_metrics(self) -> dict[str, dict[str, float | None]]:
+        """Return the learned echo/reply RTTs, by destination."""
+        return self._rtt.metrics
+
+    @property
+    def queue_metrics(self) -> dict[str, float | int | None]:
+        """Return the metrics of the send buffer (incl. those of any lanes)."""
+        return _queue_metrics([self._que] + [n._que for n in self._lanes.values()])
+
     @property
     def is_sending(self) -> bool:  # TODO: remove asserts
         if isinstance(self._state, WantEcho | WantRply):
@@ -131,19 +399,14 @@ class ProtocolContext:
             assert self._cmd_tx_count > 0, f"{self}: Coding error"  # TODO: remove
 
             if isinstance(self._state, WantEcho):  # otherwise is WantRply
-                delay = self.echo_timeout * (2**self._multiplier)
-            # elif self._cmd.code == Code._0404:
-            #     delay = self.reply_timeout * (2**self._multiplier) * 2
+                delay = self._rtt.timeout(self._cmd, self.echo_timeout, echo=True)
             else:  # isinstance(self._state, WantRply):
-                delay = self.reply_timeout * (2**self._multiplier)
-
-            # assuming success, multiplier can be decremented...
-            self._multiplier, old_val = max(0, self._multiplier - 1), self._multiplier
+                delay = self._rtt.timeout(self._cmd, self.reply_timeout, echo=False)
 
             await asyncio.sleep(delay)  # ideally, will be interrupted by wait_for()
 
-            # nope, was not successful, so multiplier should be incremented...
-            self._multiplier = min(3, old_val + 1)
+            # nope, was not successful, so subsequent timeouts should be longer...
+            self._rtt.backoff(self._cmd)
 
             if isinstance(self._state, WantEcho):
                 _LOGGER.warning("TOUT.. = %s: echo_timeout=%s", self, delay)
@@ -290,19 +553,29 @@ class ProtocolContext:
     def connection_made(self, transport: RamsesTransportT) -> None:
         # may want to set some instance variables, according to type of transport
         self._state.connection_made()
+        for lane in self._lanes.values():
+            lane.connection_made(transport)
 
     # TODO: Should we clear the buffer if connection is lost (and apoligise to senders?
     def connection_lost(self, err: ExceptionT | None) -> None:
         self._state.connection_lost()
+        for lane in self._lanes.values():
+            lane.connection_lost(err)
 
     def pkt_received(self, pkt: Packet) -> Any:
         self._state.pkt_rcvd(pkt)
+        for lane in self._lanes.values():
+            lane.pkt_received(pkt)
 
     def pause_writing(self) -> None:
         self._state.writing_paused()
+        for lane in self._lanes.values():
+            lane.pause_writing()
 
     def resume_writing(self) -> None:
         self._state.writing_resumed()
+        for lane in self._lanes.values():
+            lane.resume_writing()
 
     async def send_cmd(
         self,
@@ -316,21 +589,27 @@ class ProtocolContext:
         if isinstance(self._state, Inactive):
             raise exc.ProtocolSendFailed(f"{self}: Send failed (no active transport?)")
 
+        if self.max_in_flight > 1:  # pipelined, so via the destination's lane
+            if self.num_queued >= self.max_buffer_size:
+                raise exc.ProtocolSendFailed(f"{self}: Send buffer overflow")
+            return await self._lane(cmd).send_cmd(send_fnc, cmd, priority, qos)
+
         assert self._loop is asyncio.get_running_loop()  # BUG is here
 
+        timeout = min(  # needs to be greater than worse-case via set_state engine
+            qos.timeout, self.SEND_TIMEOUT_LIMIT
+        )  # incl. time queued in buffer
+
         fut: _FutureT = self._loop.create_future()
         try:
-            self._que.put_nowait((priority, dt.now(), cmd, qos, fut))
-        except Full as err:
+            self._que.put_nowait(priority, self._loop.time() + timeout, cmd, qos, fut)
+        except asyncio.QueueFull as err:
             fut.cancel("Send buffer overflow")
             raise exc.ProtocolSendFailed(f"{self}: Send buffer overflow") from err
 
         if isinstance(self._state, IsInIdle):
             self._loop.call_soon_threadsafe(self._check_buffer_for_cmd)
 
-        timeout = min(  # needs to be greater than worse-case via set_state engine
-            qos.timeout, self.SEND_TIMEOUT_LIMIT
-        )  # incl. time queued in buffer
         try:
             await asyncio.wait_for(fut, timeout=timeout)
         except TimeoutError as err:  # incl. fut.cancel()
@@ -352,38 +631,75 @@ class ProtocolContext:
             raise exc.ProtocolSendFailed(f"{self}: Send failed: {err}") from err
 
     def _check_buffer_for_cmd(self) -> None:
-        self._lock.acquire()
         assert isinstance(self.is_sending, bool), f"{self}: Coding error"  # mypy hint
 
         if self._fut is not None and not self._fut.done():
-            self._lock.release()
             return
 
-        while True:
-            try:
-                *_, self._cmd, self._qos, self._fut = self._que.get_nowait()
-            except Empty:
-                self._cmd = self._qos = self._fut = None
-                self._lock.release()
-                return
+        try:  # NOTE: the buffer won't contain any futures that are done
+            self._cmd, self._qos, self._fut = self._que.get_nowait()
+        except asyncio.QueueEmpty:
+            self._cmd = self._qos = self._fut = None
+            return
+
+        self._cmd_tx_count = 0
+        self._cmd_tx_limit = min(self._qos.max_retries, self.max_retry_limit) + 1
+
+        self._send_cmd(self._cmd)
+
+    def _lane(self, cmd: Command) -> _ProtocolLane:
+        """Return the lane for the Command's destination (creating it if required).
 
-            self._cmd_tx_count = 0
-            self._cmd_tx_limit = min(self._qos.max_retries, self.max_retry_limit) + 1
+        The lanes are keyed by the address in the Command's header (usu. its dst),
+        so the headers of any concurrent echos/replies are always distinct.
+        """
+
+        key = cmd.tx_header.split("|")[2] if cmd.tx_header else cmd.dst.id
+
+        if (lane := self._lanes.get(key)) is None:
+            lane = self._lanes[key] = _ProtocolLane(self)
+            if not isinstance(self._state, Inactive):
+                lane.connection_made(self._protocol._transport)
+        return lane
+
+    def _check_lanes_for_cmd(self) -> None:
+        """Start sending the next Command(s) from the idle lanes, if there is room.
+
+        The idle lanes are served in order of the priority (then deadline) of their
+        next Command. Any lane that remains idle (i.e. its buffer is empty) is removed
+        (its queue metrics are kept by this context's own, otherwise unused, queue).
+        """
+
+        def next_entry(item: tuple[str, _ProtocolLane]) -> tuple[Priority, float]:
+            return item[1]._que.peek() or (Priority.LOWEST, math.inf)
+
+        lanes = sorted(
+            ((k, n) for k, n in self._lanes.items() if isinstance(n._state, IsInIdle)),
+            key=next_entry,
+        )
 
-            assert isinstance(self._fut, asyncio.Future)  # mypy hint
-            if self._fut.done():  # e.g. TimeoutError
-                self._que.task_done()
+        for key, lane in lanes:  # NOTE: an empty buffer is checked too
+            if lane._que.qsize() and self.num_in_flight >= self.max_in_flight:
                 continue
+            ProtocolContext._check_buffer_for_cmd(lane)
 
-            break
+            if lane._cmd is None:  # the lane has nothing to send, so remove it
+                self._que.merge_metrics(self._lanes.pop(key)._que)
 
-        self._lock.release()
+    def _rtt_sample(self, *, echo: bool) -> None:
+        """Sample the RTT of the current Command's echo (or reply), now received."""
 
-        try:
-            assert self._cmd is not None, f"{self}: Coding error"  # mypy hint
-            self._send_cmd(self._cmd)
-        finally:
-            self._que.task_done()
+        assert self._cmd is not None, f"{self}: Coding error"  # mypy hint
+
+        now = self._loop.time()
+        if echo:
+            self._echo_at = now
+
+        if self._cmd_tx_count != 1:  # ambiguous, which Tx this is an echo/reply of
+            return
+        self._rtt.sample(
+            self._cmd, now - (self._tx_at if echo else self._echo_at), echo=echo
+        )
 
     def _send_cmd(self, cmd: Command, is_retry: bool = False) -> None:
         """Wrapper to send a command with retries, until success or exception."""
@@ -397,6 +713,8 @@ class ProtocolContext:
         # TODO: check what happens when exception here - why does it hang?
         assert cmd is not None, f"{self}: Coding error"
 
+        self._tx_at = self._loop.time()
+
         try:  # the wrapped function (actual Tx.write)
             self._state.cmd_sent(cmd, is_retry=is_retry)
         except exc.ProtocolFsmError as err:
@@ -405,6 +723,26 @@ class ProtocolContext:
             self._loop.create_task(send_fnc_wrapper(cmd))
 
 
+class _ProtocolLane(ProtocolContext):
+    """The context of a single destination, when Commands are pipelined."""
+
+    def __init__(self, context: ProtocolContext, /) -> None:
+        super().__init__(
+            context._protocol,
+            echo_timeout=context.echo_timeout,
+            reply_timeout=context.reply_timeout,
+            max_retry_limit=context.max_retry_limit,
+            max_buffer_size=context.max_buffer_size,
+        )
+        self._context = context
+        self._rtt = context._rtt  # the estimates are shared by all the lanes
+        self.SEND_TIMEOUT_LIMIT = context.SEND_TIMEOUT_LIMIT
+
+    def _check_buffer_for_cmd(self) -> None:
+        """Defer to the parent context (it limits the number of Commands in flight)."""
+        self._context._check_lanes_for_cmd()
+
+
 # With wait_for_reply=False
 # AFTER. = <ProtocolContext state=IsInIdle>
 # BEFORE = <ProtocolContext state=IsInIdle cmd_=2349|RQ|01:145038|08, tx_count=0/4>
@@ -597,6 +935,7 @@ class WantEcho(ProtocolStateBase):
         #     return
 
         self._echo_pkt = pkt
+        self._context._rtt_sample(echo=True)
         if self._sent_cmd.rx_header:
             self._context.set_state(WantRply)
         else:
@@ -659,6 +998,7 @@ class WantRply(ProtocolStateBase):
         else:
             self._rply_pkt = pkt
 
+        self._context._rtt_sample(echo=False)
         self._context.set_state(IsInIdle, result=pkt)
 
 
@@ -8,7 +8,17 @@ from __future__ import annotations
 
 import logging
 from collections.abc import Callable
-from typing import Any, Final, Never, NewType, TypeAlias, TypedDict, TypeVar
+from datetime import datetime as dt
+from typing import (
+    Any,
+    Final,
+    Never,
+    NewType,
+    NotRequired,
+    TypeAlias,
+    TypedDict,
+    TypeVar,
+)
 
 import voluptuous as vol
 
@@ -20,6 +30,7 @@ from .const import (
     MAX_DUTY_CYCLE_RATE,
     MIN_INTER_WRITE_GAP,
 )
+from .logger import BLOCK, DROP_NEWEST, DROP_OLDEST
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -62,12 +73,18 @@ SZ_FILE_NAME: Final = "file_name"
 SZ_PACKET_LOG: Final = "packet_log"
 SZ_ROTATE_BACKUPS: Final = "rotate_backups"
 SZ_ROTATE_BYTES: Final = "rotate_bytes"
+SZ_QUEUE_SIZE: Final = "queue_size"
+SZ_ON_QUEUE_FULL: Final = "on_queue_full"
+SZ_COMPRESS_MINS: Final = "compress_mins"
 
 
 class PktLogConfigT(TypedDict):
     file_name: str
     rotate_backups: int
     rotate_bytes: int | None
+    queue_size: NotRequired[int | None]
+    on_queue_full: NotRequired[str]
+    compress_mins: NotRequired[int | None]
 
 
 def sch_packet_log_dict_factory(
@@ -88,6 +105,11 @@ def sch_packet_log_dict_factory(
                 None, int
             ),
             vol.Optional(SZ_ROTATE_BYTES): vol.Any(None, int),
+            vol.Optional(SZ_QUEUE_SIZE): vol.Any(None, vol.All(int, vol.Range(min=1))),
+            vol.Optional(SZ_ON_QUEUE_FULL): vol.In((DROP_NEWEST, DROP_OLDEST, BLOCK)),
+            vol.Optional(SZ_COMPRESS_MINS): vol.Any(
+                None, vol.All(int, vol.Range(min=1, max=60 * 24))
+            ),
         },
         extra=vol.PREVENT_EXTRA,
     )
@@ -394,13 +416,23 @@ def select_device_filter_mode(
 
 #
 # 5/5: Gateway (engine) configuration
+SZ_COALESCE_RQS: Final = "coalesce_rqs"
 SZ_DISABLE_SENDING: Final = "disable_sending"
 SZ_DISABLE_QOS: Final = "disable_qos"
 SZ_ENFORCE_KNOWN_LIST: Final[str] = f"enforce_{SZ_KNOWN_LIST}"
 SZ_EVOFW_FLAG: Final = "evofw_flag"
+SZ_LAZY_DECODING: Final = "lazy_decoding"
+SZ_MAX_IN_FLIGHT: Final = "max_in_flight"
+SZ_PARSE_JOBS: Final = "parse_jobs"
+SZ_PAYLOAD_CACHE: Final = "payload_cache"
+SZ_REPLAY_BATCH_SIZE: Final = "replay_batch_size"
+SZ_RPLY_CACHE_TTL: Final = "reply_cache_ttl"
+SZ_REPLAY_START: Final = "replay_start"
+SZ_REPLAY_END: Final = "replay_end"
 SZ_USE_REGEX: Final = "use_regex"
 
 SCH_ENGINE_DICT = {
+    vol.Optional(SZ_COALESCE_RQS): vol.Any(None, bool),  # identical RQs share a Tx
     vol.Optional(SZ_DISABLE_SENDING, default=False): bool,
     vol.Optional(SZ_DISABLE_QOS, default=None): vol.Any(
         None,  # None is selective QoS (e.g. QoS only for bindings, schedule, etc.)
@@ -408,7 +440,27 @@ SCH_ENGINE_DICT = {
     ),  # in long term, this default to be True (and no None)
     vol.Optional(SZ_ENFORCE_KNOWN_LIST, default=False): bool,
     vol.Optional(SZ_EVOFW_FLAG): vol.Any(None, str),
+    vol.Optional(SZ_LAZY_DECODING): vol.Any(None, bool),  # parse payloads on access
+    vol.Optional(SZ_MAX_IN_FLIGHT): vol.Any(  # >1 pipelines cmds to different dsts
+        None, vol.All(int, vol.Range(min=1, max=8))
+    ),
     # vol.Optional(SZ_PORT_CONFIG): SCH_SERIAL_PORT_CONFIG,
+    vol.Optional(SZ_PARSE_JOBS): vol.Any(  # only for packet logs/dicts
+        None, vol.All(int, vol.Range(min=1))
+    ),
+    vol.Optional(SZ_PAYLOAD_CACHE): vol.Any(None, bool),  # payloads will be read-only
+    vol.Optional(SZ_REPLAY_BATCH_SIZE): vol.Any(  # only for packet logs/dicts
+        None, vol.All(int, vol.Range(min=1))
+    ),
+    vol.Optional(SZ_REPLAY_START): vol.Any(  # only for packet logs/dicts
+        None, dt, vol.Coerce(dt.fromisoformat)
+    ),
+    vol.Optional(SZ_REPLAY_END): vol.Any(  # only for packet logs/dicts
+        None, dt, vol.Coerce(dt.fromisoformat)
+    ),
+    vol.Optional(SZ_RPLY_CACHE_TTL): vol.Any(  # secs, answer RQs from recent RPs
+        None, vol.All(vol.Coerce(float), vol.Range(min=0, max=60))
+    ),
     vol.Optional(SZ_USE_REGEX): dict,  # vol.All(ConvertNullToDict(), dict),
     vol.Optional(SZ_COMMS_PARAMS): SCH_COMMS_PARAMS,
 }
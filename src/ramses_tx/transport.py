@@ -41,10 +41,9 @@ import os
 import re
 import sys
 from collections import deque
-from collections.abc import Awaitable, Callable, Iterable
+from collections.abc import Callable, Iterator
 from datetime import datetime as dt, timedelta as td
-from functools import wraps
-from io import TextIOWrapper
+from io import BufferedReader, TextIOWrapper
 from string import printable
 from time import perf_counter
 from typing import TYPE_CHECKING, Any, Final, TypeAlias
@@ -60,7 +59,9 @@ from serial import (  # type: ignore[import-untyped]
 )
 
 from . import exceptions as exc
+from .archive import archive_frames, archive_records, is_packet_archive
 from .command import Command
+from .compressed_log import filter_frames, packet_log_frames
 from .const import (
     DUTY_CYCLE_DURATION,
     MAX_DUTY_CYCLE_RATE,
@@ -70,13 +71,20 @@ from .const import (
     SZ_IS_EVOFW3,
     SZ_SIGNATURE,
 )
+from .frame import FrameFieldsT
 from .helpers import dt_now
+from .message import Message
 from .packet import Packet
+from .parallel import parse_packet_log
 from .schemas import (
     SCH_SERIAL_PORT_CONFIG,
     SZ_EVOFW_FLAG,
     SZ_INBOUND,
     SZ_OUTBOUND,
+    SZ_PARSE_JOBS,
+    SZ_REPLAY_BATCH_SIZE,
+    SZ_REPLAY_END,
+    SZ_REPLAY_START,
     DeviceIdT,
     PortConfigT,
 )
@@ -101,6 +109,9 @@ _SIGNATURE_GAP_SECS = 0.05
 _SIGNATURE_MAX_TRYS = 40  # was: 24
 _SIGNATURE_MAX_SECS = 3
 
+_REPLAY_CHUNK_SIZE: Final[int] = 2**20  # bytes (approx.) read per chunk of a log
+_REPLAY_YIELD_SECS: Final[float] = 0.02  # max time between yields to the event loop
+
 SZ_RAMSES_GATEWAY: Final = "RAMSES/GATEWAY"
 SZ_READER_TASK: Final = "reader_task"
 
@@ -257,7 +268,7 @@ def _normalise(pkt_line: str) -> str:
 
     # TODO: deprecate as only for ramses_esp <0.4.0
     # ramses_esp-specific bugs, see: https://github.com/IndaloTech/ramses_esp/issues/1
-    pkt_line = re.sub("\r\r", "\r", pkt_line)
+    pkt_line = pkt_line.replace("\r\r", "\r")
     if pkt_line[:4] == " 000":
         pkt_line = pkt_line[1:]
     elif pkt_line[:2] in (I_, RQ, RP, W_):
@@ -271,78 +282,46 @@ def _normalise(pkt_line: str) -> str:
     return pkt_line.strip()
 
 
+# the (ASCII) bytes that are not in string.printable, to be deleted via bytes.translate()
+_NON_PRINTABLE: Final = bytes(b for b in range(0x80) if chr(b) not in printable)
+
+
 def _str(value: bytes) -> str:
-    try:
-        result = "".join(
-            c for c in value.decode("ascii", errors="strict") if c in printable
-        )
-    except UnicodeDecodeError:
+    if not value.isascii():
         _LOGGER.warning("%s < Can't decode bytestream (ignoring)", value)
         return ""
-    return result
+    return value.translate(None, _NON_PRINTABLE).decode("ascii")
 
 
-def limit_duty_cycle(
-    max_duty_cycle: float, time_window: int = DUTY_CYCLE_DURATION
-) -> Callable[..., Any]:
-    """Limit the Tx rate to the RF duty cycle regulations (e.g. 1% per hour).
+class _RecvBuffer:
+    """A reusable buffer that frames the bytes read from a serial port into lines."""
 
-    max_duty_cycle: bandwidth available per observation window (%)
-    time_window: duration of the sliding observation window (default 60 seconds)
-    """
+    __slots__ = ("_buf",)
 
-    TX_RATE_AVAIL: int = 38400  # bits per second (deemed)
-    FILL_RATE: float = TX_RATE_AVAIL * max_duty_cycle  # bits per second
-    BUCKET_CAPACITY: float = FILL_RATE * time_window
-
-    def decorator(
-        fnc: Callable[..., Awaitable[None]],
-    ) -> Callable[..., Awaitable[None]]:
-        # start with a full bit bucket
-        bits_in_bucket: float = BUCKET_CAPACITY
-        last_time_bit_added = perf_counter()
-
-        @wraps(fnc)
-        async def wrapper(
-            self: PortTransport, frame: str, *args: Any, **kwargs: Any
-        ) -> None:
-            nonlocal bits_in_bucket
-            nonlocal last_time_bit_added
-
-            rf_frame_size = 330 + len(frame[46:]) * 10
-
-            # top-up the bit bucket
-            elapsed_time = perf_counter() - last_time_bit_added
-            bits_in_bucket = min(
-                bits_in_bucket + elapsed_time * FILL_RATE, BUCKET_CAPACITY
-            )
-            last_time_bit_added = perf_counter()
+    def __init__(self) -> None:
+        self._buf = bytearray()
 
-            if _DBG_DISABLE_DUTY_CYCLE_LIMIT:
-                bits_in_bucket = BUCKET_CAPACITY
+    def __len__(self) -> int:
+        return len(self._buf)
 
-            # if required, wait for the bit bucket to refill (not for SETs/PUTs)
-            if bits_in_bucket < rf_frame_size:
-                await asyncio.sleep((rf_frame_size - bits_in_bucket) / FILL_RATE)
+    def feed(self, data: bytes) -> list[bytes]:
+        """Add the data to the buffer, and return any complete lines (incl. CRLF)."""
 
-            # consume the bits from the bit bucket
-            try:
-                await fnc(self, frame, *args, **kwargs)
-            finally:
-                bits_in_bucket -= rf_frame_size
+        buf = self._buf
+        pos = max(len(buf) - 1, 0)  # a CRLF may straddle two reads
+        buf += data
 
-        @wraps(fnc)
-        async def null_wrapper(
-            self: PortTransport, frame: str, *args: Any, **kwargs: Any
-        ) -> None:
-            await fnc(self, frame, *args, **kwargs)
+        lines: list[bytes] = []
+        start = 0
+        with memoryview(buf) as view:
+            while (end := buf.find(b"\r\n", pos)) != -1:
+                pos = end + 2
+                lines.append(bytes(view[start:pos]))
+                start = pos
 
-        if 0 < max_duty_cycle <= 1:
-            return wrapper
-
-        return null_wrapper
-
-    return decorator
+        if start:
+            del buf[:start]  # is cheap, as bytearray can shrink from the front
+        return lines
 
 
 # used by @track_transmit_rate, current_transmit_rate()
@@ -350,80 +329,211 @@ _MAX_TRACKED_TRANSMITS = 99
 _MAX_TRACKED_DURATION = 300
 
 
-# used by @track_system_syncs, @avoid_system_syncs
-_MAX_TRACKED_SYNCS = 3
-_global_sync_cycles: deque[Packet] = deque(maxlen=_MAX_TRACKED_SYNCS)
+# used by _AirtimePlanner, to avoid Tx during the controllers' sync cycles
+_DURATION_PKT_GAP: Final = 0.020  # 0.0200 for evohome, or 0.0127 for DTS92
+_DURATION_LONG_PKT: Final = 0.022  # time to tx I|2309|048 (or 30C9, or 000A)
+_DURATION_SYNC_PKT: Final = 0.010  # time to tx I|1F09|003
 
+_SYNC_WAIT_LONG: Final = (_DURATION_PKT_GAP + _DURATION_LONG_PKT) * 2
+_SYNC_LEAD_TIME: Final = _DURATION_SYNC_PKT * 0.8 + _SYNC_WAIT_LONG * 1.2  # secs
+_SYNC_BURST_CODES: Final = (Code._000A, Code._2309, Code._30C9)  # follow a I|1F09
+_SYNC_BURST_MAX: Final = 1.0  # secs, pkts after this are not part of the burst
+_SYNC_MAX_MISSED: Final = 3  # periods without a I|1F09, before a cycle is dropped
+_SYNC_MAX_TRACKED: Final = 8  # safety net for corrupted payloads (evicts the stalest)
 
-# TODO: doesn't look right at all...
-def avoid_system_syncs(fnc: Callable[..., Awaitable[None]]) -> Callable[..., Any]:
-    """Take measures to avoid Tx when any controller is doing a sync cycle."""
+_TX_RATE_AVAIL: Final = 38400  # bits per second (deemed)
 
-    DURATION_PKT_GAP = 0.020  # 0.0200 for evohome, or 0.0127 for DTS92
-    DURATION_LONG_PKT = 0.022  # time to tx I|2309|048 (or 30C9, or 000A)
-    DURATION_SYNC_PKT = 0.010  # time to tx I|1F09|003
+SZ_AIRTIME: Final = "airtime"  # for get_extra_info()
 
-    SYNC_WAIT_LONG = (DURATION_PKT_GAP + DURATION_LONG_PKT) * 2
-    SYNC_WAIT_SHORT = DURATION_SYNC_PKT
-    SYNC_WINDOW_LOWER = td(seconds=SYNC_WAIT_SHORT * 0.8)  # could be * 0
-    SYNC_WINDOW_UPPER = SYNC_WINDOW_LOWER + td(seconds=SYNC_WAIT_LONG * 1.2)  #
 
-    @wraps(fnc)
-    async def wrapper(*args: Any, **kwargs: Any) -> None:
-        global _global_sync_cycles
+class _SyncCycle:
+    """The (predicted) sync cycle of a controller.
 
-        def is_imminent(p: Packet) -> bool:
-            """Return True if a sync cycle is imminent."""
-            return bool(
-                SYNC_WINDOW_LOWER
-                < (p.dtm + td(seconds=int(p.payload[2:6], 16) / 10) - dt_now())
-                < SYNC_WINDOW_UPPER
-            )
+    The countdown of each I|1F09 gives the time of the next sync cycle, and the
+    burst that follows it (I|2309/30C9/000A) gives its likely duration.
+    """
 
-        start = perf_counter()  # TODO: remove
+    __slots__ = ("_cycle_end", "burst", "next_at", "period", "seen_at")
 
-        # wait for the start of the sync cycle (I|1F09|003, Tx time ~0.009)
-        while any(is_imminent(p) for p in _global_sync_cycles):
-            await asyncio.sleep(SYNC_WAIT_SHORT)
+    def __init__(self, seen_at: float, countdown: float) -> None:
+        self.seen_at = seen_at  # when its latest I|1F09 was Rx'd
+        self.period = countdown  # secs between its sync cycles
+        self.next_at = seen_at + countdown  # when its next I|1F09 is expected
+        self.burst = _SYNC_WAIT_LONG  # secs, the (smoothed) duration of its bursts
 
-        # wait for the remainder of sync cycle (I|2309/30C9) to complete
-        if perf_counter() - start > SYNC_WAIT_SHORT:
-            await asyncio.sleep(SYNC_WAIT_LONG)
+        self._cycle_end: float = 0  # the end of the current burst, if any
 
-        await fnc(*args, **kwargs)
-        return None
+    def sync_seen(self, seen_at: float, countdown: float) -> None:
+        if self._cycle_end:  # fold in the duration of the previous burst
+            self.burst += 0.25 * (self._cycle_end - self.burst)
+            self._cycle_end = 0
+
+        self.seen_at = seen_at
+        self.period = countdown or self.period
+        self.next_at = seen_at + countdown
+
+    def burst_seen(self, seen_at: float) -> None:
+        if (secs := seen_at - self.seen_at) < _SYNC_BURST_MAX:
+            self._cycle_end = max(self._cycle_end, secs + _DURATION_LONG_PKT)
+
+    def window(self, now: float) -> tuple[float, float]:
+        """Return the (predicted) start/end of the next sync cycle (incl. its burst).
+
+        If the expected I|1F09 was missed, extrapolate using the cycle's period.
+        """
+
+        next_at = self.next_at
+        if self.period and next_at + self.burst < now:
+            next_at += self.period * ((now - next_at - self.burst) // self.period + 1)
+        return next_at - _SYNC_LEAD_TIME, next_at + self.burst
+
+    def is_stale(self, now: float) -> bool:
+        """Return True if several of its expected I|1F09s have been missed."""
+        return now > self.next_at + self.period * _SYNC_MAX_MISSED + self.burst
+
+
+class _AirtimePlanner:
+    """Plan the transmits of a transport, so that they share the RF airtime fairly.
+
+    Each frame is given the earliest slot that:
+     - is at least MIN_INTER_WRITE_GAP after the previous transmit
+     - is within the duty cycle limit (a bucket of bits, refilled at a fixed rate)
+     - does not coincide with any controller's (predicted) sync cycle
+
+    Slots are reserved in order, so concurrent writers are sent FIFO, and the slot is
+    computed directly, rather than polled for.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        /,
+        *,
+        max_duty_cycle: float = MAX_DUTY_CYCLE_RATE,
+        time_window: int = DUTY_CYCLE_DURATION,
+    ) -> None:
+        self._loop = loop
+
+        # the duty cycle limits are disabled if max_duty_cycle is not in (0, 1]
+        self._fill_rate = _TX_RATE_AVAIL * max_duty_cycle  # bits per second
+        self._capacity = self._fill_rate * time_window
+        self._enabled = 0 < max_duty_cycle <= 1
 
-    return wrapper
+        self._bits = self._capacity  # start with a full bit bucket
+        self._bits_at = loop.time()  # when the bucket was last topped up
+        self._next_slot = 0.0  # the earliest time of the next transmit
 
+        self._syncs: dict[DeviceIdT, _SyncCycle] = {}
 
-def track_system_syncs(fnc: Callable[..., None]) -> Callable[..., Any]:
-    """Track/remember any new/outstanding TCS sync cycle."""
+        self._num_tx = 0
+        self._deferrals: dict[str, int] = {"gap": 0, "duty_cycle": 0, "sync_cycle": 0}
 
-    @wraps(fnc)
-    def wrapper(self: PortTransport, pkt: Packet) -> None:
-        global _global_sync_cycles
+    def pkt_received(self, pkt: Packet) -> None:
+        """Track the sync cycles of any controllers."""
 
-        def is_pending(p: Packet) -> bool:
-            """Return True if a sync cycle is still pending (ignores drift)."""
-            return bool(p.dtm + td(seconds=int(p.payload[2:6], 16) / 10) > dt_now())
+        if pkt.verb != I_:
+            return
+
+        if pkt.code == Code._1F09 and pkt._len == 3:
+            countdown = int(pkt.payload[2:6], 16) / 10
+            if cycle := self._syncs.get(pkt.src.id):
+                cycle.sync_seen(self._loop.time(), countdown)
+                return
 
-        if pkt.code != Code._1F09 or pkt.verb != I_ or pkt._len != 3:
-            fnc(self, pkt)
-            return None
+            self._prune_syncs(self._loop.time())
+            if len(self._syncs) >= _SYNC_MAX_TRACKED:  # evict the stalest
+                del self._syncs[min(self._syncs, key=lambda k: self._syncs[k].seen_at)]
+            self._syncs[pkt.src.id] = _SyncCycle(self._loop.time(), countdown)
 
-        _global_sync_cycles = deque(
-            p for p in _global_sync_cycles if p.src != pkt.src and is_pending(p)
+        elif pkt.code in _SYNC_BURST_CODES and (cycle := self._syncs.get(pkt.src.id)):
+            cycle.burst_seen(self._loop.time())
+
+    def _top_up(self, now: float) -> None:
+        self._bits = min(
+            self._bits + (now - self._bits_at) * self._fill_rate, self._capacity
         )
-        _global_sync_cycles.append(pkt)  # TODO: sort
+        self._bits_at = now
 
-        if (
-            len(_global_sync_cycles) > _MAX_TRACKED_SYNCS
-        ):  # safety net for corrupted payloads
-            _global_sync_cycles.popleft()
+        if _DBG_DISABLE_DUTY_CYCLE_LIMIT:
+            self._bits = self._capacity
+
+    def _prune_syncs(self, now: float) -> None:
+        """Drop any sync cycles that are no longer being seen (e.g. were corrupt)."""
+
+        for src_id in [k for k, c in self._syncs.items() if c.is_stale(now)]:
+            del self._syncs[src_id]
+
+    def _after_syncs(self, slot: float) -> float:
+        """Return the earliest time, from slot, that is outside of any sync cycle."""
+
+        self._prune_syncs(self._loop.time())
+
+        windows = sorted(c.window(slot) for c in self._syncs.values())
+        for start, end in windows:
+            if start <= slot < end:
+                slot = end
+        return slot
+
+    def reserve(self, frame: str) -> float:
+        """Reserve the next slot to transmit a frame, and return the delay until it."""
+
+        now = self._loop.time()
+        slot = now
+
+        if slot < self._next_slot:
+            slot = self._next_slot
+            self._deferrals["gap"] += 1
+
+        if self._enabled:
+            bits = 330 + len(frame[46:]) * 10  # the frame's size when Tx'd via RF
+            self._top_up(now)
+            if self._bits - bits < 0:  # ...then, wait for the bucket to refill
+                slot = max(slot, now + (bits - self._bits) / self._fill_rate)
+                self._deferrals["duty_cycle"] += 1
+            self._bits -= bits
+
+        if (after := self._after_syncs(slot)) > slot:
+            slot = after
+            self._deferrals["sync_cycle"] += 1
+
+        self._next_slot = slot + MIN_INTER_WRITE_GAP
+        self._num_tx += 1
+        return slot - now
 
-        fnc(self, pkt)
+    async def wait_for_slot(self, frame: str) -> None:
+        """Wait until the frame's slot (re-checking any sync cycles, once there)."""
 
-    return wrapper
+        if (delay := self.reserve(frame)) > 0:
+            await asyncio.sleep(delay)
+
+        now = self._loop.time()  # a sync cycle may have been predicted since
+        if (delay := self._after_syncs(now) - now) > 0:
+            self._deferrals["sync_cycle"] += 1
+            self._next_slot = max(self._next_slot, now + delay + MIN_INTER_WRITE_GAP)
+            await asyncio.sleep(delay)
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Return the budget usage, predicted sync cycles and deferral counts."""
+
+        now = self._loop.time()
+        if self._enabled:
+            self._top_up(now)
+
+        return {
+            "duty_cycle_used": round(1 - self._bits / self._capacity, 4)
+            if self._enabled
+            else None,
+            "num_tx": self._num_tx,
+            "deferrals": dict(self._deferrals),
+            "sync_cycles": {
+                k: {
+                    "next_in": round(c.window(now)[0] + _SYNC_LEAD_TIME - now, 1),
+                    "burst": round(c.burst, 3),
+                }
+                for k, c in self._syncs.items()
+            },
+        }
 
 
 # ### Abstractors #####################################################################
@@ -440,7 +550,7 @@ class _FileTransportAbstractor:
 
     def __init__(
         self,
-        pkt_source: dict[str, str] | TextIOWrapper,
+        pkt_source: dict[str, str] | TextIOWrapper | BufferedReader,
         protocol: RamsesProtocolT,
         loop: asyncio.AbstractEventLoop | None = None,
     ) -> None:
@@ -581,14 +691,17 @@ class _ReadTransport(_BaseTransport):
         )
 
     # NOTE: all transport should call this method when they receive data
-    def _frame_read(self, dtm_str: str, frame: str) -> None:
+    def _frame_read(self, dtm_str: str | dt, frame: str) -> None:
         """Make a Packet from the Frame and process it (called by each specific Tx)."""
 
         if not frame.strip():
             return
 
         try:
-            pkt = Packet.from_file(dtm_str, frame)  # is OK for when src is dict
+            if isinstance(dtm_str, dt):  # e.g. from a serial port, or a packet archive
+                pkt = Packet.from_port(dtm_str, frame)
+            else:
+                pkt = Packet.from_file(dtm_str, frame)  # is OK for when src is dict
 
         except ValueError as err:  # VE from dt.fromisoformat() or falsey packet
             _LOGGER.debug("%s < PacketInvalid(%s)", frame, err)
@@ -600,6 +713,21 @@ class _ReadTransport(_BaseTransport):
 
         self._pkt_read(pkt)
 
+    def _record_read(self, dtm: dt, rssi: str, fields: FrameFieldsT | str) -> None:
+        """Make a Packet from the (already split) fields of an archived Frame."""
+
+        if isinstance(fields, str):  # the frame could not be packed
+            self._frame_read(dtm, f"{rssi} {fields}")
+            return
+
+        try:
+            pkt = Packet._from_fields(dtm, rssi, fields)
+        except exc.PacketInvalid as err:  # e.g. an invalid address set
+            _LOGGER.warning("%s < PacketInvalid(%s)", " ".join(fields), err)
+            return
+
+        self._pkt_read(pkt)
+
     # NOTE: all protocol callbacks should be invoked from here
     def _pkt_read(self, pkt: Packet) -> None:
         """Pass any valid Packets to the protocol's callback (_prev_pkt, _this_pkt)."""
@@ -621,6 +749,22 @@ class _ReadTransport(_BaseTransport):
         except exc.ProtocolError as err:  # protect from upper layers
             _LOGGER.error("%s < exception from msg layer: %s", pkt, err)
 
+    # NOTE: only for transports that decode their packets elsewhere
+    def _msg_read(self, msg: Message) -> None:
+        """Pass any (pre-parsed) Messages to the protocol's callback."""
+
+        self._this_pkt, self._prev_pkt = msg._pkt, self._this_pkt
+
+        if self._closing is True:  # raise, or warn & return?
+            raise exc.TransportError("Transport is closing or has closed")
+
+        try:
+            self.loop.call_soon_threadsafe(self._protocol.msg_received, msg)
+        except AssertionError as err:  # protect from upper layers
+            _LOGGER.exception("%s < exception from msg layer: %s", msg, err)
+        except exc.ProtocolError as err:  # protect from upper layers
+            _LOGGER.error("%s < exception from msg layer: %s", msg, err)
+
     async def write_frame(self, frame: str, disable_tx_limits: bool = False) -> None:
         """Transmit a frame via the underlying handler (e.g. serial port, MQTT)."""
         raise exc.TransportSerialError("This transport is read only")
@@ -730,7 +874,7 @@ class _RegHackMixin:
             _LOGGER.warning(f"{pkt_line} < Changed by use_regex to: {result}")
         return result
 
-    def _frame_read(self, dtm_str: str, frame: str) -> None:
+    def _frame_read(self, dtm_str: str | dt, frame: str) -> None:
         super()._frame_read(dtm_str, self._regex_hack(frame, self._inbound_rule))  # type: ignore[misc]
 
     async def write_frame(self, frame: str, disable_tx_limits: bool = False) -> None:
@@ -741,10 +885,36 @@ class _RegHackMixin:
 # ### Implement the transports for File/dict (R/O), Serial, MQTT
 
 
+def _log_file_frames(pkt_log: TextIOWrapper) -> Iterator[tuple[str, str]]:
+    """Yield the (dtm_str, frame) pairs of a packet log, reading it in large chunks."""
+
+    while lines := pkt_log.readlines(_REPLAY_CHUNK_SIZE):
+        for dtm_pkt_line in lines:
+            # can be blank lines in annotated log files
+            if (dtm_pkt_line := dtm_pkt_line.strip()) and dtm_pkt_line[:1] != "#":
+                yield dtm_pkt_line[:26], dtm_pkt_line[27:]
+
+
 class FileTransport(_ReadTransport, _FileTransportAbstractor):
-    """Receive packets from a read-only source such as packet log or a dict."""
+    """Receive packets from a read-only source such as packet log or a dict.
+
+    If a replay_batch_size is given, frames are read in batches of up to that size,
+    yielding to the event loop only between batches (a high-throughput mode).
+
+    If parse_jobs is greater than one, frames are decoded by a pool of that many
+    processes, and the resulting messages are passed to the protocol in order.
+
+    If a replay_start and/or replay_end is given, only the frames within that time
+    window are read. For a compressed packet log with a sidecar index, only the blocks
+    that overlap the window are decompressed.
+    """
 
     def __init__(self, *args: Any, disable_sending: bool = True, **kwargs: Any) -> None:
+        self._parse_jobs: int | None = kwargs.pop(SZ_PARSE_JOBS, None)
+        self._replay_batch_size: int | None = kwargs.pop(SZ_REPLAY_BATCH_SIZE, None)
+        self._replay_start: dt | None = kwargs.pop(SZ_REPLAY_START, None)
+        self._replay_end: dt | None = kwargs.pop(SZ_REPLAY_END, None)
+
         super().__init__(*args, **kwargs)
 
         if bool(disable_sending) is False:
@@ -773,7 +943,18 @@ class FileTransport(_ReadTransport, _FileTransportAbstractor):
     async def _reader(self) -> None:  # TODO
         """Loop through the packet source for Frames and process them."""
 
-        if isinstance(self._pkt_source, dict):
+        if self._parse_jobs and self._parse_jobs > 1:
+            await self._parallel_reader(self._parse_jobs)
+
+        elif (
+            self._replay_batch_size
+            or self._replay_start
+            or self._replay_end
+            or is_packet_archive(self._pkt_source)
+        ):
+            await self._batch_reader(self._replay_batch_size or 1)
+
+        elif isinstance(self._pkt_source, dict):
             for dtm_str, pkt_line in self._pkt_source.items():  # assume dtm_str is OK
                 while not self._reading:
                     await asyncio.sleep(0.001)
@@ -794,6 +975,94 @@ class FileTransport(_ReadTransport, _FileTransportAbstractor):
                 f"Packet source is not dict or file: {self._pkt_source:!r}"
             )
 
+    def _frames(self) -> Iterator[tuple[str | dt, str]]:
+        """Return the (dtm_str, frame) pairs of the packet source (within any window).
+
+        The frames of a packet archive have a dtm, rather than a dtm_str.
+        """
+
+        window = self._replay_start or self._replay_end
+
+        frames: Iterator[tuple[str | dt, str]]
+
+        if is_packet_archive(self._pkt_source):
+            frames = archive_frames(
+                self._pkt_source,  # type: ignore[arg-type]
+                start=self._replay_start,
+                end=self._replay_end,
+            )
+        elif isinstance(self._pkt_source, dict):
+            items = iter(self._pkt_source.items())  # assume dtm_str is OK
+            if window:
+                items = filter_frames(
+                    items, start=self._replay_start, end=self._replay_end
+                )
+            frames = items
+        elif isinstance(self._pkt_source, TextIOWrapper):
+            if window:  # may be a compressed log, with a sidecar index
+                frames = packet_log_frames(
+                    self._pkt_source, start=self._replay_start, end=self._replay_end
+                )
+            else:
+                frames = _log_file_frames(self._pkt_source)  # should check dtm_str
+        else:
+            raise exc.TransportSourceInvalid(
+                f"Packet source is not dict or file: {self._pkt_source:!r}"
+            )
+
+        return frames
+
+    # NOTE: self._frame_read() invoked from here
+    async def _batch_reader(self, batch_size: int) -> None:
+        """Loop through the packet source for Frames, yielding only between batches.
+
+        Control is returned to the event loop after every batch_size frames, or
+        after _REPLAY_YIELD_SECS, whichever is sooner.
+        """
+
+        count = 0
+        yield_at = perf_counter() + _REPLAY_YIELD_SECS
+
+        read: Callable[..., None]
+        items: Iterator[tuple[Any, ...]]
+
+        if is_packet_archive(self._pkt_source):  # its frames are already split
+            read = self._record_read
+            items = archive_records(
+                self._pkt_source,  # type: ignore[arg-type]
+                start=self._replay_start,
+                end=self._replay_end,
+            )
+        else:
+            read, items = self._frame_read, self._frames()
+
+        for item in items:
+            while not self._reading:
+                await asyncio.sleep(0.001)
+            read(*item)
+
+            count += 1
+            if count >= batch_size or perf_counter() >= yield_at:
+                await asyncio.sleep(0)
+                count = 0
+                yield_at = perf_counter() + _REPLAY_YIELD_SECS
+
+        await asyncio.sleep(0)  # so protocol receives last batch before connection_lost
+
+    # NOTE: self._msg_read() invoked from here
+    async def _parallel_reader(self, jobs: int) -> None:
+        """Loop through the packet source for Messages, decoded by a process pool.
+
+        Control is returned to the event loop whenever a shard of frames is awaited.
+        """
+
+        async for msg in parse_packet_log(self._frames(), jobs=jobs):
+            while not self._reading:
+                await asyncio.sleep(0.001)
+            self._msg_read(msg)
+
+        await asyncio.sleep(0)  # so protocol receives last msgs before connection_lost
+
     def _close(self, exc: exc.RamsesException | None = None) -> None:
         """Close the transport (cancel any outstanding tasks)."""
 
@@ -812,15 +1081,11 @@ class PortTransport(_RegHackMixin, _FullTransport, _PortTransportAbstractor):  #
     _init_fut: asyncio.Future[Packet | None]
     _init_task: asyncio.Task[None]
 
-    _recv_buffer: bytes = b""
-
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
-        self._leaker_sem = asyncio.BoundedSemaphore()
-        self._leaker_task = self._loop.create_task(
-            self._leak_sem(), name="PortTransport._leak_sem()"
-        )
+        self._recv_buffer = _RecvBuffer()
+        self._airtime = _AirtimePlanner(self._loop)
 
         self._is_hgi80 = is_hgi80(self.serial.name)
 
@@ -887,25 +1152,10 @@ class PortTransport(_RegHackMixin, _FullTransport, _PortTransportAbstractor):  #
                 f"Failed to initialise Transport within {_SIGNATURE_MAX_SECS} secs"
             ) from err
 
-    async def _leak_sem(self) -> None:
-        """Used to enforce a minimum time between calls to self.write()."""
-        while True:
-            await asyncio.sleep(MIN_INTER_WRITE_GAP)
-            with contextlib.suppress(ValueError):
-                self._leaker_sem.release()
-
     # NOTE: self._frame_read() invoked from here
     def _read_ready(self) -> None:
         """Make Frames from the read data and process them."""
 
-        def bytes_read(data: bytes) -> Iterable[tuple[dt, bytes]]:
-            self._recv_buffer += data
-            if b"\r\n" in self._recv_buffer:
-                lines = self._recv_buffer.split(b"\r\n")
-                self._recv_buffer = lines[-1]
-                for line in lines[:-1]:
-                    yield self._dt_now(), line + b"\r\n"
-
         try:
             data: bytes = self.serial.read(self._max_read_size)
         except SerialException as err:
@@ -916,17 +1166,18 @@ class PortTransport(_RegHackMixin, _FullTransport, _PortTransportAbstractor):  #
         if not data:
             return
 
-        for dtm, raw_line in bytes_read(data):
+        for raw_line in self._recv_buffer.feed(data):
             if _DBG_FORCE_FRAME_LOGGING:
                 _LOGGER.warning("Rx: %s", raw_line)
             elif _LOGGER.getEffectiveLevel() == logging.INFO:  # log for INFO not DEBUG
                 _LOGGER.info("Rx: %s", raw_line)
 
+            dtm = self._dt_now()  # timestamps are to the millisecond, as before
             self._frame_read(
-                dtm.isoformat(timespec="milliseconds"), _normalise(_str(raw_line))
+                dtm.replace(microsecond=dtm.microsecond // 1000 * 1000),
+                _normalise(_str(raw_line)),
             )
 
-    @track_system_syncs
     def _pkt_read(self, pkt: Packet) -> None:
         # NOTE: a signature can override an existing active gateway
         if (
@@ -937,22 +1188,23 @@ class PortTransport(_RegHackMixin, _FullTransport, _PortTransportAbstractor):  #
             self._extra[SZ_ACTIVE_HGI] = pkt.src.id  # , by_signature=True)
             self._init_fut.set_result(pkt)
 
+        self._airtime.pkt_received(pkt)
         super()._pkt_read(pkt)
 
-    @limit_duty_cycle(MAX_DUTY_CYCLE_RATE)
-    @avoid_system_syncs
+    def get_extra_info(self, name: str, default: Any = None) -> Any:
+        if name == SZ_AIRTIME:
+            return self._airtime.metrics
+        return super().get_extra_info(name, default=default)
+
     async def write_frame(self, frame: str, disable_tx_limits: bool = False) -> None:
         """Transmit a frame via the underlying handler (e.g. serial port, MQTT).
 
         Protocols call Transport.write_frame(), not Transport.write().
         """
 
-        await self._leaker_sem.acquire()  # MIN_INTER_WRITE_GAP
+        await self._airtime.wait_for_slot(frame)  # gap, duty cycle & sync cycles
         await super().write_frame(frame)
 
-    # NOTE: The order should be: minimum gap between writes, duty cycle limits, and
-    # then the code that avoids the controller sync cycles
-
     async def _write_frame(self, frame: str) -> None:
         """Write some data bytes to the underlying transport."""
 
@@ -977,8 +1229,6 @@ class PortTransport(_RegHackMixin, _FullTransport, _PortTransportAbstractor):  #
 
         if self._init_task:
             self._init_task.cancel()
-        if self._leaker_task:
-            self._leaker_task.cancel()
 
     def _close(self, exc: exc.RamsesException | None = None) -> None:  # type: ignore[override]
         """Close the transport (cancel any outstanding tasks)."""
@@ -988,9 +1238,6 @@ class PortTransport(_RegHackMixin, _FullTransport, _PortTransportAbstractor):  #
         if self._init_task:
             self._init_task.cancel()
 
-        if self._leaker_task:
-            self._leaker_task.cancel()
-
 
 class MqttTransport(_FullTransport, _MqttTransportAbstractor):
     """Send/receive packets to/from ramses_esp via MQTT.
@@ -1147,7 +1394,7 @@ class MqttTransport(_FullTransport, _MqttTransportAbstractor):
             )
         # FIXME: convert all dt early, and convert to aware, i.e. dt.now().astimezone()
 
-        self._frame_read(dtm.isoformat(), _normalise(payload["msg"]))
+        self._frame_read(dtm, _normalise(payload["msg"]))
 
     async def write_frame(self, frame: str, disable_tx_limits: bool = False) -> None:
         """Transmit a frame via the underlying handler (e.g. serial port, MQTT).
@@ -1258,7 +1505,7 @@ async def transport_factory(
     *,
     port_name: SerPortNameT | None = None,
     port_config: PortConfigT | None = None,
-    packet_log: TextIOWrapper | None = None,
+    packet_log: TextIOWrapper | BufferedReader | None = None,
     packet_dict: dict[str, str] | None = None,
     disable_sending: bool | None = False,
     extra: dict[str, Any] | None = None,
@@ -15,6 +15,8 @@ import voluptuous as vol
 from ramses_rf import Gateway
 from ramses_rf.helpers import shrink
 from ramses_rf.schemas import SCH_GLOBAL_CONFIG, SCH_GLOBAL_SCHEMAS
+from ramses_tx import exceptions as exc
+from ramses_tx.packet import Packet
 from ramses_tx.schemas import SCH_GLOBAL_TRAITS_DICT
 
 SCH_GLOBAL_TRAITS = vol.Schema(SCH_GLOBAL_TRAITS_DICT, extra=vol.PREVENT_EXTRA)
@@ -30,6 +32,37 @@ logging.disable(logging.WARNING)  # usu. WARNING
 TEST_DIR = Path(__file__).resolve().parent  # TEST_DIR = f"{os.path.dirname(__file__)}"
 
 
+def load_corpus_lines(
+    *work_dirs: Path | str, pattern: str = "*.log"
+) -> list[tuple[str, str]]:
+    """Return the (dtm, pkt_line) of every line in a corpus of packet logs.
+
+    The corpus defaults to that of the parsers tests. Comments are stripped.
+    """
+
+    result = []
+    for work_dir in work_dirs or (TEST_DIR / "parsers",):
+        for f_name in sorted(Path(work_dir).glob(pattern)):
+            with open(f_name) as f:
+                for line in f:
+                    pkt_line = line.split("#", maxsplit=1)[0].strip()
+                    if pkt_line:
+                        result.append((pkt_line[:26], pkt_line[27:]))
+    return result
+
+
+def load_corpus(*work_dirs: Path | str, pattern: str = "*.log") -> list[Packet]:
+    """Return every valid packet in a corpus of packet logs (see: load_corpus_lines)."""
+
+    result = []
+    for dtm, pkt_line in load_corpus_lines(*work_dirs, pattern=pattern):
+        try:
+            result.append(Packet.from_file(dtm, pkt_line))
+        except (exc.PacketInvalid, ValueError):
+            continue
+    return result
+
+
 def shuffle_dict(old_dict: dict) -> dict:
     keys = list(old_dict.keys())
     shuffle(keys)
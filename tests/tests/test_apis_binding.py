@@ -45,8 +45,12 @@ class GatewayStub:
     device_by_id: dict[str, Fakeable] = {}
     devices: list[Fakeable] = []
 
+    _faked_devices: dict[str, Fakeable] = {}
+    _binding_devices: dict[str, Fakeable] = {}
+
     _include: dict[str] = {}
     _zzz = None
+    _state_seqn = 0
 
     def _add_device(self, dev: Fakeable) -> None:
         self.device_by_id[dev.id] = dev
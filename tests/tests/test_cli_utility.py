@@ -87,7 +87,13 @@ LIB_CONFIG_LISTEN_ = {
     "packet_log": None,
 }
 LIB_CONFIG_PARSE__ = {
-    "config": {"reduce_processing": 0},
+    "config": {
+        "reduce_processing": 0,
+        "parse_jobs": None,
+        "replay_batch_size": None,
+        "replay_start": None,
+        "replay_end": None,
+    },
     "input_file": "<_io.TextIOWrapper name='<stdin>' mode='r' encoding='utf-8'>",
 }
 
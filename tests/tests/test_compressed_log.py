@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the compressed packet logs (seekable blocks, with an index)."""
+
+import gzip
+from datetime import datetime as dt
+from pathlib import Path
+
+import pytest
+
+from ramses_rf import Gateway
+from ramses_tx import compressed_log
+from ramses_tx.compressed_log import (
+    INDEX_SUFFIX,
+    compress_packet_log,
+    filter_frames,
+    packet_log_frames,
+)
+from ramses_tx.logger import (
+    QueuedPktLogHandler,
+    TimedRotatingFileHandler,
+    getLogger,
+    set_pkt_logging,
+)
+from ramses_tx.schemas import SZ_REPLAY_END, SZ_REPLAY_START
+
+from .helpers import TEST_DIR
+
+PKT_LOG = f"{TEST_DIR}/systems/heat_zxdavb/packet.log"  # 10:02:02 to 10:06:57
+
+START, END = "2022-05-02T10:04:00", "2022-05-02T10:05:00"
+
+PKT_LINE = "000  I --- 01:145038 --:------ 01:145038 1F09 003 FF04B5"
+
+
+@pytest.fixture()
+def gz_log(tmp_path: Path) -> str:
+    file_name = str(tmp_path / "packet.log.gz")
+    compress_packet_log(PKT_LOG, file_name, block_mins=1)
+    return file_name
+
+
+def test_compress_packet_log(gz_log: str) -> None:
+    """Check a compressed log is a valid gzip file, with a block per minute."""
+
+    with gzip.open(gz_log, "rt") as f, open(PKT_LOG) as g:
+        assert f.read() == g.read()
+
+    with open(gz_log + INDEX_SUFFIX) as f:
+        blocks = [ln.split()[0] for ln in f]
+
+    assert len(blocks) == 5
+    assert blocks[0] == "2022-05-02T10:02:00.000000"
+
+
+def test_packet_log_window(gz_log: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check only the blocks within the window are decompressed."""
+
+    with open(PKT_LOG) as f:
+        expected = list(filter_frames(packet_log_frames(f), start=START, end=END))
+
+    decompress_calls: list[int] = []
+    _decompress = gzip.decompress
+
+    def decompress(data: bytes) -> bytes:
+        decompress_calls.append(len(data))
+        return _decompress(data)
+
+    monkeypatch.setattr(compressed_log.gzip, "decompress", decompress)
+
+    actual = list(packet_log_frames(gz_log, start=START, end=END))
+
+    assert expected and actual == expected
+    assert all(START <= f"{d[:10]}T{d[11:]}" < END for d, _ in actual)
+    assert len(decompress_calls) == 1  # i.e. only the 10:04 block
+
+
+async def test_file_transport_window(gz_log: str) -> None:
+    """Check a Gateway can replay (only) a time window from a compressed log."""
+
+    with gzip.open(gz_log, "rt") as f:
+        gwy = Gateway(
+            None, input_file=f, config={SZ_REPLAY_START: START, SZ_REPLAY_END: END}
+        )
+        await gwy.start()
+        await gwy._protocol._wait_connection_lost
+
+    try:
+        assert gwy._this_msg
+        assert gwy._this_msg.dtm.isoformat()[:16] == "2022-05-02T10:04"
+    finally:
+        await gwy.stop()
+
+
+def test_rotated_log_is_compressed(tmp_path: Path) -> None:
+    """Check a packet log rotated at midnight is compressed, with an index."""
+
+    file_name = tmp_path / "packet.log"
+
+    logger = getLogger(f"{__name__}.rotated", pkt_log=True)
+    set_pkt_logging(
+        logger, file_name=str(file_name), rotate_backups=7, compress_mins=10
+    )
+
+    try:
+        (handler,) = logger.handlers
+        assert isinstance(handler, QueuedPktLogHandler)  # so is compressed by a thread
+        handler._handler.doRollover()  # type: ignore[attr-defined]
+    finally:
+        for handler in logger.handlers:
+            handler.close()
+            logger.removeHandler(handler)
+
+    (gz_file,) = tmp_path.glob("packet.log.*.gz")
+    assert Path(f"{gz_file}{INDEX_SUFFIX}").is_file()
+
+
+@pytest.mark.parametrize("backups", (1, 3))
+def test_rotated_logs_are_deleted(tmp_path: Path, backups: int) -> None:
+    """Check only the newest compressed logs are kept, each with its index."""
+
+    file_name = tmp_path / "packet.log"
+
+    logger = getLogger(f"{__name__}.deleted_{backups}", pkt_log=True)
+    set_pkt_logging(
+        logger, file_name=str(file_name), rotate_backups=backups, compress_mins=10
+    )
+
+    try:
+        (handler,) = logger.handlers
+        assert isinstance(handler, QueuedPktLogHandler)
+        rotating = handler._handler
+        assert isinstance(rotating, TimedRotatingFileHandler)
+
+        for day in range(1, 6):  # i.e. rotate more often than backups
+            rotating.stream.write(f"2024-01-0{day}T10:00:00.000000 {PKT_LINE}\n")
+            rotating.rolloverAt = int(dt(2024, 1, day + 1).timestamp())
+            rotating.doRollover()
+    finally:
+        for handler in logger.handlers:
+            handler.close()
+            logger.removeHandler(handler)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["packet.log"] + [
+        f"packet.log.2024-01-0{day}.gz{suffix}"
+        for day in range(6 - backups, 6)
+        for suffix in ("", INDEX_SUFFIX)
+    ]
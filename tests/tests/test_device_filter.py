@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the (compiled) device_id filter of the protocol."""
+
+from ramses_tx import protocol_factory
+from ramses_tx.protocol import SZ_ACCEPTED, SZ_REJECTED, _DeviceIdFilterMixin
+
+GWY_ID = "18:000730"
+CTL_ID = "01:145038"
+TRV_ID = "04:189078"
+BAD_ID = "13:123456"
+FGN_ID = "18:123456"  # a foreign gateway
+
+
+def _protocol(enforce: bool) -> _DeviceIdFilterMixin:
+    return protocol_factory(  # type: ignore[return-value]
+        lambda _: None,
+        disable_sending=True,
+        enforce_include_list=enforce,
+        exclude_list={BAD_ID: {}},
+        include_list={GWY_ID: {"class": "HGI"}, CTL_ID: {}},
+    )
+
+
+async def test_filter_decisions() -> None:
+    """Check the filter's decisions, and its counters (by reason)."""
+
+    protocol = _protocol(enforce=True)
+
+    assert protocol._is_wanted_addrs(CTL_ID, CTL_ID)
+    assert protocol._is_wanted_addrs(CTL_ID, "--:------")
+    assert protocol._is_wanted_addrs(GWY_ID, CTL_ID)
+    assert not protocol._is_wanted_addrs(TRV_ID, CTL_ID)  # not known
+    assert not protocol._is_wanted_addrs(CTL_ID, BAD_ID)  # blocked
+    assert not protocol._is_wanted_addrs(CTL_ID, BAD_ID)  # again (from the cache)
+
+    assert protocol.filter_metrics == {
+        SZ_ACCEPTED: {"known": 3},
+        SZ_REJECTED: {"not_known": 1, "block_list": 2},
+    }
+
+    protocol.enforce_include = False  # a new filter (decisions are not cached)
+
+    assert protocol._is_wanted_addrs(TRV_ID, CTL_ID)
+    assert not protocol._is_wanted_addrs(CTL_ID, BAD_ID)  # blocked trumps all
+    assert protocol.filter_metrics[SZ_ACCEPTED]["not_enforced"] == 1
+
+
+async def test_filter_invalidated() -> None:
+    """Check the filter's cached decisions are discarded when its inputs change."""
+
+    protocol = _protocol(enforce=False)
+
+    assert protocol._is_wanted_addrs(FGN_ID, CTL_ID)
+    assert protocol.filter_metrics[SZ_ACCEPTED] == {"not_enforced": 1}
+
+    protocol._set_active_hgi(GWY_ID)  # now, 18:123456 is a foreign gateway
+    assert protocol._active_hgi == GWY_ID
+
+    assert protocol._is_wanted_addrs(FGN_ID, CTL_ID)
+    assert protocol.filter_metrics[SZ_ACCEPTED] == {"not_enforced": 1, "foreign_gwy": 1}
+
+    protocol._exclude = frozenset((BAD_ID, FGN_ID))
+    assert not protocol._is_wanted_addrs(FGN_ID, CTL_ID)
+
+    protocol._include = frozenset((GWY_ID, CTL_ID, TRV_ID))
+    protocol.enforce_include = True
+    assert protocol._is_wanted_addrs(TRV_ID, CTL_ID)
+    assert protocol._is_wanted_addrs(TRV_ID, "63:262142")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the routing of messages to devices by the dispatcher."""
+
+import json
+from pathlib import Path, PurePath
+
+import pytest
+
+from ramses_rf import Gateway
+from ramses_rf.binding_fsm import (
+    BindContext,
+    DevIsNotBinding,
+    RespIsWaitingForOffer,
+)
+from ramses_rf.device import Fakeable
+from ramses_rf.schemas import SCH_GLOBAL_CONFIG, SZ_BATCH_DISPATCH, SZ_CONFIG
+
+from .helpers import TEST_DIR, assert_expected_set, load_expected_results
+
+WORK_DIR = f"{TEST_DIR}/systems"
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    def id_fnc(param: Path) -> str:
+        return PurePath(param).name
+
+    folders = [f for f in Path(WORK_DIR).iterdir() if f.is_dir() and f.name[:1] != "_"]
+    metafunc.parametrize("dir_name", folders, ids=id_fnc)
+
+
+async def _load_test_gwy(dir_name: Path, *, batch_dispatch: bool) -> Gateway:
+    """Create a system state from a packet log, optionally using batched dispatch."""
+
+    try:
+        with open(f"{dir_name}/config.json") as f:
+            config = {k: v for k, v in json.load(f).items() if k[:1] != "_"}
+    except FileNotFoundError:
+        config = {}
+
+    config.setdefault(SZ_CONFIG, {})[SZ_BATCH_DISPATCH] = batch_dispatch
+
+    with open(f"{dir_name}/packet.log") as f:
+        gwy = Gateway(None, input_file=f, **SCH_GLOBAL_CONFIG(config))
+        await gwy.start()
+
+        await gwy._protocol.wait_for_connection_lost()  # until packet log is EOF
+
+    return gwy
+
+
+async def test_batch_dispatch(dir_name: Path) -> None:
+    """Check the system built via batched dispatch is the same as via unbatched."""
+
+    expected: dict = load_expected_results(dir_name) or {}
+
+    gwy = await _load_test_gwy(dir_name, batch_dispatch=True)
+    try:
+        assert gwy.config.batch_dispatch
+        assert_expected_set(gwy, expected)
+    finally:
+        await gwy.stop()
+
+
+async def test_device_indexes(dir_name: Path) -> None:
+    """Check the gateway's indexes of faked/binding devices are maintained."""
+
+    gwy = await _load_test_gwy(dir_name, batch_dispatch=False)
+    try:
+        assert gwy._faked_devices == {d.id: d for d in gwy.devices if d.is_faked}
+        assert gwy._binding_devices == {}
+
+        dev = next((d for d in gwy.devices if isinstance(d, Fakeable)), None)
+        if dev is None:  # e.g. heat_otb_00
+            return
+
+        dev._bind_context = BindContext(dev)  # as per dev._make_fake()
+        assert gwy._faked_devices[dev.id] is dev
+
+        dev._bind_context.set_state(RespIsWaitingForOffer)
+        assert gwy._binding_devices == {dev.id: dev}
+
+        dev._bind_context.set_state(DevIsNotBinding)
+        assert gwy._binding_devices == {}
+
+    finally:
+        await gwy.stop()
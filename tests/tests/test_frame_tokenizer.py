@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the (fixed-offset) tokenizer of frames."""
+
+from datetime import datetime as dt
+from time import perf_counter
+from timeit import repeat
+
+import pytest
+
+from ramses_tx import exceptions as exc
+from ramses_tx.const import COMMAND_REGEX
+from ramses_tx.frame import _tokenize
+from ramses_tx.packet import Packet
+
+from .helpers import load_corpus_lines
+
+
+def _split(frame: str) -> tuple[str, str, str, str, str, str]:
+    """Tokenize a frame by splitting it (the previous method)."""
+
+    fields = frame.lstrip().split(" ")
+    return (
+        frame[:2],
+        fields[1],
+        " ".join(fields[i] for i in range(2, 5)),
+        fields[5],
+        fields[6],
+        fields[7],
+    )
+
+
+def test_tokenize_same_fields() -> None:
+    """Check the tokenizer returns the same fields as splitting the frame."""
+
+    num_frames = 0
+    for _, pkt_line in load_corpus_lines():
+        frame = pkt_line[4:].split(" < ")[0].split(" * ")[0].strip()
+        if not COMMAND_REGEX.match(frame):
+            continue
+        num_frames += 1
+
+        fields = _split(frame)
+        if len(fields[5]) != int(fields[4]) * 2:
+            with pytest.raises(exc.PacketInvalid, match="invalid payload"):
+                _tokenize(frame)
+        else:
+            assert _tokenize(frame) == fields
+
+    assert num_frames
+
+
+@pytest.mark.parametrize(
+    "frame",
+    (
+        "RQ --- 01:078710 10:067219 --:------ 3220 005 00000500",  # length mismatch
+        "RQ --- 01:078710 10:067219 --:------ 3220 005 0000050000 ",
+        "RQ --- 01:078710 10:067219 --:------ 3220 05 0000050000",
+        "RQ --- 01:078710 10:067219 --:------ 3220 005 00000500XX",
+        "RQ ---  01:078710 10:067219 --:------ 3220 005 0000050000",
+        "XX --- 01:078710 10:067219 --:------ 3220 005 0000050000",
+    ),
+)
+def test_tokenize_invalid(frame: str) -> None:
+    """Check the tokenizer rejects invalid frames."""
+
+    with pytest.raises(exc.PacketInvalid, match="Bad frame"):
+        _tokenize(frame)
+
+
+@pytest.mark.benchmark
+def test_tokenize_benchmark() -> None:
+    """Check the rate of creating packets via Packet.from_file & Packet.from_port."""
+
+    corpus = load_corpus_lines() * 10
+    dtm = dt.now()
+
+    t0 = perf_counter()
+    for dtm_str, pkt_line in corpus:
+        try:
+            Packet.from_file(dtm_str, pkt_line)
+        except (exc.PacketInvalid, ValueError):
+            pass
+    file_secs = perf_counter() - t0
+
+    t0 = perf_counter()
+    for _, pkt_line in corpus:
+        try:
+            Packet.from_port(dtm, pkt_line)
+        except (exc.PacketInvalid, ValueError):
+            pass
+    port_secs = perf_counter() - t0
+
+    def split() -> None:
+        for _, pkt_line in corpus:
+            frame = pkt_line[4:]
+            if COMMAND_REGEX.match(frame):
+                _split(frame)
+
+    def tokenize() -> None:
+        for _, pkt_line in corpus:
+            try:
+                _tokenize(pkt_line[4:])
+            except exc.PacketInvalid:
+                pass
+
+    split_secs = min(repeat(split, number=1, repeat=3))  # the best of 3
+    tokenize_secs = min(repeat(tokenize, number=1, repeat=3))
+
+    print(
+        f"\n{len(corpus)} frames: from_file {len(corpus) / file_secs:,.0f}/s"
+        f", from_port {len(corpus) / port_secs:,.0f}/s"
+        f" (split {len(corpus) / split_secs:,.0f}/s"
+        f", tokenize {len(corpus) / tokenize_secs:,.0f}/s)"
+    )
+
+    assert tokenize_secs < split_secs  # vs a regex match, then a split
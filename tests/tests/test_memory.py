@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the memory footprint of retained messages (e.g. a Gateway's state)."""
+
+import gc
+import sys
+from collections.abc import Iterator
+from datetime import datetime as dt, timedelta as td
+
+import pytest
+
+from ramses_tx import Address, Message, Packet
+from ramses_tx.address import id_to_address
+
+NUM_MSGS = 100_000
+NUM_DEVICES = 500
+
+MAX_BYTES_PER_MSG = 1_200  # was ~1,500 before __slots__ & interning
+
+DTM = dt(2022, 11, 4, 10, 0, 0)
+
+
+def _frames(num_msgs: int) -> Iterator[tuple[dt, str]]:
+    """Yield a mix of packets (30C9 & 3150) from TRVs to their controllers."""
+
+    for i in range(num_msgs):
+        src, dst = f"04:{i % NUM_DEVICES:06d}", f"01:{i % NUM_DEVICES // 10:06d}"
+        zone_idx = f"{i % NUM_DEVICES % 12:02X}"
+
+        if i % 2:
+            frame = (
+                f"045  I --- {src} --:------ {dst} 30C9 003 {zone_idx}{i % 4096:04X}"
+            )
+        else:
+            frame = f"045  I --- {src} --:------ {dst} 3150 002 {zone_idx}{i % 200:02X}"
+        yield DTM + td(seconds=i), frame
+
+
+def _retained_size(objs: list[Message]) -> int:
+    """Return the total size of the objects reachable from the messages.
+
+    Objects shared between messages (e.g. interned Addresses) are counted only once, and
+    objects that are shared with the rest of the process (e.g. modules) are excluded.
+    """
+
+    seen: set[int] = {id(objs)}
+    excluded = (type, type(sys), type(_retained_size))  # classes, modules, functions
+
+    size = 0
+    pending: list[object] = list(objs)
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, excluded):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+
+    return size
+
+
+def test_interned_addresses() -> None:
+    """Check addresses (and their device ids) are shared between packets."""
+
+    pkts = [Packet(dtm, frame) for dtm, frame in _frames(NUM_DEVICES * 2)]
+
+    assert pkts[0].src is pkts[NUM_DEVICES].src
+    assert pkts[0].src is id_to_address(pkts[0].src.id)
+    assert pkts[0].code is pkts[2].code  # e.g. "3150"
+
+    with pytest.raises(AttributeError):  # as have __slots__
+        pkts[0].src.xxx = None  # type: ignore[attr-defined]
+    with pytest.raises(AttributeError):
+        pkts[0].xxx = None  # type: ignore[attr-defined]
+
+    assert isinstance(pkts[0].src, Address)
+
+
+def test_message_memory() -> None:
+    """Check the bytes per retained message, for a state of 10K messages."""
+
+    msgs = [Message(Packet(dtm, frame)) for dtm, frame in _frames(NUM_MSGS // 10)]
+
+    assert _retained_size(msgs) / len(msgs) < MAX_BYTES_PER_MSG
+
+
+@pytest.mark.benchmark
+def test_message_memory_benchmark() -> None:
+    """Report the bytes per retained message, for a state of 100K messages."""
+
+    msgs = [Message(Packet(dtm, frame)) for dtm, frame in _frames(NUM_MSGS)]
+
+    size = _retained_size(msgs)
+
+    assert len({id(m.src) for m in msgs}) == NUM_DEVICES  # interned
+    assert size / NUM_MSGS < MAX_BYTES_PER_MSG
+
+    print(
+        f"\n{NUM_MSGS:,} msgs retained in {size / 1024 / 1024:.1f} MiB"
+        f" ({size / NUM_MSGS:.0f} bytes/msg)"
+    )
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the message index (in memory, and backed by a file)."""
+
+import asyncio
+import json
+import sqlite3
+from datetime import timedelta as td
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+import pytest
+
+from ramses_rf import Gateway
+from ramses_rf.database import MAX_RETENTION, MessageIndex
+from ramses_rf.schemas import SCH_GLOBAL_CONFIG
+from ramses_tx import Code, Message, Packet
+from ramses_tx.const import RP
+
+from .helpers import TEST_DIR
+
+WORK_DIR = f"{TEST_DIR}/systems/heat_zxdavb"
+
+PACKETS = {
+    "2022-11-04T10:00:00.000000": "045  I --- 01:145038 --:------ 01:145038 1F09 003 FF04B5",
+    "2022-11-04T10:00:01.000000": "045  I --- 01:145038 --:------ 01:145038 0008 002 FA00",
+    "2022-11-04T10:00:02.000000": "045  I --- 01:145038 --:------ 01:145038 3150 002 FC00",
+    "2022-11-04T10:00:03.000000": "045 RP --- 01:145038 18:006402 --:------ 0004 022 00004B69746368656E00000000000000000000000000",
+}
+
+
+def _msgs() -> list[Message]:
+    return [Message(Packet.from_dict(dtm, pkt)) for dtm, pkt in PACKETS.items()]
+
+
+def _num_rows(db_path: Path) -> int:
+    """Return the number of (committed) rows, as seen by another connection."""
+    cx = sqlite3.connect(db_path)
+    try:
+        return cx.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    finally:
+        cx.close()
+
+
+async def test_index_in_memory() -> None:
+    """Check the (default) in-memory index is not affected by the file-backed mode."""
+
+    idx = MessageIndex()
+    try:
+        for msg in _msgs():
+            idx.add(msg)
+
+        assert not idx.is_file_backed and not idx.is_warm
+        assert len(idx.get(src="01:145038")) == len(PACKETS)
+    finally:
+        idx.stop()
+
+
+async def test_index_group_commit(tmp_path: Path) -> None:
+    """Check writes are committed every N messages, or after T seconds."""
+
+    db_path = tmp_path / "msgs.db"
+    idx = MessageIndex(str(db_path), commit_batch_size=3, commit_interval=0.05)
+
+    try:
+        msgs = _msgs()
+
+        idx.add(msgs[0])
+        idx.add(msgs[1])
+        assert _num_rows(db_path) == 0  # not yet committed
+
+        idx.add(msgs[2])
+        assert _num_rows(db_path) == 3  # committed, as batch size reached
+
+        idx.add(msgs[3])
+        assert _num_rows(db_path) == 3
+
+        await asyncio.sleep(0.1)
+        assert _num_rows(db_path) == 4  # committed, as interval passed
+
+    finally:
+        idx.stop()
+
+
+async def test_index_warm_start(tmp_path: Path) -> None:
+    """Check a file-backed index rehydrates its messages lazily."""
+
+    db_path = str(tmp_path / "msgs.db")
+
+    idx = MessageIndex(db_path)
+    for msg in _msgs():
+        idx.add(msg)
+    idx.stop()  # will commit any pending writes
+
+    idx = MessageIndex(db_path)
+    try:
+        assert idx.is_warm
+        assert len(idx._msgs) == 0  # nothing rehydrated yet
+
+        msgs = idx.get(code="3150")
+        assert len(idx._msgs) == 1  # only those accessed are rehydrated
+        assert msgs[0].payload == _msgs()[2].payload
+
+        assert [str(m) for m in idx.all(include_expired=True)] == [
+            str(m) for m in _msgs()
+        ]
+    finally:
+        idx.stop()
+
+
+async def test_index_old_schema(tmp_path: Path) -> None:
+    """Check an index with an older schema is rebuilt (rather than failing)."""
+
+    db_path = tmp_path / "msgs.db"
+
+    cx = sqlite3.connect(db_path)  # as per an earlier version of the schema
+    cx.execute(
+        "CREATE TABLE messages (dtm TEXT(26) NOT NULL PRIMARY KEY, verb TEXT(2),"
+        " src TEXT(9), dst TEXT(9), code TEXT(4), ctx TEXT, hdr TEXT UNIQUE, pkt TEXT)"
+    )
+    cx.execute("INSERT INTO messages VALUES ('x', 'x', 'x', 'x', 'x', 'x', 'x', 'x')")
+    cx.commit()
+    cx.close()
+
+    idx = MessageIndex(str(db_path))
+    try:
+        assert not idx.is_warm  # the old rows were discarded
+
+        for msg in _msgs():
+            idx.add(msg)
+        assert len(idx.get(src="01:145038")) == len(PACKETS)
+    finally:
+        idx.stop()
+
+
+async def _gwy_from_log(db_path: str, log_file: str, **kwargs: Any) -> Gateway:
+    with open(f"{WORK_DIR}/config.json") as f:
+        config = {k: v for k, v in json.load(f).items() if k[:1] != "_"}
+    config.setdefault("config", {})["message_db"] = db_path
+
+    with open(log_file) as f:
+        gwy = Gateway(None, input_file=f, **SCH_GLOBAL_CONFIG(config))
+        await gwy.start(**kwargs)
+        await gwy._protocol.wait_for_connection_lost()  # until packet log is EOF
+
+    return gwy
+
+
+async def test_gateway_warm_start(tmp_path: Path) -> None:
+    """Check a gateway restores its entities from a warm index (not from a cache)."""
+
+    db_path = str(tmp_path / "msgs.db")
+    (empty_log := tmp_path / "empty.log").touch()
+
+    gwy = await _gwy_from_log(db_path, f"{WORK_DIR}/packet.log")
+    schema, packets = gwy.get_state()
+    devices = sorted(d.id for d in gwy.devices)
+    await gwy.stop()
+
+    gwy = await _gwy_from_log(db_path, str(empty_log), cached_packets=packets)
+    try:
+        assert gwy._zzz and gwy._zzz.is_warm
+        assert sorted(d.id for d in gwy.devices) == devices
+        assert gwy.schema == schema
+    finally:
+        await gwy.stop()
+
+
+async def test_gateway_entity_views() -> None:
+    """Check the entities' views are those of the index, and are not modified."""
+
+    gwy = await _gwy_from_log(":memory:", f"{WORK_DIR}/packet.log")
+    try:
+        assert gwy._zzz  # mypy check
+        for dev in gwy.devices:
+            assert dev._msgz is gwy._zzz.entity_msgz(dev.id)
+            assert all(v and all(v.values()) for v in dev._msgz.values())
+
+        otb = gwy.device_by_id["10:048122"]
+        assert otb._msgz[Code._3220][RP]  # is populated from the msgs, not seeded
+        assert otb.supported_cmds_ot
+    finally:
+        await gwy.stop()
+
+
+def _replacing_msgs(num_devices: int, num_rounds: int) -> list[Message]:
+    """Return rounds of 30C9s from the devices, each round replacing the previous."""
+
+    return [
+        Message(
+            Packet.from_dict(
+                f"2022-11-04T{10 + r // 6:02d}:{r % 6 * 10:02d}:{d // 60:02d}.{d % 60:06d}",
+                f"045  I --- 34:{d:06d} --:------ 34:{d:06d} 30C9 003 00{r:02X}{d % 256:02X}",
+            )
+        )
+        for r in range(num_rounds)
+        for d in range(num_devices)
+    ]
+
+
+def _add_msgs(msgs: list[Message], num_devices: int) -> float:
+    """Add the msgs to an index, check the older msgs were replaced; return the time."""
+
+    idx = MessageIndex()
+    try:
+        t0 = perf_counter()
+        olds = [idx.add(msg) for msg in msgs]
+        elapsed = perf_counter() - t0
+
+        assert sum(1 for o in olds if o is not None) == len(msgs) - num_devices
+        assert len(idx._msgs) == num_devices  # the replaced msgs have been removed
+        assert len(idx.get(code="30C9")) == num_devices
+
+    finally:
+        idx.stop()
+
+    return elapsed
+
+
+async def test_index_add_replaces() -> None:
+    """Check adding a message to the index replaces any older msg (by hdr)."""
+
+    _add_msgs(_replacing_msgs(20, 3), 20)
+
+
+@pytest.mark.benchmark
+async def test_index_add_benchmark() -> None:
+    """Check the cost of adding a message to the index (most replace an older msg)."""
+
+    num_devices, num_rounds = 200, 20
+
+    msgs = _replacing_msgs(num_devices, num_rounds)
+    elapsed = _add_msgs(msgs, num_devices)
+
+    print(
+        f"\n{len(msgs)} msgs added in {elapsed:.3f}s"
+        f" ({elapsed / len(msgs) * 1e6:.1f} us/msg)"
+    )
+
+    assert elapsed / len(msgs) < 250e-6  # is ~30 us/msg
+
+
+async def test_index_entity_views() -> None:
+    """Check the per-entity views are maintained as msgs are added/replaced/removed."""
+
+    idx = MessageIndex()
+    try:
+        msgs = _msgs()
+        for msg in msgs:
+            idx.add(msg)
+
+        ctl_msgs = idx.entity_msgs("01:145038")
+        ctl_msgz = idx.entity_msgz("01:145038")
+
+        assert set(ctl_msgs) == {"1F09", "0008", "3150", "0004"}
+        assert ctl_msgz["0004"]["RP"] == {"00": msgs[3]}
+        assert idx.entity_msgs("18:006402") == {"0004": msgs[3]}  # the dst of an RP
+
+        new = Message(  # will replace msgs[2], as it has the same hdr
+            Packet.from_dict(
+                "2022-11-04T10:00:04.000000",
+                "045  I --- 01:145038 --:------ 01:145038 3150 002 FC64",
+            )
+        )
+        assert idx.add(new) is msgs[2]
+        assert ctl_msgs["3150"] is new
+        assert ctl_msgz["3150"][" I"] == {"FC": new}
+
+        idx.rem(msgs[3])
+        assert "0004" not in ctl_msgs and "0004" not in ctl_msgz  # no empty levels
+        assert idx.entity_msgs("18:006402") == {}
+
+    finally:
+        idx.stop()
+
+
+async def test_index_entity_views_warm(tmp_path: Path) -> None:
+    """Check the per-entity views rehydrate only the msgs of that entity."""
+
+    db_path = str(tmp_path / "msgs.db")
+
+    idx = MessageIndex(db_path)
+    for msg in _msgs():
+        idx.add(msg)
+    idx.stop()
+
+    idx = MessageIndex(db_path)
+    try:
+        assert idx.entity_msgs("18:006402")["0004"].payload == _msgs()[3].payload
+        assert len(idx._msgs) == 1  # only those of the entity are rehydrated
+
+        assert len(idx.entity_msgs("01:145038")) == len(PACKETS)
+    finally:
+        idx.stop()
+
+
+async def test_index_expiry() -> None:
+    """Check expired msgs are evicted as newer msgs are added (as per their lifespan)."""
+
+    idx = MessageIndex()
+    try:
+        msgs = _msgs()
+        for msg in msgs:
+            idx.add(msg)
+
+        assert idx.metrics["size"] == len(PACKETS)
+        assert idx.metrics["next_expiry"] == msgs[0].dtm + td(seconds=723)  # 1F09
+
+        idx.add(  # a 1F09 has a lifespan of 360s, so will expire after 723s
+            Message(
+                Packet.from_dict(
+                    "2022-11-04T10:15:00.000000",
+                    "045 RQ --- 18:006402 01:145038 --:------ 0004 002 0000",
+                )
+            )
+        )
+        assert not idx.get(code="1F09")
+        assert idx.metrics["num_evicted"] == 1
+        assert idx.metrics["size"] == len(PACKETS)
+
+        num_evicted = idx._evict_expired(msgs[-1].dtm + MAX_RETENTION)
+        assert num_evicted == len(PACKETS) - 1  # but not the RQ
+        assert idx.metrics["num_evicted"] == len(PACKETS)
+        assert idx.entity_msgs("01:145038") == {}
+
+    finally:
+        idx.stop()
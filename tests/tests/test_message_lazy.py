@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the lazy decoding of message payloads."""
+
+from time import perf_counter
+
+import pytest
+
+from ramses_rf import Gateway
+from ramses_rf.const import DONT_CREATE_ENTITIES
+from ramses_rf.schemas import SZ_REDUCE_PROCESSING
+from ramses_tx import exceptions as exc, message
+from ramses_tx.message import Message
+from ramses_tx.packet import Packet
+from ramses_tx.parsers import parse_payload
+
+from .helpers import TEST_DIR, load_corpus
+
+PKT_LOG = f"{TEST_DIR}/systems/heat_zxdavb/packet.log"
+
+
+def _eager_msgs(pkts: list[Packet]) -> dict[int, Message]:
+    result = {}
+    for i, pkt in enumerate(pkts):
+        try:
+            result[i] = Message(pkt)
+        except exc.PacketInvalid:
+            continue
+    return result
+
+
+def test_lazy_same_payloads(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check lazy msgs are parsed only when accessed, with the same payloads."""
+
+    pkts = load_corpus()
+    eager = _eager_msgs(pkts)
+
+    num_calls = 0
+
+    def parse_payload_(msg: Message) -> dict | list[dict]:  # type: ignore[type-arg]
+        nonlocal num_calls
+        num_calls += 1
+        return parse_payload(msg)
+
+    monkeypatch.setattr(message, "parse_payload", parse_payload_)
+
+    lazy = {i: Message(pkts[i], lazy=True) for i in eager}
+    assert num_calls == 0
+
+    for i, msg in lazy.items():
+        assert msg.payload == eager[i].payload
+        assert msg.payload is msg.payload  # memoised
+
+    assert 0 < num_calls <= len(lazy)
+
+
+def test_lazy_failures(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check invalid payloads raise at creation, and unparseable ones on each access."""
+
+    with pytest.raises(exc.PacketPayloadInvalid):  # fails the schema (regex)
+        Message(
+            Packet.from_dict(
+                "2022-11-04T10:00:00.000000",
+                "045  I --- 01:145038 --:------ 01:145038 1F09 003 AA04B5",
+            ),
+            lazy=True,
+        )
+
+    def parse_payload_(msg: Message) -> dict:  # type: ignore[type-arg]
+        raise AssertionError("unparseable")
+
+    monkeypatch.setattr(message, "parse_payload", parse_payload_)
+
+    msg = Message(
+        Packet.from_dict(
+            "2022-11-04T10:00:00.000000",
+            "045  I --- 01:145038 --:------ 01:145038 1F09 003 FF04B5",
+        ),
+        lazy=True,
+    )
+
+    for _ in range(3):  # deterministic: raises every time it is accessed
+        with pytest.raises(exc.PacketInvalid, match="Bad packet"):
+            _ = msg.payload
+
+    assert "FF04B5" in str(msg)
+
+
+async def test_lazy_gateway() -> None:
+    """Check a gateway that doesn't create entities decodes lazily."""
+
+    with open(PKT_LOG) as f:
+        gwy = Gateway(
+            None,
+            input_file=f,
+            config={SZ_REDUCE_PROCESSING: DONT_CREATE_ENTITIES},
+        )
+        await gwy.start()
+        await gwy._protocol._wait_connection_lost
+
+    try:
+        assert gwy._protocol._lazy_decoding
+        assert gwy._this_msg and gwy._this_msg._payload is message._NOT_PARSED
+        assert gwy._this_msg.payload
+    finally:
+        await gwy.stop()
+
+
+@pytest.mark.benchmark
+def test_lazy_benchmark() -> None:
+    """Check the cost of creating msgs that are only routed/stored (not parsed)."""
+
+    corpus = load_corpus()
+    pkts = [corpus[i] for i in _eager_msgs(corpus)] * 10
+
+    t0 = perf_counter()
+    for pkt in pkts:
+        Message(pkt)
+    eager_secs = perf_counter() - t0
+
+    t0 = perf_counter()
+    for pkt in pkts:
+        Message(pkt, lazy=True)
+    lazy_secs = perf_counter() - t0
+
+    print(
+        f"\n{len(pkts)} msgs: eager {len(pkts) / eager_secs:,.0f}/s"
+        f", lazy {len(pkts) / lazy_secs:,.0f}/s"
+    )
+
+    assert lazy_secs < eager_secs / 2  # is ~5x faster
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the (binary) packet archives."""
+
+from datetime import UTC, datetime as dt
+from pathlib import Path
+from time import perf_counter
+
+import pytest
+
+from ramses_rf import Gateway
+from ramses_tx import Packet
+from ramses_tx import exceptions as exc
+from ramses_tx.archive import (
+    archive_frames,
+    archive_records,
+    convert_packet_log,
+    is_packet_archive,
+    write_archive,
+)
+from ramses_tx.compressed_log import packet_log_frames
+from ramses_tx.schemas import SZ_REPLAY_END, SZ_REPLAY_START
+
+from .helpers import TEST_DIR
+
+PKT_LOG = f"{TEST_DIR}/systems/heat_zxdavb/packet.log"  # 10:02:02 to 10:06:57
+
+START, END = dt(2022, 5, 2, 10, 4), dt(2022, 5, 2, 10, 5)
+
+
+def _log_frames() -> list[tuple[dt, str]]:
+    """Return the (dtm, frame) pairs of the packet log, as Packet() would parse them."""
+
+    result = []
+    for dtm_str, pkt_line in packet_log_frames(PKT_LOG):
+        frame, err_msg, _ = Packet._partition(pkt_line)
+        if frame and not err_msg:
+            result.append((dt.fromisoformat(dtm_str), frame))
+    return result
+
+
+@pytest.fixture()
+def rpa_file(tmp_path: Path) -> str:
+    file_name = str(tmp_path / "packet.rpa")
+    convert_packet_log(PKT_LOG, file_name)
+    return file_name
+
+
+def test_archive_round_trip(rpa_file: str) -> None:
+    """Check the frames of an archive are identical to those of the packet log."""
+
+    expected = _log_frames()
+    assert list(archive_frames(rpa_file)) == expected
+
+    with open(rpa_file, "rb") as f:
+        assert is_packet_archive(f)
+    with open(PKT_LOG, "rb") as f:
+        assert not is_packet_archive(f)
+
+
+def test_archive_packets(rpa_file: str) -> None:
+    """Check packets made from the fields of an archive are as if made from text."""
+
+    num_pkts = 0
+    for (dtm, frame), (_, rssi, fields) in zip(
+        _log_frames(), archive_records(rpa_file), strict=True
+    ):
+        try:
+            expected = Packet(dtm, frame)
+        except exc.PacketInvalid:
+            with pytest.raises(exc.PacketInvalid):
+                Packet._from_fields(dtm, rssi, fields)  # type: ignore[arg-type]
+            continue
+
+        assert isinstance(fields, tuple)  # all the valid frames were packed
+        pkt = Packet._from_fields(dtm, rssi, fields)
+        assert (pkt.dtm, pkt._rssi, pkt._frame) == (dtm, rssi, expected._frame)
+        assert (pkt.src, pkt.dst, pkt._addrs) == (
+            expected.src,
+            expected.dst,
+            expected._addrs,
+        )
+        num_pkts += 1
+
+    assert num_pkts
+
+
+def test_archive_raw_frames(tmp_path: Path) -> None:
+    """Check frames that can't be packed are archived (and restored) as text."""
+
+    frames = {
+        "2022-05-02T10:00:00.000000": "045  I --- 01:145038 --:------ 01:145038 1F09 003 FF04B5",
+        "2022-05-02T10:00:01.000000": "045  I --- 01:145038 --:------ 01:145038 1F09 003 ff04b5",
+        "2022-05-02T10:00:02.000000": "045  I --- 01:145038 --:------ 01:145038 1F09 002 FF04B5",
+        "2022-05-02T10:00:03.000000": "...  I 123 99:145038 --:------ 01:145038 1F09 003 FF04B5",
+    }
+
+    file_name = str(tmp_path / "raw.rpa")
+    assert write_archive(frames.items(), file_name) == len(frames)
+
+    assert list(archive_frames(file_name)) == [
+        (dt.fromisoformat(d), f) for d, f in frames.items()
+    ]
+
+
+def test_archive_window(rpa_file: str) -> None:
+    """Check only the frames within the window are returned."""
+
+    expected = [(d, f) for d, f in _log_frames() if START <= d < END]
+    assert expected and list(archive_frames(rpa_file, start=START, end=END)) == expected
+
+
+def test_archive_aware_dtms(tmp_path: Path, rpa_file: str) -> None:
+    """Check aware dtms (e.g. from MQTT) are archived/windowed as naive local time."""
+
+    aware = dt(2022, 5, 2, 10, 0, tzinfo=UTC)
+    frame = "045  I --- 01:145038 --:------ 01:145038 1F09 003 FF04B5"
+
+    file_name = str(tmp_path / "aware.rpa")
+    assert write_archive([(aware.isoformat(), frame)], file_name) == 1
+    assert list(archive_frames(file_name)) == [
+        (aware.astimezone().replace(tzinfo=None), frame)
+    ]
+
+    start, end = (d.astimezone(UTC) for d in (START.astimezone(), END.astimezone()))
+    assert list(archive_frames(rpa_file, start=start, end=end)) == list(
+        archive_frames(rpa_file, start=START, end=END)
+    )
+
+
+async def test_archive_replay(rpa_file: str) -> None:
+    """Check a Gateway can replay (a time window of) a packet archive."""
+
+    with open(rpa_file, "rb") as f:
+        gwy = Gateway(
+            None, input_file=f, config={SZ_REPLAY_START: START, SZ_REPLAY_END: END}
+        )
+        await gwy.start()
+        await gwy._protocol._wait_connection_lost
+
+    try:
+        assert gwy._this_msg
+        assert gwy._this_msg.dtm.isoformat()[:16] == "2022-05-02T10:04"
+    finally:
+        await gwy.stop()
+
+
+def test_archive_size(rpa_file: str) -> None:
+    """Check an archive is much smaller than its packet log."""
+
+    assert Path(rpa_file).stat().st_size < Path(PKT_LOG).stat().st_size / 4
+
+
+@pytest.mark.benchmark
+def test_archive_benchmark(rpa_file: str) -> None:
+    """Check the rate of making packets from an archive, vs from its packet log."""
+
+    def from_log() -> int:
+        count = 0
+        with open(PKT_LOG) as f:
+            for line in f:
+                if (line := line.strip()) and line[:1] != "#":
+                    try:
+                        Packet.from_file(line[:26], line[27:])
+                    except (exc.PacketInvalid, ValueError):
+                        continue
+                    count += 1
+        return count
+
+    def from_rpa() -> int:
+        count = 0
+        for dtm, rssi, fields in archive_records(rpa_file):
+            if isinstance(fields, tuple):
+                Packet._from_fields(dtm, rssi, fields)
+                count += 1
+        return count
+
+    t0 = perf_counter()
+    for _ in range(10):
+        num_pkts = from_log()
+    text_secs = perf_counter() - t0
+
+    t0 = perf_counter()
+    for _ in range(10):
+        assert from_rpa() == num_pkts
+    rpa_secs = perf_counter() - t0
+
+    print(
+        f"\n{num_pkts * 10} packets: text log {num_pkts * 10 / text_secs:,.0f}/s"
+        f" ({Path(PKT_LOG).stat().st_size:,} bytes)"
+        f", archive {num_pkts * 10 / rpa_secs:,.0f}/s"
+        f" ({Path(rpa_file).stat().st_size:,} bytes)"
+    )
+
+    assert rpa_secs < text_secs  # no lines to partition, nor frames to tokenize
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the (asynchronous) packet log writer."""
+
+import logging
+import threading
+from pathlib import Path
+
+from ramses_tx import Packet
+from ramses_tx.logger import (
+    DROP_NEWEST,
+    DROP_OLDEST,
+    QueuedPktLogHandler,
+    getLogger,
+    set_pkt_logging,
+)
+
+FRAMES = [
+    (
+        f"2022-11-04T10:00:{i:02d}.000000",
+        f"045  I --- 01:145038 --:------ 01:145038 3150 002 FC{i:02X}",
+    )
+    for i in range(50)
+]
+
+
+def _log_packets(logger: logging.Logger) -> None:
+    for dtm, frame in FRAMES:
+        logger.info("", extra=Packet.from_dict(dtm, frame)._log_extra)
+
+
+def _write_log(file_name: Path, **kwargs: int | str) -> list[str]:
+    logger = getLogger(f"{__name__}.{file_name.stem}", pkt_log=True)
+
+    disabled = logging.root.manager.disable  # as may be set by other tests
+    logging.disable(logging.NOTSET)
+    try:
+        set_pkt_logging(logger, file_name=str(file_name), **kwargs)  # type: ignore[arg-type]
+        _log_packets(logger)
+    finally:
+        logging.disable(disabled)
+
+    for handler in logger.handlers:
+        handler.close()  # will write any queued records
+        logger.removeHandler(handler)
+
+    lines = file_name.read_text().splitlines()[1:]  # exclude the initial log line
+    return [ln[27:] for ln in lines]  # exclude the timestamps
+
+
+def test_queued_pkt_log(tmp_path: Path) -> None:
+    """Check the packet log written via the queue is the same as when written directly."""
+
+    expected = _write_log(tmp_path / "direct.log")
+    actual = _write_log(tmp_path / "queued.log", queue_size=len(FRAMES) * 2)
+
+    assert len(expected) == len(FRAMES)
+    assert actual == expected
+
+
+class _BlockedStream:
+    """A stream that blocks writes until released (e.g. a very slow SD card)."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.released = threading.Event()
+
+    def write(self, text: str) -> None:
+        self.released.wait()
+        self.lines.append(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def _queued_handler(on_queue_full: str) -> tuple[QueuedPktLogHandler, _BlockedStream]:
+    stream = _BlockedStream()
+    handler = QueuedPktLogHandler(
+        logging.StreamHandler(stream),  # type: ignore[arg-type]
+        queue_size=5,
+        on_queue_full=on_queue_full,
+    )
+    handler.setFormatter(logging.Formatter("%(msg)s"))
+    return handler, stream
+
+
+def _make_record(msg: str) -> logging.LogRecord:
+    return logging.LogRecord(__name__, logging.INFO, __file__, 0, msg, None, None)
+
+
+def test_queued_pkt_log_drops() -> None:
+    """Check records are dropped (and counted) when the writer can't keep up."""
+
+    for policy, kept in ((DROP_NEWEST, "0"), (DROP_OLDEST, "19")):
+        handler, stream = _queued_handler(policy)
+        handler._handler.setFormatter(logging.Formatter("%(msg)s"))
+
+        for i in range(20):
+            handler.handle(_make_record(str(i)))
+
+        assert handler.metrics["num_dropped"] > 0
+        assert handler.metrics["max_queue_depth"] == 5
+
+        stream.released.set()
+        handler.close()
+
+        assert len(stream.lines) + handler.metrics["num_dropped"] == 20
+        assert handler.metrics["num_written"] == len(stream.lines)
+        assert kept + "\n" in stream.lines
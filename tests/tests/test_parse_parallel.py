@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the parallel parsing of packet logs (using a process pool)."""
+
+from pathlib import Path
+
+import pytest
+
+from ramses_rf import Gateway
+from ramses_tx import Message, Packet, parse_packet_log
+from ramses_tx.exceptions import PacketInvalid
+from ramses_tx.schemas import SZ_PARSE_JOBS
+
+from .helpers import TEST_DIR
+
+WORK_DIR = f"{TEST_DIR}/systems"
+
+# the latter half of an array is a separate packet (i.e. will be in another shard)
+ARRAY_FRAGMENTS = (
+    "2024-01-19T02:17:58.000004 ...  I --- 01:111111 --:------ 01:111111 000A 048 001001F40BB8011101F40BB8021101F40BB8031001F40BB8041001F40BB8051001F40BB8061001F40BB8071001F40BB8\n"
+    "2024-01-19T02:17:59.000005 ...  I --- 01:111111 --:------ 01:111111 000A 006 081001F40BB8\n"
+)
+
+
+def _log_file_frames(file_name: Path) -> list[tuple[str, str]]:
+    with open(file_name) as f:
+        return [
+            (ln[:26], ln[27:])
+            for ln in (ln.strip() for ln in f)
+            if ln and ln[:1] != "#"
+        ]
+
+
+async def test_parse_packet_log() -> None:
+    """Check the parallel parser yields the same messages, in the same order."""
+
+    frames = _log_file_frames(Path(f"{WORK_DIR}/heat_zxdavb/packet.log"))
+
+    expected = []
+    for dtm_str, frame in frames:
+        try:
+            expected.append(Message(Packet.from_file(dtm_str, frame)))
+        except (PacketInvalid, ValueError):
+            continue
+
+    actual = [m async for m in parse_packet_log(frames, jobs=2, shard_size=50)]
+
+    assert [(m.dtm, str(m), m.payload) for m in actual] == [
+        (m.dtm, str(m), m.payload) for m in expected
+    ]
+
+
+async def test_parse_array_fragments(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Check array fragments are merged, even if they are in different shards."""
+
+    monkeypatch.setattr("ramses_tx.parallel.DEFAULT_SHARD_SIZE", 1)
+
+    file_name = tmp_path / "packet.log"
+    file_name.write_text(ARRAY_FRAGMENTS)
+
+    with open(file_name) as f:
+        gwy = Gateway(None, input_file=f, config={SZ_PARSE_JOBS: 2})
+        await gwy.start()
+        await gwy._protocol._wait_connection_lost
+
+    try:
+        assert gwy._this_msg and isinstance(gwy._this_msg.payload, list)
+        assert [z["zone_idx"] for z in gwy._this_msg.payload] == [
+            f"{i:02X}" for i in range(9)
+        ]
+    finally:
+        await gwy.stop()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the cache of parsed payloads."""
+
+import copy
+import pickle
+from collections.abc import Iterator
+from time import perf_counter
+
+import pytest
+
+from ramses_tx import exceptions as exc
+from ramses_tx.message import Message
+from ramses_tx.packet import Packet
+from ramses_tx.parsers import PAYLOAD_CACHE, _PayloadCache
+
+from .helpers import load_corpus
+
+
+def _payloads(pkts: list[Packet]) -> dict[int, dict | list[dict]]:  # type: ignore[type-arg]
+    result = {}
+    for i, pkt in enumerate(pkts):
+        try:
+            result[i] = Message(pkt).payload
+        except exc.PacketInvalid:
+            continue
+    return result
+
+
+def _msgs(pkts: list[Packet]) -> list[Message]:
+    """Return a msg for every packet with a parseable payload."""
+
+    msgs = (Message(pkts[i]) for i in _payloads(pkts))
+    return [m for m in msgs if m._has_payload]
+
+
+@pytest.fixture
+def payload_cache() -> Iterator[_PayloadCache]:
+    """Yield the (shared) payload cache, enabled, restoring its state afterwards."""
+
+    enabled = PAYLOAD_CACHE.enabled
+    PAYLOAD_CACHE.enabled = True
+    PAYLOAD_CACHE.clear()
+    try:
+        yield PAYLOAD_CACHE
+    finally:
+        PAYLOAD_CACHE.enabled = enabled
+        PAYLOAD_CACHE.clear()
+
+
+def test_cache_same_payloads(payload_cache: _PayloadCache) -> None:
+    """Check cached payloads are the same as uncached payloads."""
+
+    pkts = load_corpus()
+
+    payload_cache.enabled = False
+    uncached = _payloads(pkts)
+    assert payload_cache.metrics["entries"] == 0
+
+    payload_cache.enabled = True
+    assert _payloads(pkts) == uncached
+    assert _payloads(pkts) == uncached  # this time, from the cache
+
+    metrics = payload_cache.metrics
+    assert metrics["hits"] >= metrics["misses"] > 0
+    assert metrics["uncacheable"] > 0  # e.g. 1F09
+
+
+def test_cache_read_only(payload_cache: _PayloadCache) -> None:
+    """Check cached payloads are shared and read-only, but their copies aren't."""
+
+    pkt = Packet.from_dict(
+        "2022-11-04T10:00:00.000000",
+        "045  I --- 01:145038 --:------ 01:145038 30C9 009 0007D60107C60207DC",
+    )
+    payload = Message(pkt).payload
+
+    assert isinstance(payload, list) and len(payload) == 3
+    assert Message(pkt).payload is payload  # shared
+
+    with pytest.raises(TypeError, match="read-only"):
+        payload.append({})
+    with pytest.raises(TypeError, match="read-only"):
+        payload[0]["temperature"] = 0
+
+    assert pickle.loads(pickle.dumps(payload)) == payload
+
+    payload_copy = copy.deepcopy(payload)
+    payload_copy[0]["temperature"] = 0
+    payload_copy.append({})
+
+
+def test_cache_opt_in() -> None:
+    """Check the cache is disabled by default, so payloads are not shared."""
+
+    assert not PAYLOAD_CACHE.enabled
+
+    pkt = Packet.from_dict(
+        "2022-11-04T10:00:00.000000",
+        "045  I --- 01:145038 --:------ 01:145038 30C9 009 0007D60107C60207DC",
+    )
+    payload = Message(pkt).payload
+
+    assert Message(pkt).payload is not payload
+    payload.append({})  # a consumer may modify its own payload
+    payload[0]["temperature"] = 0
+
+
+def test_cache_keys(payload_cache: _PayloadCache) -> None:
+    """Check a payload that is parsed differently for different devices isn't shared."""
+
+    pkts = [
+        Packet.from_dict(
+            "2022-11-04T10:00:00.000000",
+            "045  I --- 01:145038 --:------ 01:145038 3B00 002 FCC8",
+        ),
+        Packet.from_dict(
+            "2022-11-04T10:00:00.000000",
+            "045  I --- 13:049798 --:------ 13:049798 3B00 002 00C8",
+        ),
+    ]
+
+    assert Message(pkts[0]).payload != Message(pkts[1]).payload
+    assert payload_cache.metrics["entries"] == 2
+
+
+def test_cache_eviction() -> None:
+    """Check the cache is bounded by both its number of entries, and its size."""
+
+    pkts = load_corpus()
+
+    cache = _PayloadCache(max_entries=16)
+    cache.enabled = True
+    for msg in _msgs(pkts):
+        cache.parse(msg)
+
+    metrics = cache.metrics
+    assert metrics["entries"] == 16
+    assert metrics["evictions"] == metrics["misses"] - 16
+
+    cache = _PayloadCache(max_size=64)
+    cache.enabled = True
+    for msg in _msgs(pkts):
+        cache.parse(msg)
+
+    metrics = cache.metrics
+    assert 0 < metrics["size"] <= 64
+    assert metrics["evictions"] == metrics["misses"] - metrics["entries"]
+
+
+@pytest.mark.benchmark
+def test_cache_benchmark(payload_cache: _PayloadCache) -> None:
+    """Check the rate of creating msgs, with and without the cache."""
+
+    corpus = load_corpus()
+    pkts = [corpus[i] for i in _payloads(corpus)] * 10
+
+    payload_cache.enabled = False
+    t0 = perf_counter()
+    for pkt in pkts:
+        Message(pkt)
+    uncached_secs = perf_counter() - t0
+
+    payload_cache.enabled = True
+    t0 = perf_counter()
+    for pkt in pkts:
+        Message(pkt)
+    cached_secs = perf_counter() - t0
+
+    metrics = payload_cache.metrics
+    hit_ratio = metrics["hits"] / (metrics["hits"] + metrics["misses"])
+    print(
+        f"\n{len(pkts)} msgs: uncached {len(pkts) / uncached_secs:,.0f}/s"
+        f", cached {len(pkts) / cached_secs:,.0f}/s (hit ratio {hit_ratio:.2f})"
+    )
+
+    assert hit_ratio > 0.8  # the corpus is repeated
+    assert cached_secs < uncached_secs
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the (pre-compiled) payload validators."""
+
+import re
+from functools import lru_cache
+from timeit import repeat
+
+import pytest
+
+from ramses_tx import exceptions as exc
+from ramses_tx.message import PAYLOAD_VALIDATORS, _PayloadValidators
+from ramses_tx.ramses import CODES_SCHEMA
+
+from .helpers import load_corpus
+
+
+def _corpus() -> list[tuple[str, str, str]]:
+    """Return the (code, verb, payload) of every valid packet in the parsers corpus."""
+
+    return [(pkt.code, pkt.verb, pkt.payload) for pkt in load_corpus()]
+
+
+def test_validators_hits_misses() -> None:
+    """Check the counters, and the exceptions raised for invalid payloads."""
+
+    validators = _PayloadValidators(CODES_SCHEMA)
+
+    validators.validate("1F09", " I", "FF04B5")
+    with pytest.raises(exc.PacketPayloadInvalid):
+        validators.validate("1F09", " I", "FF04")
+    with pytest.raises(exc.PacketInvalid, match="Unknown verb/code pair"):
+        validators.validate("1F09", "XX", "FF04B5")
+    with pytest.raises(exc.PacketInvalid, match="Unknown code"):
+        validators.validate("ZZZZ", " I", "00")
+
+    metrics = validators.metrics
+    assert metrics["num_patterns"] == sum(
+        1 for s in CODES_SCHEMA.values() for v in s if v in (" I", "RQ", "RP", " W")
+    )
+    assert (metrics["hits"], metrics["misses"], metrics["invalid"]) == (2, 2, 1)
+
+
+@pytest.mark.benchmark
+def test_validators_benchmark() -> None:
+    """Check the validation rate beats an lru_cache keyed by (regex, payload)."""
+
+    corpus = _corpus() * 20
+
+    @lru_cache(maxsize=256)
+    def re_compile_re_match(regex: str, string: str) -> bool:  # the previous method
+        return bool(re.compile(regex).match(string))
+
+    def old_method() -> None:
+        for code, verb, payload in corpus:
+            regex = CODES_SCHEMA[code][verb]  # type: ignore[index]
+            re_compile_re_match(regex, payload)
+
+    def validators() -> None:
+        for code, verb, payload in corpus:
+            try:  # NOTE: contextlib.suppress() would cost more than the validation
+                PAYLOAD_VALIDATORS.validate(code, verb, payload)
+            except exc.PacketPayloadInvalid:
+                pass
+
+    old_secs = min(repeat(old_method, number=1, repeat=3))  # the best of 3
+
+    hits = PAYLOAD_VALIDATORS.metrics["hits"]
+    new_secs = min(repeat(validators, number=1, repeat=3))
+    assert PAYLOAD_VALIDATORS.metrics["hits"] - hits == len(corpus) * 3
+
+    hit_ratio = re_compile_re_match.cache_info().hits / (len(corpus) * 3)
+    print(
+        f"\n{len(corpus)} payloads: lru_cache {len(corpus) / old_secs:,.0f}/s"
+        f" (hit ratio {hit_ratio:.2f})"
+        f", validators {len(corpus) / new_secs:,.0f}/s"
+    )
+
+    assert new_secs < old_secs
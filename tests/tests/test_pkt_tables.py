@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the (table-driven) derivation of a packet's idx, ctx & lifespan.
+
+The reference functions are the previous (if-ladder) implementations.
+"""
+
+from datetime import timedelta as td
+from time import perf_counter
+from typing import Any
+
+import pytest
+
+from ramses_tx import exceptions as exc
+from ramses_tx.address import NON_DEV_ADDR
+from ramses_tx.const import (
+    DEV_ROLE_MAP,
+    DEV_TYPE_MAP,
+    F8,
+    F9,
+    FA,
+    FC,
+    I_,
+    RP,
+    RQ,
+    SZ_DHW_IDX,
+    SZ_DOMAIN_ID,
+    SZ_UFH_IDX,
+    SZ_ZONE_IDX,
+    W_,
+    Code,
+)
+from ramses_tx.frame import _pkt_idx
+from ramses_tx.message import Message
+from ramses_tx.opentherm import PARAMS_DATA_IDS, SCHEMA_DATA_IDS, STATUS_DATA_IDS
+from ramses_tx.packet import Packet, pkt_lifespan
+from ramses_tx.ramses import (
+    CODE_IDX_ARE_COMPLEX,
+    CODE_IDX_ARE_NONE,
+    CODE_IDX_ARE_SIMPLE,
+    CODE_IDX_DOMAIN,
+    CODES_ONLY_FROM_CTL,
+    CODES_SCHEMA,
+    SZ_LIFESPAN,
+)
+
+from .helpers import TEST_DIR, load_corpus
+
+WORK_DIRS = (f"{TEST_DIR}/parsers", f"{TEST_DIR}/systems")
+
+
+def _outcome(fnc: Any, *args: Any) -> Any:
+    """Return the result of the function, or the type of any exception it raised."""
+
+    try:
+        return fnc(*args)
+    except (AssertionError, exc.PacketInvalid, NotImplementedError) as err:
+        return type(err)
+
+
+def _ref_has_ctl(pkt: Packet) -> bool:
+    if {pkt.src.type, pkt.dst.type} & {
+        DEV_TYPE_MAP.CTL,
+        DEV_TYPE_MAP.UFC,
+        DEV_TYPE_MAP.PRG,
+    }:
+        return True
+
+    if pkt.dst is pkt.src:
+        return any(
+            (
+                pkt.code == Code._3B00 and pkt.payload[:2] == FC,
+                pkt.code in CODES_ONLY_FROM_CTL + (Code._31D9, Code._31DA),
+            )
+        )
+
+    if pkt.dst.id == NON_DEV_ADDR.id:
+        return pkt.src.type != DEV_TYPE_MAP.OTB
+
+    if pkt.dst.type in (DEV_TYPE_MAP.DTS, DEV_TYPE_MAP.DT2):
+        return True
+
+    return False
+
+
+def _ref_pkt_idx(pkt: Packet) -> None | bool | str:
+    if pkt.code == Code._0005:
+        return pkt._has_array
+
+    if pkt.code == Code._0009 and pkt.src.type == DEV_TYPE_MAP.OTB:
+        return False
+
+    if pkt.code == Code._000C:
+        if pkt.payload[2:4] == DEV_ROLE_MAP.APP:
+            return str(FC)
+        if pkt.payload[0:4] == f"01{DEV_ROLE_MAP.HTG}":
+            return str(F9)
+        if pkt.payload[2:4] in (DEV_ROLE_MAP.DHW, DEV_ROLE_MAP.HTG):
+            return str(FA)
+        return pkt.payload[:2]
+
+    if pkt.code == Code._0404:
+        return "HW" if pkt.payload[2:4] == "23" else pkt.payload[:2]
+
+    if pkt.code == Code._0418:
+        return pkt.payload[4:6]
+
+    if pkt.code == Code._1100:
+        return pkt.payload[:2] if pkt.payload[:1] == "F" else False
+
+    if pkt.code == Code._3220:
+        return pkt.payload[4:6]
+
+    if pkt.code in CODE_IDX_ARE_COMPLEX:
+        raise NotImplementedError(f"{pkt} # CODE_IDX_COMPLEX")
+
+    if pkt.code in CODE_IDX_ARE_NONE:
+        if (
+            CODES_SCHEMA[pkt.code].get(pkt.verb, "")[:3] == "^00"
+            and pkt.payload[:2] != "00"
+        ):
+            raise exc.PacketPayloadInvalid("expecting no idx (00) (0xAA)")
+        return False
+
+    if pkt._has_array:
+        return True
+
+    if pkt.payload[:2] in (F8, F9, FA, FC):
+        if pkt.code not in CODE_IDX_DOMAIN:
+            raise exc.PacketPayloadInvalid("not expecting a domain id")
+        return pkt.payload[:2]
+
+    if _ref_has_ctl(pkt):
+        return pkt.payload[:2]
+
+    if pkt.code in (Code._31D9, Code._31DA):
+        return pkt.payload[:2]
+
+    if pkt.payload[:2] != "00":
+        raise exc.PacketPayloadInvalid("expecting no idx (00) (0xAB)")
+
+    if pkt.code in CODE_IDX_ARE_SIMPLE:
+        return None
+
+    return None
+
+
+def _ref_msg_idx(msg: Message) -> dict[str, str]:
+    IDX_NAMES = {
+        Code._0002: "other_idx",
+        Code._10A0: SZ_DHW_IDX,
+        Code._1260: SZ_DHW_IDX,
+        Code._1F41: SZ_DHW_IDX,
+        Code._22C9: SZ_UFH_IDX,
+        Code._2389: "other_idx",
+        Code._2D49: "other_idx",
+        Code._31D9: "hvac_id",
+        Code._31DA: "hvac_id",
+        Code._3220: "msg_id",
+    }
+
+    if msg.code in (Code._31D9, Code._31DA):
+        return {"hvac_id": msg._pkt._idx}  # type: ignore[dict-item]
+
+    if msg._pkt._idx in (True, False) or msg.code in CODE_IDX_ARE_COMPLEX:
+        return {}
+
+    if msg.code in (Code._3220,):
+        return {}
+
+    if not {msg.src.type, msg.dst.type} & {
+        DEV_TYPE_MAP.CTL,
+        DEV_TYPE_MAP.UFC,
+        DEV_TYPE_MAP.HCW,
+        DEV_TYPE_MAP.DTS,
+        DEV_TYPE_MAP.HGI,
+        DEV_TYPE_MAP.DT2,
+        DEV_TYPE_MAP.PRG,
+    }:
+        assert msg._pkt._idx == "00", "What!! (AA)"
+        return {}
+
+    if msg.src.type == msg.dst.type and msg.src.type not in (
+        DEV_TYPE_MAP.CTL,
+        DEV_TYPE_MAP.UFC,
+        DEV_TYPE_MAP.HCW,
+        DEV_TYPE_MAP.HGI,
+        DEV_TYPE_MAP.PRG,
+    ):
+        assert msg._pkt._idx == "00", "What!! (AB)"
+        return {}
+
+    if msg.src.type == msg.dst.type and not getattr(msg.src, "_is_controller", True):
+        assert msg._pkt._idx == "00", "What!! (BC)"
+        return {}
+
+    if msg.code in (Code._000A, Code._2309) and msg.src.type == DEV_TYPE_MAP.UFC:
+        return {IDX_NAMES[Code._22C9]: msg._pkt._idx}  # type: ignore[dict-item]
+
+    idx = msg._pkt._idx
+    idx_name = SZ_DOMAIN_ID if idx[:1] == "F" else SZ_ZONE_IDX  # type: ignore[index]
+    return {IDX_NAMES.get(msg.code, idx_name): msg._pkt._idx}  # type: ignore[dict-item]
+
+
+def _ref_pkt_lifespan(pkt: Packet) -> td:
+    if pkt.verb in (RQ, W_):
+        return td(seconds=0)
+
+    if pkt.code in (Code._0005, Code._000C):
+        return td(days=1)
+
+    if pkt.code == Code._0006:
+        return td(minutes=60)
+
+    if pkt.code == Code._0404:
+        return td(days=1)
+
+    if pkt.code == Code._000A and pkt._has_array:
+        return td(minutes=60)
+
+    if pkt.code == Code._10E0:
+        return td(days=1)
+
+    if pkt.code == Code._1F09:
+        return td(seconds=360) if pkt.verb == I_ else td(seconds=0)
+
+    if pkt.code == Code._1FC9 and pkt.verb == RP:
+        return td(days=1)
+
+    if pkt.code in (Code._2309, Code._30C9) and pkt._has_array:
+        return td(seconds=360)
+
+    if pkt.code == Code._3220:
+        if int(pkt.payload[4:6], 16) in SCHEMA_DATA_IDS:
+            return td(minutes=360) * 2.1
+        if int(pkt.payload[4:6], 16) in PARAMS_DATA_IDS:
+            return td(minutes=60) * 2.1
+        if int(pkt.payload[4:6], 16) in STATUS_DATA_IDS:
+            return td(minutes=5) * 2.1
+        return td(minutes=5) * 2.1
+
+    if (code := CODES_SCHEMA.get(pkt.code)) and SZ_LIFESPAN in code:
+        result = CODES_SCHEMA[pkt.code][SZ_LIFESPAN]
+        return result if isinstance(result, td) else td(minutes=60)
+
+    return td(minutes=60)
+
+
+def test_same_as_reference() -> None:
+    """Check the idx, ctx & lifespan of every packet are as per the reference."""
+
+    pkts = load_corpus(*WORK_DIRS, pattern="**/*.log")
+    assert pkts
+
+    for pkt in pkts:
+        assert pkt._has_ctl == _ref_has_ctl(pkt), pkt
+        assert _outcome(_pkt_idx, pkt) == _outcome(_ref_pkt_idx, pkt), pkt
+        assert pkt_lifespan(pkt) == _ref_pkt_lifespan(pkt), pkt
+
+        try:
+            msg = Message(pkt)
+        except exc.PacketInvalid:
+            continue
+        assert _outcome(lambda m: m._idx, msg) == _outcome(_ref_msg_idx, msg), pkt
+
+
+@pytest.mark.benchmark
+def test_tables_benchmark() -> None:
+    """Check the rate of deriving the idx & lifespan (tables vs the reference)."""
+
+    pkts = load_corpus(*WORK_DIRS, pattern="**/*.log")
+    msgs = []
+    for pkt in pkts:
+        try:
+            msgs.append(Message(pkt))
+        except exc.PacketInvalid:
+            continue
+    pkts = pkts * 10
+    msgs = msgs * 10
+
+    def rate(fnc: Any, items: list[Any]) -> float:
+        t0 = perf_counter()
+        for item in items:
+            _outcome(fnc, item)
+        return len(items) / (perf_counter() - t0)
+
+    rates = {
+        "pkt_idx": (rate(_pkt_idx, pkts), rate(_ref_pkt_idx, pkts)),
+        "lifespan": (rate(pkt_lifespan, pkts), rate(_ref_pkt_lifespan, pkts)),
+        "msg_idx": (rate(lambda m: m._idx, msgs), rate(_ref_msg_idx, msgs)),
+    }
+
+    print(
+        f"\n{len(pkts)} pkts: "
+        + ", ".join(f"{k} {v:,.0f}/s (ref {r:,.0f}/s)" for k, (v, r) in rates.items())
+    )
+
+    assert all(v > r for v, r in rates.values()), rates
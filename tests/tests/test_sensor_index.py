@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the index of candidate zone sensors (used for eavesdropping)."""
+
+from datetime import datetime as dt, timedelta as td
+from types import SimpleNamespace
+
+from ramses_rf import Gateway
+from ramses_rf.system.heat import MultiZone, _TempSensorIndex
+
+from .helpers import TEST_DIR
+
+WORK_DIR = f"{TEST_DIR}/eavesdrop_schema"
+
+
+def test_index_buckets() -> None:
+    """Check sensors are moved between buckets, and found by temp & dtm."""
+
+    ctl, other = object(), object()
+    dtm = dt(2022, 11, 4, 10, 0, 0)
+
+    s1 = SimpleNamespace(id="34:000001", ctl=None)
+    s2 = SimpleNamespace(id="34:000002", ctl=ctl)
+    s3 = SimpleNamespace(id="34:000003", ctl=other)
+
+    index = _TempSensorIndex()
+    index.update(s1, 20.5, dtm)
+    index.update(s2, 20.5, dtm + td(seconds=1))
+    index.update(s3, 20.5, dtm + td(seconds=2))
+
+    assert index.sensor(20.5, dtm - td(seconds=1), ctl) is s2  # the latest, for ctl
+    assert index.sensor(20.5, dtm + td(seconds=1), ctl) is None  # none since then
+    assert index.sensor(21.0, dtm - td(seconds=1), ctl) is None
+
+    index.update(s2, 21.0, dtm + td(seconds=3))
+    assert index.sensor(20.5, dtm - td(seconds=1), ctl) is s1
+    assert index.sensor(21.0, dtm - td(seconds=1), ctl) is s2
+
+    index.update(s2, None, dtm + td(seconds=4))
+    assert index.sensor(21.0, dtm - td(seconds=1), ctl) is None
+    assert 21.0 not in index._by_temp  # empty buckets are removed
+
+    assert index.reported_since(dtm + td(seconds=1), ctl) is False  # s3 is other's
+    assert index.reported_since(dtm - td(seconds=1), ctl) is True
+
+
+async def test_index_populated() -> None:
+    """Check the index holds the latest temp of the sensors, when eavesdropping."""
+
+    with open(f"{WORK_DIR}/zone_sensors_000/packet.log") as f:
+        gwy = Gateway(None, input_file=f, config={"enable_eavesdrop": True})
+        await gwy.start()
+
+    try:
+        systems = [s for s in gwy.systems if isinstance(s, MultiZone)]
+        assert systems
+
+        for tcs in systems:
+            index: _TempSensorIndex = tcs._sensor_index
+            for dev_id, temp in index._temp_of.items():
+                assert gwy.device_by_id[dev_id].temperature == temp
+                assert dev_id in index._by_temp[temp]
+
+    finally:
+        await gwy.stop()
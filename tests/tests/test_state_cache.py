@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the caching (and invalidation) of the entities' state properties."""
+
+import asyncio
+import json
+from pathlib import Path, PurePath
+from typing import Any
+
+import pytest
+
+from ramses_rf import Gateway
+from ramses_rf.dispatcher import process_msg
+from ramses_rf.schemas import SCH_GLOBAL_CONFIG
+from ramses_tx import Message, Packet
+
+from .helpers import TEST_DIR
+
+WORK_DIR = f"{TEST_DIR}/systems"
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    def id_fnc(param: Path) -> str:
+        return PurePath(param).name
+
+    if "dir_name" not in metafunc.fixturenames:
+        return
+
+    folders = [f for f in Path(WORK_DIR).iterdir() if f.is_dir() and f.name[:1] != "_"]
+    metafunc.parametrize("dir_name", folders, ids=id_fnc)
+
+
+async def _load_test_gwy(
+    dir_name: Path, **kwargs: Any
+) -> tuple[Gateway, list[str]]:
+    """Create a system state from a packet log, and return it with the log."""
+
+    try:
+        with open(f"{dir_name}/config.json") as f:
+            config = {k: v for k, v in json.load(f).items() if k[:1] != "_"}
+    except FileNotFoundError:
+        config = {}
+    config.update(kwargs)
+
+    with open(f"{dir_name}/packet.log") as f:
+        lines = [ln for ln in f if ln.strip() and ln[:1] != "#"]
+
+    with open(f"{dir_name}/packet.log") as f:
+        gwy = Gateway(None, input_file=f, **SCH_GLOBAL_CONFIG(config))
+        await gwy.start()
+
+        await gwy._protocol.wait_for_connection_lost()  # until packet log is EOF
+
+    return gwy, lines
+
+
+def _cached(entity: Any, attr: str) -> Any:
+    """Return the entity's cached result of a state property (not a copy)."""
+    return entity._state_cache[getattr(type(entity), attr).fget][3]
+
+
+def _entities(gwy: Gateway) -> list:
+    result = list(gwy.devices) + list(gwy.systems)
+    for tcs in gwy.systems:
+        result.extend(tcs.zones)
+        if tcs.dhw:
+            result.append(tcs.dhw)
+    return result
+
+
+async def test_state_cached(dir_name: Path) -> None:
+    """Check cached state is reused, and is the same as if it were not cached."""
+
+    gwy, _ = await _load_test_gwy(dir_name)
+    try:
+        for entity in _entities(gwy):
+            for attr in ("params", "schema", "status"):
+                result = getattr(entity, attr)
+                cached = _cached(entity, attr)
+                assert getattr(entity, attr) == result
+                assert _cached(entity, attr) is cached  # from the cache
+
+                getattr(entity, attr)["_extra"] = None  # the caller's copy
+                assert "_extra" not in getattr(entity, attr)
+
+                entity._state_cache.clear()
+                assert getattr(entity, attr) == result
+
+        for attr in ("params", "schema", "status"):
+            result = getattr(gwy, attr)
+            cached = gwy._state_cache[attr][2]
+            assert getattr(gwy, attr) == result
+            assert gwy._state_cache[attr][2] is cached  # from the cache
+
+    finally:
+        await gwy.stop()
+
+
+async def test_state_changed(dir_name: Path) -> None:
+    """Check only the entities that have since Rx'd a msg are reported as changed."""
+
+    gwy, lines = await _load_test_gwy(dir_name)
+    try:
+        seqn = gwy.state_seqn
+        assert gwy.changed_entities(seqn) == []
+        assert set(gwy.changed_entities()) == set(_entities(gwy))
+
+        for entity in _entities(gwy):
+            entity.status  # noqa: B018
+        status = {e: _cached(e, "status") for e in _entities(gwy)}
+        gwy.status  # noqa: B018
+        gwy_status = gwy._state_cache["status"][2]
+
+        for line in reversed(lines):  # the latest msg from a known device
+            line = line.split("#", maxsplit=1)[0].rstrip()
+            msg = Message(Packet.from_file(line[:26], line[27:]))
+            if msg.src.id in gwy.device_by_id:
+                break
+        msg._gwy = gwy  # HACK: as per the protocol's msg handler
+        process_msg(gwy, msg)
+        await asyncio.sleep(0)  # the msg is handled via call_soon()
+
+        changed = gwy.changed_entities(seqn)
+        assert changed and gwy.state_seqn > seqn
+
+        for entity in _entities(gwy):
+            entity.status  # noqa: B018
+            if entity not in changed and entity._state_root not in changed:
+                assert _cached(entity, "status") is status[entity]  # from the cache
+            elif entity._state_root is entity:
+                assert _cached(entity, "status") is not status[entity]
+
+        gwy.status  # noqa: B018
+        assert gwy._state_cache["status"][2] is not gwy_status  # was recomputed
+
+    finally:
+        await gwy.stop()
+
+
+async def test_state_faked() -> None:
+    """Check faking a device is reported as a change to its (cached) state."""
+
+    dev_id = "34:103601"  # has a battery_state, unless it is faked
+
+    gwy, _ = await _load_test_gwy(
+        Path(f"{WORK_DIR}/_heat_trv_00"), known_list={dev_id: {}}
+    )
+    try:
+        dev = gwy.device_by_id[dev_id]
+        assert dev.status["battery_state"] is not None
+
+        seqn = gwy.state_seqn
+        gwy.fake_device(dev_id)
+
+        assert dev in gwy.changed_entities(seqn)
+        assert dev.status["battery_state"] is None
+
+    finally:
+        await gwy.stop()
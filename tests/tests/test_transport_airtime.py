@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the airtime planner of the PortTransport (slots & sync cycles)."""
+
+from datetime import datetime as dt
+from types import SimpleNamespace
+
+import pytest
+
+from ramses_tx import Packet
+from ramses_tx.transport import (
+    _SYNC_LEAD_TIME,
+    _SYNC_MAX_MISSED,
+    _SYNC_MAX_TRACKED,
+    _SYNC_WAIT_LONG,
+    _AirtimePlanner,
+)
+
+FRAME = "RQ --- 18:000730 01:222222 --:------ 12B0 001 00"  # 350 bits via RF
+
+SYNC_PKT = " I --- 01:145038 --:------ 01:145038 1F09 003 FF0014"  # next in 2.0s
+BURST_PKT = " I --- 01:145038 --:------ 01:145038 2309 003 0007D0"
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def loop(self) -> SimpleNamespace:
+        return SimpleNamespace(time=lambda: self.now)
+
+
+def _planner(clock: _Clock, **kwargs: float) -> _AirtimePlanner:
+    return _AirtimePlanner(clock.loop(), **kwargs)  # type: ignore[arg-type]
+
+
+def _pkt(pkt_line: str) -> Packet:
+    return Packet(dt.now(), f"... {pkt_line}")
+
+
+def test_min_gap(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check consecutive frames are spaced by the minimum gap (FIFO)."""
+
+    monkeypatch.setattr("ramses_tx.transport.MIN_INTER_WRITE_GAP", 0.05)
+
+    clock = _Clock()
+    planner = _planner(clock)
+
+    assert planner.reserve(FRAME) == 0
+    assert planner.reserve(FRAME) == pytest.approx(0.05)
+    assert planner.reserve(FRAME) == pytest.approx(0.10)
+
+    clock.now += 1
+    assert planner.reserve(FRAME) == 0
+
+    assert planner.metrics["num_tx"] == 4
+    assert planner.metrics["deferrals"]["gap"] == 2
+
+
+def test_duty_cycle(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check a frame is deferred until the bit bucket has refilled enough."""
+
+    monkeypatch.setattr("ramses_tx.transport.MIN_INTER_WRITE_GAP", 0)
+    monkeypatch.setattr("ramses_tx.transport._DBG_DISABLE_DUTY_CYCLE_LIMIT", False)
+
+    clock = _Clock()
+    planner = _planner(clock, max_duty_cycle=0.01, time_window=1)  # 384 bits/sec
+
+    assert planner.reserve(FRAME) == 0  # leaves 34 bits in the bucket
+    assert planner.reserve(FRAME) == pytest.approx((350 - 34) / 384)
+
+    assert planner.metrics["deferrals"]["duty_cycle"] == 1
+    assert planner.metrics["duty_cycle_used"] > 1  # overdrawn, until the slot
+
+
+def test_sync_cycle(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check frames are deferred past a (predicted) sync cycle, and its burst."""
+
+    monkeypatch.setattr("ramses_tx.transport.MIN_INTER_WRITE_GAP", 0)
+
+    clock = _Clock()
+    planner = _planner(clock)
+
+    planner.pkt_received(_pkt(SYNC_PKT))  # the next sync cycle is at 102.0
+    assert planner.metrics["sync_cycles"]["01:145038"]["next_in"] == 2.0
+
+    clock.now = 101.0
+    assert planner.reserve(FRAME) == 0  # well before the sync cycle
+
+    clock.now = 102.0 - _SYNC_LEAD_TIME / 2
+    delay = planner.reserve(FRAME)
+    assert delay == pytest.approx(_SYNC_LEAD_TIME / 2 + _SYNC_WAIT_LONG)
+    assert planner.metrics["deferrals"]["sync_cycle"] == 1
+
+    clock.now = 102.0
+    planner.pkt_received(_pkt(SYNC_PKT))  # the next sync cycle is at 104.0
+    clock.now = 102.3
+    planner.pkt_received(_pkt(BURST_PKT))  # a longer burst than the default
+
+    clock.now = 104.0
+    planner.pkt_received(_pkt(SYNC_PKT))  # ...so the burst estimate is increased
+    burst = planner._syncs["01:145038"].burst
+    assert burst > _SYNC_WAIT_LONG
+
+    clock.now = 108.0  # missed the 1F09 at 106.0, so extrapolate
+    assert planner.metrics["sync_cycles"]["01:145038"]["next_in"] == 0.0
+    assert planner.reserve(FRAME) == pytest.approx(burst)
+
+
+def test_sync_cycle_stale(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check a sync cycle is dropped once several of its I|1F09s have been missed."""
+
+    monkeypatch.setattr("ramses_tx.transport.MIN_INTER_WRITE_GAP", 0)
+
+    clock = _Clock()
+    planner = _planner(clock)
+
+    planner.pkt_received(_pkt(SYNC_PKT))  # the next sync cycle is at 102.0
+
+    clock.now = 102.0 + 2.0 * (_SYNC_MAX_MISSED - 1) - _SYNC_LEAD_TIME / 2
+    assert planner.reserve(FRAME) > 0  # is still extrapolated
+    assert "01:145038" in planner.metrics["sync_cycles"]
+
+    clock.now = 102.0 + 2.0 * (_SYNC_MAX_MISSED + 1) - _SYNC_LEAD_TIME / 2
+    assert planner.reserve(FRAME) == 0  # is no longer a (phantom) sync cycle
+    assert planner.metrics["sync_cycles"] == {}
+
+
+def test_sync_cycle_evicted() -> None:
+    """Check the stalest sync cycle is evicted, when the maximum is being tracked."""
+
+    clock = _Clock()
+    planner = _planner(clock)
+
+    for i in range(_SYNC_MAX_TRACKED + 1):
+        clock.now += 0.1
+        planner.pkt_received(_pkt(SYNC_PKT.replace("01:145038", f"01:{i:06d}")))
+
+    assert len(planner.metrics["sync_cycles"]) == _SYNC_MAX_TRACKED
+    assert "01:000000" not in planner.metrics["sync_cycles"]  # the stalest
+    assert f"01:{_SYNC_MAX_TRACKED:06d}" in planner.metrics["sync_cycles"]
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the receive path of the PortTransport (serial port).
+
+Includes a simple benchmark (frames/sec), using a pty pair as the serial port.
+"""
+
+import asyncio
+import os
+import pty
+import threading
+import tty
+from pathlib import Path
+from time import perf_counter
+
+import pytest
+
+from ramses_tx import Message, protocol_factory, transport_factory
+from ramses_tx.transport import _normalise, _RecvBuffer, _str
+
+from .helpers import TEST_DIR
+
+WORK_DIR = f"{TEST_DIR}/systems"
+
+NUM_FRAMES = 5_000
+
+
+def _corpus() -> list[bytes]:
+    """Return every packet line in the systems corpus, as if read from an evofw3."""
+
+    lines: list[bytes] = []
+    for log_file in sorted(Path(WORK_DIR).glob("*/packet.log")):
+        with open(log_file) as f:
+            lines.extend(
+                ln[27:].split("#", maxsplit=1)[0].rstrip().encode("ascii") + b"\r\n"
+                for ln in f
+                if ln.strip() and ln[:1] != "#" and ln[27:].split("#")[0].strip()
+            )
+    return lines
+
+
+def test_recv_buffer_framing() -> None:
+    """Check lines are framed correctly, however the reads are fragmented."""
+
+    lines = _corpus()[:200]
+    data = b"".join(lines)
+
+    for chunk_size in (1, 2, 7, 64, 1024, len(data)):
+        buffer = _RecvBuffer()
+        result: list[bytes] = []
+        for i in range(0, len(data), chunk_size):
+            result.extend(buffer.feed(data[i : i + chunk_size]))
+
+        assert result == lines
+        assert len(buffer) == 0
+
+    buffer = _RecvBuffer()
+    assert buffer.feed(b"045  I --- 01:145038 --:------ 01:145038 1F09 00") == []
+    assert buffer.feed(b"3 FF04B5\r") == []
+    assert buffer.feed(b"\n...") == [
+        b"045  I --- 01:145038 --:------ 01:145038 1F09 003 FF04B5\r\n"
+    ]
+    assert len(buffer) == 3
+
+
+def test_recv_str_normalise() -> None:
+    """Check non-printable chars are removed, and non-ASCII lines are dropped."""
+
+    line = b"\x00045  I --- 01:145038 --:------ 01:145038 1F09 003 FF04B5\x7f\r\r\n"
+    assert (
+        _normalise(_str(line))
+        == "045  I --- 01:145038 --:------ 01:145038 1F09 003 FF04B5"
+    )
+
+    assert _str(b"045  I --- 01:145038 \xff\r\n") == ""
+
+
+async def _read_from_pty(lines: list[bytes]) -> list[str]:
+    """Write the lines to a pty, and return the frame of every msg received."""
+
+    frames: list[str] = []
+    done = asyncio.get_running_loop().create_future()
+
+    def msg_handler(msg: Message) -> None:
+        frames.append(str(msg._pkt))
+        if len(frames) == len(lines) and not done.done():
+            done.set_result(None)
+
+    master_fd, slave_fd = pty.openpty()
+    tty.setraw(master_fd)
+    tty.setraw(slave_fd)
+
+    protocol = protocol_factory(msg_handler, disable_sending=True)
+    transport = await transport_factory(
+        protocol, port_name=os.ttyname(slave_fd), port_config={}, disable_sending=True
+    )
+
+    def write_lines() -> None:  # a blocking write, so as not to overrun the pty
+        data = b"".join(lines)
+        while data:
+            data = data[os.write(master_fd, data[:4096]) :]
+
+    writer = threading.Thread(target=write_lines)
+    writer.start()
+
+    try:
+        await asyncio.wait_for(done, timeout=60)
+    finally:
+        writer.join()
+        transport.close()
+        await protocol._wait_connection_lost
+        os.close(master_fd)
+        os.close(slave_fd)
+
+    return frames
+
+
+def _lines(num_frames: int) -> list[bytes]:
+    corpus = _corpus()
+    return (corpus * (num_frames // len(corpus) + 1))[:num_frames]
+
+
+async def test_recv_from_pty() -> None:
+    """Check the frames read from a pty (as a serial port)."""
+
+    lines = _lines(NUM_FRAMES // 10)
+
+    frames = await _read_from_pty(lines)
+
+    assert frames == [ln[4:].decode("ascii").rstrip() for ln in lines]
+
+
+@pytest.mark.benchmark
+async def test_recv_benchmark() -> None:
+    """Check the frames read from a pty, and the Rx rate (frames/sec)."""
+
+    lines = _lines(NUM_FRAMES)
+
+    t0 = perf_counter()
+    frames = await _read_from_pty(lines)
+    secs = perf_counter() - t0
+
+    assert frames == [ln[4:].decode("ascii").rstrip() for ln in lines]
+
+    print(f"\n{len(frames)} frames: pty {len(frames) / secs:,.0f}/s")
+
+    assert len(frames) / secs > 5_000  # is ~25K/s, a serial port is < 100/s
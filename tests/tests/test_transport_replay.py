@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the (batched) replay of packet logs by the FileTransport.
+
+Includes a simple benchmark (frames/sec) of the per-frame vs batched replay modes.
+"""
+
+from pathlib import Path
+from time import perf_counter
+
+import pytest
+
+from ramses_rf import Gateway
+from ramses_tx import Message, protocol_factory, transport_factory
+from ramses_tx.schemas import SZ_REPLAY_BATCH_SIZE
+from ramses_tx.transport import SZ_READER_TASK, FileTransport
+
+from .helpers import TEST_DIR
+
+WORK_DIR = f"{TEST_DIR}/systems"
+
+SYNTHETIC_LOG_LINES = 20_000
+
+CACHED_PACKETS = {
+    "2022-11-04T10:00:00.000000": "045  I --- 01:145038 --:------ 01:145038 1F09 003 FF04B5",
+    "2022-11-04T10:00:01.000000": "045  I --- 01:145038 --:------ 01:145038 0008 002 FA00",
+    "2022-11-04T10:00:02.000000": "045 RQ --- 18:006402 01:145038 --:------ 0004 002 0000",
+}
+
+
+def _synthetic_log(file_name: Path, num_lines: int = SYNTHETIC_LOG_LINES) -> int:
+    """Write a large packet log by repeating the test corpus, return its frame count."""
+
+    lines: list[str] = []
+    for log_file in sorted(Path(WORK_DIR).glob("*/packet.log")):
+        with open(log_file) as f:
+            lines.extend(
+                ln.split("#", maxsplit=1)[0].rstrip()
+                for ln in f
+                if ln.strip() and ln[:1] != "#" and ln[27:].split("#")[0].strip()
+            )
+
+    count = 0
+    with open(file_name, "w") as f:
+        while count < num_lines:
+            for line in lines[: num_lines - count]:
+                f.write(f"{line}\n")
+            count += len(lines[: num_lines - count])
+
+    return count
+
+
+async def _replay(file_name: Path, replay_batch_size: int | None) -> list[str]:
+    """Replay the packet log and return the dtm of every message received."""
+
+    dtms: list[str] = []
+
+    def msg_handler(msg: Message) -> None:
+        dtms.append(msg.dtm.isoformat())
+
+    protocol = protocol_factory(msg_handler, disable_sending=True)
+
+    with open(file_name) as f:
+        transport = await transport_factory(
+            protocol, packet_log=f, replay_batch_size=replay_batch_size
+        )
+        await transport.get_extra_info(SZ_READER_TASK)
+        await protocol._wait_connection_lost
+
+    return dtms
+
+
+async def test_replay_batched(tmp_path: Path) -> None:
+    """Check the batched replay yields the same messages, in the same order."""
+
+    file_name = tmp_path / "packet.log"
+    _synthetic_log(file_name, num_lines=2_000)
+
+    assert await _replay(file_name, None) == await _replay(file_name, 256)
+
+
+async def test_replay_cached_packets() -> None:
+    """Check a packet dict can be replayed in batches (as when restoring a cache)."""
+
+    dtms: list[str] = []
+    protocol = protocol_factory(
+        lambda msg: dtms.append(msg.dtm.isoformat(timespec="microseconds")),
+        disable_sending=True,
+    )
+
+    transport = await transport_factory(
+        protocol, packet_dict=CACHED_PACKETS, replay_batch_size=2
+    )
+    await transport.get_extra_info(SZ_READER_TASK)
+    await protocol._wait_connection_lost
+
+    assert dtms == list(CACHED_PACKETS)
+
+
+async def test_gateway_cached_packets(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Check a Gateway restores its cached packets in batches (if so configured)."""
+
+    batch_sizes: list[int] = []
+    batch_reader = FileTransport._batch_reader
+
+    async def _batch_reader(self: FileTransport, batch_size: int) -> None:
+        batch_sizes.append(batch_size)
+        await batch_reader(self, batch_size)
+
+    monkeypatch.setattr(FileTransport, "_batch_reader", _batch_reader)
+
+    (empty_log := tmp_path / "empty.log").touch()
+
+    with open(empty_log) as f:
+        gwy = Gateway(None, input_file=f, config={SZ_REPLAY_BATCH_SIZE: 2})
+        await gwy.start(cached_packets=CACHED_PACKETS)
+
+    try:
+        assert batch_sizes == [2, 2]  # the cached packets, and the packet log
+        assert "01:145038" in gwy.device_by_id
+    finally:
+        await gwy.stop()
+
+
+@pytest.mark.benchmark
+async def test_replay_benchmark(tmp_path: Path) -> None:
+    """Check the batched replay rate (frames/sec) of a large log beats the unbatched."""
+
+    file_name = tmp_path / "packet.log"
+    num_frames = _synthetic_log(file_name)
+
+    rates: dict[int | None, float] = {}
+    for replay_batch_size in (None, 64, 1024):
+        t0 = perf_counter()
+        dtms = await _replay(file_name, replay_batch_size)
+        rates[replay_batch_size] = num_frames / (perf_counter() - t0)
+
+        assert len(dtms) == num_frames
+
+    print(
+        f"\n{num_frames} frames: "
+        + ", ".join(f"batch_size={k} {v:,.0f}/s" for k, v in rates.items())
+    )
+
+    assert rates[64] > rates[None]
+    assert rates[1024] > rates[None]
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the coalescing of identical RQs (and their cached replies)."""
+
+import asyncio
+import gc
+from collections.abc import AsyncGenerator
+from datetime import datetime as dt
+from typing import Any
+
+import pytest
+
+from ramses_rf import Command, Message, Packet
+from ramses_tx import exceptions as exc
+from ramses_tx.const import Priority
+from ramses_tx.protocol import PortProtocol, protocol_factory
+from ramses_tx.transport import transport_factory
+from ramses_tx.typing import QosParams
+
+from .virtual_rf import VirtualRf
+
+# TIP: using 18:000730 as the source will prevent impersonation alerts
+
+RQ_CMD_STR_0 = "RQ --- 18:000730 01:222222 --:------ 12B0 001 00"
+RP_CMD_STR_0 = "RP --- 01:222222 18:000730 --:------ 12B0 003 000000"
+
+RQ_CMD_STR_1 = "RQ --- 18:000730 01:222222 --:------ 12B0 001 01"
+
+
+@pytest.fixture()
+async def protocol(
+    rf: VirtualRf, request: pytest.FixtureRequest
+) -> AsyncGenerator[PortProtocol, None]:
+    def _msg_handler(msg: Message) -> None:
+        pass
+
+    protocol = protocol_factory(_msg_handler, **request.param)
+    assert isinstance(protocol, PortProtocol)  # mypy
+
+    protocol._disable_qos = False  # HACK: needed for tests to succeed (default: None?)
+
+    await transport_factory(protocol, port_name=rf.ports[0], port_config={})
+
+    frames: list[str] = []
+    send_frame = protocol._send_frame
+
+    async def _send_frame(frame: str, **kwargs: Any) -> None:
+        frames.append(frame)
+        await send_frame(frame, **kwargs)
+
+    protocol._send_frame = _send_frame  # type: ignore[method-assign]
+    protocol._frames = frames  # type: ignore[attr-defined]
+
+    try:
+        yield protocol
+    finally:
+        protocol._transport.close()
+        await rf.stop()
+
+
+def _send_cmd(
+    protocol: PortProtocol,
+    cmd_str: str,
+    timeout: float = 5,
+    priority: Priority = Priority.DEFAULT,
+) -> asyncio.Task:
+    qos = QosParams(wait_for_reply=True, timeout=timeout)
+    return protocol._loop.create_task(
+        protocol._send_cmd(Command(cmd_str), priority=priority, qos=qos)
+    )
+
+
+async def _reply(protocol: PortProtocol, pkt_str: str) -> None:
+    while not protocol._frames:  # type: ignore[attr-defined]
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(0.05)  # for the echo
+    protocol.pkt_received(Packet(dt.now(), f"... {pkt_str}"))
+
+
+@pytest.mark.xdist_group(name="virt_serial")
+@pytest.mark.parametrize("protocol", [{"coalesce_rqs": True}], indirect=True)
+async def test_coalesced(protocol: PortProtocol) -> None:
+    """Check identical RQs share a transmission (but only identical RQs do)."""
+
+    tasks = [
+        _send_cmd(protocol, RQ_CMD_STR_0),
+        _send_cmd(protocol, RQ_CMD_STR_0),
+        _send_cmd(protocol, RQ_CMD_STR_0),
+    ]
+    await _reply(protocol, RP_CMD_STR_0)
+
+    results = await asyncio.gather(*tasks)
+    assert results[0] is results[1] is results[2]
+    assert str(results[0]) == RP_CMD_STR_0
+
+    assert protocol._frames == [RQ_CMD_STR_0]  # type: ignore[attr-defined]
+    assert protocol._pending_rqs == {}
+
+    task = _send_cmd(protocol, RQ_CMD_STR_0, timeout=0.1)  # no cache, so is sent again
+    with pytest.raises(exc.ProtocolSendFailed):
+        await task
+
+    assert protocol._frames == [RQ_CMD_STR_0] * 2  # type: ignore[attr-defined]
+
+
+@pytest.mark.xdist_group(name="virt_serial")
+@pytest.mark.parametrize("protocol", [{}], indirect=True)
+async def test_not_coalesced(protocol: PortProtocol) -> None:
+    """Check identical RQs are not coalesced by default."""
+
+    tasks = [_send_cmd(protocol, RQ_CMD_STR_0), _send_cmd(protocol, RQ_CMD_STR_0)]
+    await _reply(protocol, RP_CMD_STR_0)
+    await tasks[0]
+
+    while len(protocol._frames) < 2:  # type: ignore[attr-defined]
+        await asyncio.sleep(0.005)
+    protocol.pkt_received(Packet(dt.now(), f"... {RP_CMD_STR_0}"))
+    await tasks[1]
+
+    assert protocol._frames == [RQ_CMD_STR_0] * 2  # type: ignore[attr-defined]
+
+
+@pytest.mark.xdist_group(name="virt_serial")
+@pytest.mark.parametrize("protocol", [{"coalesce_rqs": True}], indirect=True)
+async def test_coalesced_by_priority(protocol: PortProtocol) -> None:
+    """Check identical RQs are coalesced only if they have the same priority/QoS."""
+
+    tasks = [
+        _send_cmd(protocol, RQ_CMD_STR_0),
+        _send_cmd(protocol, RQ_CMD_STR_0, priority=Priority.HIGH),
+        _send_cmd(protocol, RQ_CMD_STR_0, timeout=4),
+    ]
+    await asyncio.sleep(0)
+    assert len(protocol._pending_rqs) == 3
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.xdist_group(name="virt_serial")
+@pytest.mark.parametrize("protocol", [{"coalesce_rqs": True}], indirect=True)
+async def test_coalesced_cancelled(protocol: PortProtocol) -> None:
+    """Check the exception of a shared send is retrieved, even if all callers left."""
+
+    errors: list[dict] = []
+    protocol._loop.set_exception_handler(lambda _, ctx: errors.append(ctx))
+
+    task = _send_cmd(protocol, RQ_CMD_STR_0, timeout=0.1)
+    await asyncio.sleep(0)
+    task.cancel()  # the shared send continues, until it fails
+
+    while protocol._pending_rqs:
+        await asyncio.sleep(0.01)
+
+    gc.collect()  # any unretrieved exception is logged when its task is collected
+    assert errors == []
+
+
+@pytest.mark.xdist_group(name="virt_serial")
+@pytest.mark.parametrize("protocol", [{"reply_cache_ttl": 5}], indirect=True)
+async def test_cached_reply(protocol: PortProtocol) -> None:
+    """Check an RQ is answered from a recent reply, without being sent."""
+
+    task = _send_cmd(protocol, RQ_CMD_STR_0)
+    await _reply(protocol, RP_CMD_STR_0)
+    pkt = await task
+
+    assert await _send_cmd(protocol, RQ_CMD_STR_0) is pkt  # from the cache
+    assert protocol._frames == [RQ_CMD_STR_0]  # type: ignore[attr-defined]
+
+    protocol._frames.clear()  # type: ignore[attr-defined]
+
+    task = _send_cmd(protocol, RQ_CMD_STR_1, timeout=0.1)  # a different RQ
+    with pytest.raises(exc.ProtocolSendFailed):
+        await task
+    assert protocol._frames == [RQ_CMD_STR_1]  # type: ignore[attr-defined]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""RAMSES RF - Test the protocol's send queue (deadline-aware scheduling).
+
+Includes a simple benchmark (latency under a burst of commands), using a virtual RF.
+"""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from time import perf_counter
+
+import pytest
+
+from ramses_rf import Command, Message
+from ramses_tx import exceptions as exc
+from ramses_tx.const import Priority
+from ramses_tx.protocol import PortProtocol, protocol_factory
+from ramses_tx.protocol_fsm import (
+    SZ_MAX_QUEUE_DEPTH,
+    SZ_NUM_DEQUEUED,
+    SZ_NUM_EXPIRED,
+    SZ_QUEUE_DEPTH,
+    SZ_WAIT_TIME_MAX,
+    SZ_WAIT_TIME_P95,
+    _SendQueue,
+)
+from ramses_tx.transport import transport_factory
+from ramses_tx.typing import QosParams
+
+from .virtual_rf import VirtualRf
+
+NUM_CMDS = 500
+NUM_SENDERS = 32  # the size of the send buffer
+
+
+@pytest.fixture()
+async def protocol(rf: VirtualRf) -> AsyncGenerator[PortProtocol, None]:
+    def _msg_handler(msg: Message) -> None:
+        pass
+
+    protocol = protocol_factory(_msg_handler)
+    assert isinstance(protocol, PortProtocol)  # mypy
+
+    await transport_factory(protocol, port_name=rf.ports[0], port_config={})
+
+    try:
+        yield protocol
+    finally:
+        protocol._transport.close()
+        await rf.stop()
+
+
+async def test_queue_order() -> None:
+    """Check the order of the queue is by priority, then deadline, then FIFO."""
+
+    loop = asyncio.get_running_loop()
+    que = _SendQueue(loop, maxsize=8)
+
+    def put(priority: Priority, deadline: float, idx: int) -> asyncio.Future:
+        cmd = Command.get_zone_temp("01:000001", f"{idx:02X}")
+        fut = loop.create_future()
+        que.put_nowait(priority, deadline, cmd, QosParams(), fut)
+        return fut
+
+    put(Priority.DEFAULT, 20, 0)
+    put(Priority.DEFAULT, 10, 1)
+    put(Priority.HIGH, 30, 2)
+    put(Priority.DEFAULT, 10, 3)
+    fut = put(Priority.HIGHEST, 10, 4)
+
+    fut.cancel()  # e.g. its sender timed out: is removed immediately
+    await asyncio.sleep(0)  # the done callbacks are scheduled via call_soon()
+    assert que.qsize() == 4
+
+    assert que.peek() == (Priority.HIGH, 30)
+    assert [que.get_nowait()[0].payload[:2] for _ in range(4)] == [
+        "02",
+        "01",
+        "03",
+        "00",
+    ]
+    with pytest.raises(asyncio.QueueEmpty):
+        que.get_nowait()
+
+    for _ in range(que.maxsize):
+        put(Priority.DEFAULT, 10, 0)
+    with pytest.raises(asyncio.QueueFull):
+        put(Priority.DEFAULT, 10, 0)
+
+    assert que.qsize() == que.maxsize
+    assert que._num_expired == 1
+    assert que._num_dequeued == 4
+
+
+@pytest.mark.xdist_group(name="virt_serial")
+async def test_burst_benchmark(
+    protocol: PortProtocol, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Check the latency of each command (from queued to echo'd) under a burst."""
+
+    monkeypatch.setattr("ramses_tx.transport.MIN_INTER_WRITE_GAP", 0.001)
+
+    cmds = [Command.put_sensor_temp(f"03:{i:06d}", 19.5) for i in range(NUM_CMDS)]
+    latencies: list[float] = []
+
+    async def sender(cmds: list[Command]) -> None:
+        for cmd in cmds:
+            t0 = perf_counter()
+            pkt = await protocol._send_cmd(cmd, qos=QosParams(timeout=10))
+            latencies.append(perf_counter() - t0)
+            assert pkt == cmd
+
+    t0 = perf_counter()
+    await asyncio.gather(*(sender(cmds[i::NUM_SENDERS]) for i in range(NUM_SENDERS)))
+    secs = perf_counter() - t0
+
+    metrics = protocol._context.queue_metrics
+    assert metrics[SZ_QUEUE_DEPTH] == 0
+    assert metrics[SZ_NUM_DEQUEUED] == NUM_CMDS
+    assert metrics[SZ_NUM_EXPIRED] == 0
+    assert metrics[SZ_MAX_QUEUE_DEPTH] <= NUM_SENDERS
+
+    assert len(latencies) == NUM_CMDS  # all were sent (none timed out)
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)]
+    print(
+        f"\n{NUM_CMDS} cmds: {NUM_CMDS / secs:,.0f}/s"
+        f", latency p50 {latencies[len(latencies) // 2] * 1000:,.1f}ms"
+        f", p95 {p95 * 1000:,.1f}ms"
+        f", max {latencies[-1] * 1000:,.1f}ms"
+        f" (queue wait p95 {metrics[SZ_WAIT_TIME_P95]}s"
+        f", max {metrics[SZ_WAIT_TIME_MAX]}s)"
+    )
+
+    # the latency is bounded by the depth of the send buffer (p95 & max are ~0.05s)
+    assert p95 < 0.5 and latencies[-1] < 1.0
+    assert metrics[SZ_WAIT_TIME_MAX] < 1.0  # type: ignore[operator]
+
+
+@pytest.mark.xdist_group(name="virt_serial")
+async def test_expired_removed(protocol: PortProtocol) -> None:
+    """Check a queued command is removed from the queue as soon as it expires."""
+
+    protocol._disable_qos = False  # HACK: so the RQ will wait for its (absent) reply
+
+    rq_cmd = Command.get_system_time("01:000001")  # will be in flight, until timeout
+    rq_task = protocol._loop.create_task(
+        protocol._send_cmd(
+            rq_cmd,
+            priority=Priority.HIGH,  # else the cmd below is sent first (its deadline)
+            qos=QosParams(wait_for_reply=True, timeout=0.5),
+        )
+    )
+
+    cmd = Command.put_sensor_temp("03:000001", 19.5)  # will be queued, until timeout
+    task = protocol._loop.create_task(
+        protocol._send_cmd(cmd, qos=QosParams(timeout=0.05))
+    )
+
+    await asyncio.sleep(0.01)
+    assert protocol._context._que.qsize() == 1
+
+    with pytest.raises(exc.ProtocolSendFailed):
+        await task
+    await asyncio.sleep(0)
+
+    assert protocol._context._que.qsize() == 0  # the RQ is still in flight
+    assert protocol._context.num_in_flight == 1
+    assert protocol._context.queue_metrics[SZ_NUM_EXPIRED] == 1
+
+    with pytest.raises(exc.ProtocolSendFailed):
+        await rq_task